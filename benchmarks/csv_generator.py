@@ -0,0 +1,132 @@
+import csv
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+from crawler.constants import (
+    ALLOWED_CH_TARGET_VALUES,
+    FIELD_CH1_CQ,
+    FIELD_CH1_RESULT,
+    FIELD_CH1_TARGET,
+    FIELD_CH2_CQ,
+    FIELD_CH2_RESULT,
+    FIELD_CH2_TARGET,
+    FIELD_CH3_CQ,
+    FIELD_CH3_RESULT,
+    FIELD_CH3_TARGET,
+    FIELD_CH4_CQ,
+    FIELD_CH4_RESULT,
+    FIELD_CH4_TARGET,
+    FIELD_DATE_TESTED,
+    FIELD_LAB_ID,
+    FIELD_RESULT,
+    FIELD_RNA_ID,
+    FIELD_RNA_PCR_ID,
+    FIELD_ROOT_SAMPLE_ID,
+    FIELD_VIRAL_PREP_ID,
+    POSITIVE_RESULT_VALUE,
+)
+
+BASE_HEADERS = (
+    FIELD_ROOT_SAMPLE_ID,
+    FIELD_VIRAL_PREP_ID,
+    FIELD_RNA_ID,
+    FIELD_RNA_PCR_ID,
+    FIELD_RESULT,
+    FIELD_DATE_TESTED,
+    FIELD_LAB_ID,
+)
+CHANNEL_HEADERS = (
+    (FIELD_CH1_TARGET, FIELD_CH1_RESULT, FIELD_CH1_CQ),
+    (FIELD_CH2_TARGET, FIELD_CH2_RESULT, FIELD_CH2_CQ),
+    (FIELD_CH3_TARGET, FIELD_CH3_RESULT, FIELD_CH3_CQ),
+    (FIELD_CH4_TARGET, FIELD_CH4_RESULT, FIELD_CH4_CQ),
+)
+RESULTS = (POSITIVE_RESULT_VALUE, "Negative", "Negative", "Negative", "Void")
+WELL_COORDINATES = tuple(f"{row}{column:02}" for row in "ABCDEFGH" for column in range(1, 13))
+VALID_DATE_TESTED = "2020-04-16 14:30:40 UTC"
+INVALID_DATE_TESTED = "16-04-2020 14:30"
+
+
+def centre_csv_headers(num_channels: int) -> List[str]:
+    """Returns the headers of a generated centre CSV file.
+
+    Arguments:
+        num_channels {int} -- the number of CT channels (0 to 4) for which to add target, result and cq columns
+
+    Returns:
+        List[str] -- the headers of the file
+    """
+    return list(BASE_HEADERS) + [header for channel in CHANNEL_HEADERS[:num_channels] for header in channel]
+
+
+def generate_centre_csv(
+    file_path: Path,
+    num_rows: int,
+    num_channels: int = 4,
+    duplicate_rate: float = 0.01,
+    bad_date_rate: float = 0.01,
+    blank_row_rate: float = 0.01,
+    with_bom: bool = False,
+    seed: int = 0,
+) -> None:
+    """Writes a synthetic lighthouse centre CSV file, modelled on the files in tests/files. Rows are spread over 96
+    well plates and their channel results are consistent with their result, so apart from the injected duplicates, bad
+    dates and blank rows every row passes validation.
+
+    Arguments:
+        file_path {Path} -- the path of the file to write
+        num_rows {int} -- the number of rows to write, including the injected duplicates, bad dates and blank rows
+        num_channels {int} -- the number of CT channels (0 to 4) for which to add target, result and cq columns
+        duplicate_rate {float} -- the fraction of rows which repeat an earlier row of the file
+        bad_date_rate {float} -- the fraction of rows with a Date Tested in an unknown format
+        blank_row_rate {float} -- the fraction of rows which are blank
+        with_bom {bool} -- whether to start the file with a byte order mark
+        seed {int} -- the seed of the random generator, so that a file can be generated again
+    """
+    rand = random.Random(seed)
+    targets = ALLOWED_CH_TARGET_VALUES[:num_channels]
+    headers = centre_csv_headers(num_channels)
+    previous_rows: List[Tuple[str, ...]] = []
+
+    with open(file_path, "w", newline="", encoding="utf-8-sig" if with_bom else "utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+
+        for index in range(num_rows):
+            draw = rand.random()
+            if draw < blank_row_rate:
+                writer.writerow([""] * len(headers))
+                continue
+
+            if draw < blank_row_rate + duplicate_rate and previous_rows:
+                writer.writerow(rand.choice(previous_rows))
+                continue
+
+            plate_number, well_index = divmod(index, len(WELL_COORDINATES))
+            result = rand.choice(RESULTS)
+            date_tested = INVALID_DATE_TESTED if rand.random() < bad_date_rate else VALID_DATE_TESTED
+
+            row: Tuple[str, ...] = (
+                f"BM{index:08}",
+                str(index),
+                f"BM{plate_number:06}_{WELL_COORDINATES[well_index]}",
+                f"PCR{index:08}",
+                result,
+                date_tested,
+                "BM",
+            )
+            for channel, target in enumerate(targets):
+                # a positive sample has a positive first channel, as required by the validation
+                channel_result = (
+                    POSITIVE_RESULT_VALUE if result == POSITIVE_RESULT_VALUE and channel == 0 else "Negative"
+                )
+                row += (target, channel_result, f"{rand.uniform(10, 40):.2f}")
+
+            writer.writerow(row)
+
+            # keep a bounded sample of earlier rows to duplicate later in the file
+            if len(previous_rows) < 1000:
+                previous_rows.append(row)
+            else:
+                previous_rows[rand.randrange(len(previous_rows))] = row
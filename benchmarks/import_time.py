@@ -0,0 +1,212 @@
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Set
+
+from benchmarks.ingestion import current_commit
+
+# numpy is benchmarked on its own, as the cost the crawler avoids by only importing it when a batch is processed
+DEFAULT_MODULES = ("crawler.main", "run_migration", "numpy")
+DEFAULT_REPEATS = 5
+DEFAULT_TOP_PACKAGES = 10
+
+# a line written to stderr by python -X importtime, e.g. "import time:       511 |      20248 |     numpy.matrixlib"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+BenchmarkResult = Dict[str, Any]
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(stderr: str) -> List[ImportTiming]:
+    """Parses the timings written to stderr by python -X importtime, in the order the imports completed.
+
+    Arguments:
+        stderr {str} -- the stderr of the python process
+
+    Returns:
+        List[ImportTiming] -- the timing of each module imported; a module imported at the top level has a depth of 0
+    """
+    import_timings = []
+    for line in stderr.splitlines():
+        if (match := IMPORT_TIME_LINE.match(line)) is not None:
+            self_us, cumulative_us, indent, module = match.groups()
+            # importtime indents each nested import by two spaces, after the one space separating it from the bar
+            import_timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+
+    return import_timings
+
+
+def import_times(statement: str) -> List[ImportTiming]:
+    """Runs a statement in a new python process with -X importtime.
+
+    Arguments:
+        statement {str} -- the python statement, e.g. "import crawler.main"
+
+    Returns:
+        List[ImportTiming] -- the timing of each module imported, including those imported when the interpreter starts
+
+    Raises:
+        RuntimeError: if the statement fails, e.g. a module cannot be imported
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Failed running {statement!r}: {completed.stderr.strip().splitlines()[-1:]}")
+
+    return parse_import_times(completed.stderr)
+
+
+def summarise_import_times(
+    import_timings: List[ImportTiming], startup_modules: Set[str], top_packages: int
+) -> BenchmarkResult:
+    """Works out the time taken by the imports of a statement, leaving out the modules the interpreter imports when it
+    starts, and the packages which take the most of that time.
+
+    Arguments:
+        import_timings {List[ImportTiming]} -- the timings of a run of the statement, as returned by import_times
+        startup_modules {Set[str]} -- the modules imported when the interpreter starts
+        top_packages {int} -- the number of packages to report
+
+    Returns:
+        BenchmarkResult -- the milliseconds taken by the imports, the number of modules imported and the milliseconds
+        spent importing each of the slowest top level packages
+    """
+    imported = [import_timing for import_timing in import_timings if import_timing.module not in startup_modules]
+
+    package_us: Dict[str, int] = defaultdict(int)
+    for import_timing in imported:
+        package_us[import_timing.module.split(".")[0]] += import_timing.self_us
+
+    slowest_packages = sorted(package_us.items(), key=lambda package_time: package_time[1], reverse=True)
+
+    return {
+        "milliseconds": round(sum(timing.cumulative_us for timing in imported if timing.depth == 0) / 1000, 1),
+        "modules": len(imported),
+        "packages": {package: round(us / 1000, 1) for package, us in slowest_packages[:top_packages]},
+    }
+
+
+def benchmark_import(module: str, repeats: int, startup_modules: Set[str], top_packages: int) -> BenchmarkResult:
+    """Times the import of a module in a new python process, keeping the fastest of the repeats as the least disturbed
+    by anything else running.
+
+    Arguments:
+        module {str} -- the module to import
+        repeats {int} -- the number of times to import the module
+        startup_modules {Set[str]} -- the modules imported when the interpreter starts
+        top_packages {int} -- the number of packages to report
+
+    Returns:
+        BenchmarkResult -- the measurements of the fastest import
+    """
+    summaries = [
+        summarise_import_times(import_times(f"import {module}"), startup_modules, top_packages) for _ in range(repeats)
+    ]
+    fastest = min(summaries, key=lambda summary: summary["milliseconds"])
+
+    return {"module": module, **fastest}
+
+
+def run(modules: List[str], repeats: int, top_packages: int = DEFAULT_TOP_PACKAGES) -> Dict[str, Any]:
+    """Runs the import time benchmark for each module.
+
+    Arguments:
+        modules {List[str]} -- the modules to import
+        repeats {int} -- the number of times to import each module
+        top_packages {int} -- the number of packages to report for each module
+
+    Returns:
+        Dict[str, Any] -- the results of the benchmarks along with details of the commit and environment
+    """
+    startup_modules = {import_timing.module for import_timing in import_times("pass")}
+
+    return {
+        "benchmark": "import_time",
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "results": [benchmark_import(module, repeats, startup_modules, top_packages) for module in modules],
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Compares the import times of two benchmark runs, for the modules imported by both.
+
+    Arguments:
+        baseline {Dict[str, Any]} -- the results of the run to compare against, as returned by run
+        current {Dict[str, Any]} -- the results of the current run, as returned by run
+
+    Returns:
+        List[str] -- a line describing the change in the import time of each module
+    """
+    baseline_results = {result["module"]: result for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        if (baseline_result := baseline_results.get(result["module"])) is not None:
+            change = (result["milliseconds"] / baseline_result["milliseconds"] - 1) * 100
+            lines.append(
+                f"{result['module']}: {baseline_result['milliseconds']} -> {result['milliseconds']} ms "
+                f"({change:+.1f}%) against {baseline.get('commit')}"
+            )
+
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the time taken to import the crawler and migrations.")
+
+    parser.add_argument(
+        "--modules",
+        dest="modules",
+        nargs="+",
+        default=list(DEFAULT_MODULES),
+        help="the modules to import, defaults to crawler.main, run_migration and numpy",
+    )
+    parser.add_argument(
+        "--repeats",
+        dest="repeats",
+        type=int,
+        default=DEFAULT_REPEATS,
+        help=f"the number of times to import each module, keeping the fastest, defaults to {DEFAULT_REPEATS}",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        default="import_time_results.json",
+        help="the file to write the results to as JSON, defaults to import_time_results.json",
+    )
+    parser.add_argument(
+        "--compare",
+        dest="baseline",
+        help="a results file from a previous run to compare the import times against",
+    )
+
+    args = parser.parse_args()
+
+    benchmark_run = run(args.modules, args.repeats)
+
+    with open(args.output, "w") as output_file:
+        json.dump(benchmark_run, output_file, indent=2)
+
+    json.dump(benchmark_run["results"], sys.stdout, indent=2)
+    print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            for line in compare(json.load(baseline_file), benchmark_run):
+                print(line)
@@ -0,0 +1,221 @@
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.csv_generator import generate_centre_csv
+from crawler.config.centre import CENTRE_REGEX_BARCODE
+from crawler.constants import BIOMEK_LABWARE_CLASS_KINGFISHER, FIELD_RNA_ID
+from crawler.file_processing import Centre, CentreFile
+from crawler.helpers.general_helpers import get_config
+from crawler.types import CentreConf, Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROW_COUNTS = (10_000, 100_000, 1_000_000)
+BENCHMARK_CENTRE_PREFIX = "BENCHMARK"
+BENCHMARK_FILE_NAME = "BM_sanger_report_200518_2205.csv"
+
+BenchmarkResult = Dict[str, Any]
+
+
+def benchmark_centre_config() -> CentreConf:
+    """Returns the config of the centre whose files are benchmarked, with the fields of the centres in
+    crawler/config/centre.py that are used when parsing a file.
+
+    Returns:
+        CentreConf -- the centre config
+    """
+    return {
+        "barcode_field": FIELD_RNA_ID,
+        "barcode_regex": CENTRE_REGEX_BARCODE,
+        "name": "Benchmark Centre",
+        "prefix": BENCHMARK_CENTRE_PREFIX,
+        "lab_id_default": "BM",
+        "backups_folder": "tmp/backups/BENCHMARK",
+        "biomek_labware_class": BIOMEK_LABWARE_CLASS_KINGFISHER,
+    }
+
+
+def parse_file(config: Config, chunk_size: int) -> int:
+    """Parses and validates the benchmark file as the crawler does, without writing to any database.
+
+    Arguments:
+        config {Config} -- application config, pointing DIR_DOWNLOADED_DATA at the directory of the benchmark centre
+        chunk_size {int} -- the number of rows in each chunk yielded by process_csv
+
+    Returns:
+        int -- the number of rows which passed validation
+    """
+    centre_file = CentreFile(BENCHMARK_FILE_NAME, Centre(config, benchmark_centre_config()))
+
+    return sum(len(docs) for docs in centre_file.process_csv(chunk_size))
+
+
+def benchmark_parsing(config: Config, num_rows: int, chunk_size: int, measure_memory: bool = True) -> BenchmarkResult:
+    """Times the parsing and validation of a generated file with the given number of rows. The peak memory is measured
+    in a second pass as tracemalloc slows down the parsing.
+
+    Arguments:
+        config {Config} -- application config, pointing DIR_DOWNLOADED_DATA at the directory of the benchmark centre
+        num_rows {int} -- the number of rows of the generated file
+        chunk_size {int} -- the number of rows in each chunk yielded by process_csv
+        measure_memory {bool} -- whether to measure the peak memory of the parsing
+
+    Returns:
+        BenchmarkResult -- the measurements of the benchmark
+    """
+    generate_centre_csv(
+        Path(config.DIR_DOWNLOADED_DATA).joinpath(BENCHMARK_CENTRE_PREFIX, BENCHMARK_FILE_NAME), num_rows, with_bom=True
+    )
+
+    start = time.perf_counter()
+    valid_rows = parse_file(config, chunk_size)
+    seconds = time.perf_counter() - start
+
+    peak_memory_mb = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            parse_file(config, chunk_size)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_memory_mb = round(peak_memory / 1024 / 1024, 2)
+
+    return {
+        "num_rows": num_rows,
+        "valid_rows": valid_rows,
+        "chunk_size": chunk_size,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(num_rows / seconds),
+        "peak_memory_mb": peak_memory_mb,
+    }
+
+
+def current_commit() -> Optional[str]:
+    """Returns the commit of the working tree so that results can be compared between commits.
+
+    Returns:
+        Optional[str] -- the commit hash, or None if it cannot be determined
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(config: Config, row_counts: List[int], chunk_size: int, measure_memory: bool = True) -> Dict[str, Any]:
+    """Runs the parsing benchmark for each row count against files generated in a temporary directory.
+
+    Arguments:
+        config {Config} -- application config
+        row_counts {List[int]} -- the number of rows of each benchmarked file
+        chunk_size {int} -- the number of rows in each chunk yielded by process_csv
+        measure_memory {bool} -- whether to measure the peak memory of the parsing
+
+    Returns:
+        Dict[str, Any] -- the results of the benchmarks along with details of the commit and environment
+    """
+    results = []
+    download_dir = config.DIR_DOWNLOADED_DATA
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Path(tmp_dir).joinpath(BENCHMARK_CENTRE_PREFIX).mkdir()
+        config.DIR_DOWNLOADED_DATA = f"{tmp_dir}/"
+        try:
+            for num_rows in row_counts:
+                logger.info(f"Benchmarking the parsing of {num_rows} rows")
+                results.append(benchmark_parsing(config, num_rows, chunk_size, measure_memory))
+        finally:
+            config.DIR_DOWNLOADED_DATA = download_dir
+
+    return {
+        "benchmark": "parsing",
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Compares the rows per second of two benchmark runs, for the row counts run by both.
+
+    Arguments:
+        baseline {Dict[str, Any]} -- the results of the run to compare against, as returned by run
+        current {Dict[str, Any]} -- the results of the current run, as returned by run
+
+    Returns:
+        List[str] -- a line describing the change in rows per second of each row count
+    """
+    baseline_results = {result["num_rows"]: result for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        if (baseline_result := baseline_results.get(result["num_rows"])) is not None:
+            change = (result["rows_per_second"] / baseline_result["rows_per_second"] - 1) * 100
+            lines.append(
+                f"{result['num_rows']} rows: {baseline_result['rows_per_second']} -> {result['rows_per_second']} "
+                f"rows/sec ({change:+.1f}%) against {baseline.get('commit')}"
+            )
+
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parsing and validation of centre CSV files.")
+
+    parser.add_argument(
+        "--rows",
+        dest="row_counts",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_ROW_COUNTS),
+        help="the number of rows of each benchmarked file, defaults to 10k, 100k and 1M",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        default="benchmark_results.json",
+        help="the file to write the results to as JSON, defaults to benchmark_results.json",
+    )
+    parser.add_argument(
+        "--compare",
+        dest="baseline",
+        help="a results file from a previous run to compare the rows per second against",
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="measure_memory",
+        action="store_false",
+        help="skip measuring the peak memory, which parses each file a second time",
+    )
+
+    args = parser.parse_args()
+
+    config, _ = get_config("crawler.config.defaults")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(levelname)-7s %(message)s")
+    # the crawler logs every row that fails validation
+    logging.getLogger("crawler").setLevel(logging.ERROR)
+
+    benchmark_run = run(config, args.row_counts, config.FILE_PROCESSING_CHUNK_SIZE, args.measure_memory)
+
+    with open(args.output, "w") as output_file:
+        json.dump(benchmark_run, output_file, indent=2)
+
+    json.dump(benchmark_run["results"], sys.stdout, indent=2)
+    print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            for line in compare(json.load(baseline_file), benchmark_run):
+                print(line)
@@ -0,0 +1,145 @@
+import logging
+import os
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Final, Iterable, List
+
+from crawler.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_INDEX_FILE: Final[str] = "checksums.sqlite3"
+
+# backup files are named <timestamp>_<file name>_<checksum>, e.g. 200601_1414_AP_sanger_report_200503_2338.csv_d204bd...
+REGEX_BACKUP_FILE: Final = re.compile(r"^([\d]{6}_[\d]{4})_(.*)_(\w*)$")
+
+SQL_CREATE_CHECKSUMS_TABLE = """\
+CREATE TABLE IF NOT EXISTS checksums (
+    outcome TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    backup_file_name TEXT NOT NULL,
+    PRIMARY KEY (outcome, checksum, backup_file_name)
+)
+"""
+SQL_CREATE_META_TABLE = """\
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (key)
+)
+"""
+SQL_INSERT_CHECKSUM = "INSERT OR IGNORE INTO checksums VALUES (?, ?, ?, ?)"
+SQL_SELECT_FILE_NAMES = "SELECT file_name FROM checksums WHERE outcome = ? AND checksum = ?"
+SQL_DELETE_CHECKSUMS = "DELETE FROM checksums"
+SQL_UPSERT_META = "INSERT OR REPLACE INTO meta VALUES (?, ?)"
+SQL_SELECT_META = "SELECT value FROM meta WHERE key = ?"
+
+# the meta key of the time the index was last built from the backup directories, which is only recorded once the
+# whole build has been committed
+META_BUILT_AT: Final[str] = "built_at"
+
+
+class ChecksumIndex(SqliteStore):
+    """An index of the checksums of the files backed up for a centre, by outcome (the errors or successes directory).
+
+    The index is a SQLite database stored in the centre's backups folder. It is written to when a file is backed up so
+    that checking whether a file has already been processed does not need to list and parse every file in the backup
+    directories. If the index has not been built yet, including when an earlier build was interrupted, it is built from
+    the backup directories on first use.
+    """
+
+    FILE_NAME = CHECKSUM_INDEX_FILE
+    SCHEMA = (SQL_CREATE_CHECKSUMS_TABLE, SQL_CREATE_META_TABLE)
+
+    def __init__(self, backups_folder: str, outcomes: Iterable[str]):
+        """Initialiser for the index of a centre's backups folder.
+
+        Arguments:
+            backups_folder {str} -- the centre's backups folder
+            outcomes {Iterable[str]} -- the directories in the backups folder where files are backed up by outcome
+        """
+        super().__init__(backups_folder)
+        self.outcomes = tuple(outcomes)
+
+    def connect(self) -> sqlite3.Connection:
+        """Connect to the index database, creating it and building it from the backup directories if it has not been
+        built.
+
+        Returns:
+            sqlite3.Connection -- a connection to the index database
+        """
+        connection = super().connect()
+        try:
+            if connection.execute(SQL_SELECT_META, (META_BUILT_AT,)).fetchone() is None:
+                logger.info(f"Building checksum index {self.database_path}")
+                self._index_backup_directories(connection)
+        except BaseException:
+            connection.close()
+            raise
+
+        return connection
+
+    def find_file_names(self, outcome: str, checksum: str) -> List[str]:
+        """Find the names of the files backed up to an outcome directory with the given checksum.
+
+        Arguments:
+            outcome {str} -- the outcome directory, e.g. "errors"
+            checksum {str} -- the checksum of the file
+
+        Returns:
+            List[str] -- the original names of the files with that checksum, empty if none were found
+        """
+        return [row[0] for row in self.fetch_all(SQL_SELECT_FILE_NAMES, (outcome, checksum))]
+
+    def add(self, outcome: str, checksum: str, file_name: str, backup_file_name: str) -> None:
+        """Record a file backed up to an outcome directory.
+
+        Arguments:
+            outcome {str} -- the outcome directory the file was backed up to
+            checksum {str} -- the checksum of the file
+            file_name {str} -- the original name of the file
+            backup_file_name {str} -- the name of the backup copy of the file
+        """
+        self.execute(SQL_INSERT_CHECKSUM, (outcome, checksum, file_name, backup_file_name))
+
+    def rebuild(self) -> int:
+        """Rebuild the index from the files in the backup directories.
+
+        Returns:
+            int -- the number of backup files indexed
+        """
+        # without building the index on connecting, as it is built here
+        with closing(super().connect()) as connection:
+            return self._index_backup_directories(connection)
+
+    def _index_backup_directories(self, connection: sqlite3.Connection) -> int:
+        """Replace the index with every file in the backup directories, recording that the index was built in the same
+        transaction so that an interrupted build is started again.
+
+        Arguments:
+            connection {sqlite3.Connection} -- connection to the index database
+
+        Returns:
+            int -- the number of backup files indexed
+        """
+        rows = []
+        for outcome in self.outcomes:
+            outcome_dir = os.path.join(self.backups_folder, outcome)
+            if not os.path.isdir(outcome_dir):
+                continue
+
+            for backup_file_name in os.listdir(outcome_dir):
+                if matches := REGEX_BACKUP_FILE.match(backup_file_name):
+                    rows.append((outcome, matches.group(3), matches.group(2), backup_file_name))
+
+        with connection:
+            connection.execute(SQL_DELETE_CHECKSUMS)
+            connection.executemany(SQL_INSERT_CHECKSUM, rows)
+            connection.execute(SQL_UPSERT_META, (META_BUILT_AT, datetime.now().isoformat()))
+
+        logger.debug(f"Indexed {len(rows)} backup files in {self.backups_folder}")
+
+        return len(rows)
@@ -11,6 +11,36 @@ DIR_DOWNLOADED_DATA = "data/sftp_files/"
 
 ADD_LAB_ID = False
 
+# number of centres to process concurrently, 1 processes them one after the other
+CENTRES_PROCESSING_WORKERS = 1
+# pool used when processing centres concurrently: "thread" or "process"
+CENTRES_PROCESSING_POOL = "thread"
+
+# number of rows of a file parsed and written to the databases at a time, to keep memory use flat for large files
+FILE_PROCESSING_CHUNK_SIZE = 10000
+# number of chunks of samples inserted into mongo which can wait to be written to the MLWH, and then DART, by background
+# threads while the next chunk is parsed and inserted into mongo; 0 writes each chunk to them before the next is parsed.
+# Set to e.g. 2 to overlap the writes with parsing
+SAMPLE_WRITE_QUEUE_SIZE = 0
+# minutes between the cycles of the crawler daemon (runner.py --daemon)
+DAEMON_CYCLE_MINUTES = 15
+# when watching the centres' files (runner.py --watch): seconds between listings of the files, seconds a new or changed
+# file must be listed unchanged before its centre is processed, and minutes between runs processing all the centres
+FILE_WATCH_POLL_SECONDS = 10
+FILE_WATCH_DEBOUNCE_SECONDS = 30
+FILE_WATCH_FULL_SWEEP_MINUTES = 15
+# directory read by the textfile collector of the Prometheus node exporter, where the time taken by each stage of
+# processing each centre's files is written; metrics are not written if empty
+PROMETHEUS_TEXTFILE_DIR = os.environ.get("PROMETHEUS_TEXTFILE_DIR", "")
+# file of the Bloom filter of the samples in mongo, used to find the samples of a file which are already in mongo before
+# inserting them, e.g. "data/samples_filter.bloom"; it is built from the whole samples collection when missing. Not used
+# if empty, when duplicates are only found when the insert fails
+SAMPLES_FILTER_FILE = ""
+# number of samples the filter is sized for, and the rate at which a new sample is found in it once it holds that many;
+# a filter rebuilt from mongo is sized for at least twice the samples in mongo
+SAMPLES_FILTER_CAPACITY = 10_000_000
+SAMPLES_FILTER_ERROR_RATE = 0.001
+
 # If we're running in a container, then instead of localhost
 # we want host.docker.internal, you can specify this in the
 # .env file you use for docker. eg
@@ -24,6 +54,8 @@ MONGO_HOST = LOCALHOST
 MONGO_PASSWORD = ""
 MONGO_PORT = 27017
 MONGO_USERNAME = ""
+# maximum number of connections in the pool of the mongo client shared by a run
+MONGO_MAX_POOL_SIZE = 100
 
 # MLWH database details
 MLWH_DB_DBNAME = "unified_warehouse_development"
@@ -33,6 +65,11 @@ MLWH_DB_RO_USER = "root"
 MLWH_DB_RO_PASSWORD = ROOT_PASSWORD
 MLWH_DB_RW_USER = "root"
 MLWH_DB_RW_PASSWORD = ROOT_PASSWORD
+# number of samples in a chunk from which they are written to the MLWH with LOAD DATA LOCAL INFILE through a staging
+# table, rather than with multi-row inserts; 0 never uses LOAD DATA, which needs local_infile enabled on the server
+MLWH_LOAD_DATA_MIN_ROWS = 0
+# number of connections of each of the read-only and read-write pools of MLWH connections shared by a process
+MLWH_POOL_SIZE = 4
 
 EVENTS_WH_DB = "event_warehouse_development"
 
@@ -46,6 +83,11 @@ DART_DB_DRIVER = "{ODBC Driver 17 for SQL Server}"
 
 # SFTP details
 SFTP_UPLOAD = False  # upload files to SFTP server
+# only download the centre files which are new or changed since they were last processed, as recorded in each centre's
+# SFTP manifest, instead of every file
+SFTP_INCREMENTAL_SYNC = False
+# number of files of a centre downloaded concurrently by an incremental sync, each over its own SFTP connection
+SFTP_DOWNLOAD_WORKERS = 4
 SFTP_HOST = "localhost"
 SFTP_PORT = 22
 SFTP_READ_PASSWORD = "pass"
@@ -45,6 +45,14 @@ FIELD_LH_SAMPLE_UUID: Final[str] = "lh_sample_uuid"
 FIELD_LH_SOURCE_PLATE_UUID: Final[str] = "lh_source_plate_uuid"
 FIELD_BARCODE: Final[str] = "barcode"
 
+# fields of the unique compound index on the samples collection, which duplicated samples fail to be inserted on
+SAMPLES_UNIQUE_FIELDS: Final[Tuple[str, str, str, str]] = (
+    FIELD_ROOT_SAMPLE_ID,
+    FIELD_RNA_ID,
+    FIELD_RESULT,
+    FIELD_LAB_ID,
+)
+
 # filtered-positive field names
 FIELD_FILTERED_POSITIVE_TIMESTAMP: Final[str] = "filtered_positive_timestamp"
 FIELD_FILTERED_POSITIVE_VERSION: Final[str] = "filtered_positive_version"
@@ -122,6 +130,8 @@ DART_EMPTY_VALUE: Final[str] = ""
 
 # DART others
 DART_SET_PROP_STATUS_SUCCESS: Final[int] = 0
+# SQL Server accepts at most 2100 parameters per statement
+DART_PLATE_STATES_BATCH_SIZE: Final[int] = 2000
 
 # Cut off date for v0 and v1 filtered positive
 # Timestamp of v1 positive rule change (GPL-669) deployed to production
@@ -0,0 +1,186 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Callable, Dict, Final, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT_YEAR_FIRST: Final[str] = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT_DAY_FIRST: Final[str] = "DD/MM/YYYY HH:MM"
+
+DATE_PATTERN_YEAR_FIRST: Final = re.compile(
+    r"^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})[ ]+(?P<time>[0-2]\d:[0-5]\d:[0-5]\d)([ ]+(?P<timezone_name>UTC)?)?$"  # noqa: E501
+)
+DATE_PATTERN_DAY_FIRST: Final = re.compile(
+    r"^(?P<day>\d{2})/(?P<month>\d{2})/(?P<year>\d{4})[ ]+(?P<time>[0-2]\d:[0-5]\d)$"
+)
+
+
+def datetime_from_components(
+    day: str, month: str, year: str, time: str, timezone_name: Optional[str] = None
+) -> datetime:
+    """Converts a datetime string (split in its components) into a python datetime
+
+    Arguments:
+        day (str): Day of the month as a zero-padded string
+        month (str): Month as a zero-padded string
+        year (str): Year with century
+        time (str): hour, minute, and optionally seconds
+        timezone_name (Optional[str], optional): Time zone name. Defaults to None.
+
+    Returns:
+        datetime: the date and time, which is only timezone aware for UTC
+    """
+    if len(time) == 5:
+        time = f"{time}:00"
+
+    datetime_string = f"{day} {month} {year} {time}"
+
+    date_time = datetime.strptime(datetime_string, "%d %m %Y %H:%M:%S")
+
+    # We are only checking for UTC at the moment, more time (excuse the pun) is needed to suppport timezones
+    #   more robustly
+    if timezone_name and timezone_name == "UTC":
+        date_time = date_time.replace(tzinfo=timezone.utc)
+
+    return date_time
+
+
+def parse_year_first_date(value: str) -> Optional[datetime]:
+    """Parses a date in the format YYYY-MM-DD HH:MM:SS, optionally followed by UTC, e.g. 2020-11-22 04:36:38 UTC.
+
+    The fields of the usual fixed-width forms of the date are read directly, anything else is matched with the pattern.
+
+    Arguments:
+        value (str): the date string
+
+    Returns:
+        Optional[datetime]: the date and time, or None if the value is not in this format
+    """
+    if (
+        (len(value) == 19 or (len(value) == 23 and value.endswith(" UTC")))
+        and value.isascii()
+        and value[4] == "-"
+        and value[7] == "-"
+        and value[10] == " "
+        and value[13] == ":"
+        and value[16] == ":"
+        and value[11] in "012"
+        and value[14] in "012345"
+        and value[17] in "012345"
+        and (value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]).isdigit()
+    ):
+        return datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            tzinfo=timezone.utc if len(value) == 23 else None,
+        )
+
+    if match := DATE_PATTERN_YEAR_FIRST.match(value):
+        return datetime_from_components(**match.groupdict())
+
+    return None
+
+
+def parse_day_first_date(value: str) -> Optional[datetime]:
+    """Parses a date in the format DD/MM/YYYY HH:MM, e.g. 19/07/2020 21:41.
+
+    Arguments:
+        value (str): the date string
+
+    Returns:
+        Optional[datetime]: the date and time, or None if the value is not in this format
+    """
+    if (
+        len(value) == 16
+        and value.isascii()
+        and value[2] == "/"
+        and value[5] == "/"
+        and value[10] == " "
+        and value[13] == ":"
+        and value[11] in "012"
+        and value[14] in "012345"
+        and (value[0:2] + value[3:5] + value[6:10] + value[11:13] + value[14:16]).isdigit()
+    ):
+        return datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]), int(value[11:13]), int(value[14:16]))
+
+    if match := DATE_PATTERN_DAY_FIRST.match(value):
+        return datetime_from_components(**match.groupdict())
+
+    return None
+
+
+# the accepted formats of the date tested and their parsers
+DATE_TESTED_FORMATS: Final[Tuple[Tuple[str, Callable[[str], Optional[datetime]]], ...]] = (
+    (DATE_FORMAT_YEAR_FIRST, parse_year_first_date),
+    (DATE_FORMAT_DAY_FIRST, parse_day_first_date),
+)
+
+
+class DateTestedParser:
+    """Parses the date tested values of a file. The values of a file nearly always share a single format and many
+    timestamps are repeated, so the format of the first date parsed is tried first for the dates which follow and each
+    distinct value is only parsed once.
+    """
+
+    def __init__(self):
+        """Initialiser for the parser of the dates of a file."""
+        self.detected_format: Optional[str] = None
+        self.format_counts: Dict[str, int] = {}
+        self._parsed_dates: Dict[str, Optional[datetime]] = {}
+        self._formats = DATE_TESTED_FORMATS
+
+    def parse(self, value: Optional[str]) -> Tuple[bool, Optional[datetime]]:
+        """Parses a date tested value. The possible values for the date are:
+        - '' (empty string)
+        - YYYY-MM-DD HH:MM:SS Z e.g. 2020-11-22 04:36:38 UTC
+        - DD/MM/YYYY HH:MM e.g. 19/07/2020 21:41
+
+        Arguments:
+            value (Optional[str]): the date tested value of a row
+
+        Returns:
+            Tuple[bool, Optional[datetime]]: whether the date format is valid and the date, which is None for an empty
+            value
+        """
+        # the date could be an empty string
+        if not value:
+            return True, None
+
+        try:
+            date_time = self._parsed_dates[value]
+        except KeyError:
+            date_time = self._parsed_dates[value] = self._parse_new_value(value)
+
+        return date_time is not None, date_time
+
+    def _parse_new_value(self, value: str) -> Optional[datetime]:
+        for format_name, parse_date in self._formats:
+            if (date_time := parse_date(value)) is not None:
+                if self.detected_format is None:
+                    self.detected_format = format_name
+                    logger.debug(f"Detected date tested format {format_name}")
+
+                    # try the format of the file first from now on
+                    self._formats = tuple(sorted(self._formats, key=lambda date_format: date_format[0] != format_name))
+
+                self.format_counts[format_name] = self.format_counts.get(format_name, 0) + 1
+
+                return date_time
+
+        return None
+
+    def formats_used(self) -> str:
+        """Describes the formats of the dates parsed, for reporting which format a file used.
+
+        Returns:
+            str: each format found and the number of distinct dates in it
+        """
+        if not self.format_counts:
+            return "none"
+
+        return ", ".join(f"{format_name} ({count} distinct dates)" for format_name, count in self.format_counts.items())
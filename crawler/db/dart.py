@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 import logging
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
-import pyodbc
+from more_itertools import chunked
 
 from crawler.constants import (
+    DART_PLATE_STATES_BATCH_SIZE,
     DART_SET_PROP_STATUS_SUCCESS,
     DART_STATE,
     DART_STATE_NO_PLATE,
@@ -19,10 +22,15 @@ from crawler.helpers.general_helpers import get_dart_well_index, map_mongo_doc_t
 from crawler.sql_queries import (
     SQL_DART_ADD_PLATE,
     SQL_DART_GET_PLATE_PROPERTY,
+    SQL_DART_GET_PLATE_STATES,
     SQL_DART_SET_PLATE_PROPERTY,
     SQL_DART_SET_WELL_PROPERTY,
 )
-from crawler.types import Config, SampleDoc
+from crawler.types import Config, DartWellProp, SampleDoc
+
+# pyodbc is only imported when a connection to DART is created, so that importing the crawler does not load it
+if TYPE_CHECKING:
+    import pyodbc
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +60,8 @@ def create_dart_sql_server_conn(config: Config) -> Optional[pyodbc.Connection]:
         f"PWD={dart_db_password}"
     )
 
+    import pyodbc
+
     logger.debug(f"Attempting to connect to {dart_db_host} on port {dart_db_port}")
 
     sql_server_conn = None
@@ -86,6 +96,36 @@ def get_dart_plate_state(cursor: pyodbc.Cursor, plate_barcode: str) -> str:
     return str(cursor.fetchval())
 
 
+def get_dart_plate_states(cursor: pyodbc.Cursor, plate_barcodes: Iterable[str]) -> Dict[str, str]:
+    """Gets the states of many DART plates with one query per batch of plates, instead of one stored procedure call
+    per plate. Plates which are not in DART are given the state DART_STATE_NO_PLATE and plates without a state are
+    given the state DART_STATE_NO_PROP, matching the values returned by get_dart_plate_state.
+
+    Arguments:
+        cursor {pyodbc.Cursor} -- The cursor with which to execute queries.
+        plate_barcodes {Iterable[str]} -- The barcodes of the plates whose states to fetch.
+
+    Returns:
+        Dict[str, str] -- The state of each plate in DART, keyed by plate barcode.
+    """
+    plate_states = {}
+
+    for barcodes_batch in chunked(set(plate_barcodes), DART_PLATE_STATES_BATCH_SIZE):
+        sql_query = SQL_DART_GET_PLATE_STATES % ", ".join("?" * len(barcodes_batch))
+        rows = cursor.execute(sql_query, *barcodes_batch).fetchall()
+
+        states_in_dart = {row[0]: row[1] for row in rows}
+        for plate_barcode in barcodes_batch:
+            if plate_barcode not in states_in_dart:
+                plate_states[plate_barcode] = DART_STATE_NO_PLATE
+            elif states_in_dart[plate_barcode] is None:
+                plate_states[plate_barcode] = DART_STATE_NO_PROP
+            else:
+                plate_states[plate_barcode] = str(states_in_dart[plate_barcode])
+
+    return plate_states
+
+
 def set_dart_plate_state_pending(cursor: pyodbc.Cursor, plate_barcode: str) -> bool:
     """Sets the state of a DART plate to pending.
 
@@ -116,23 +156,52 @@ def set_dart_well_properties(
         well_props {Dict[str, str]} -- The names and values of the well properties to update.
         well_index {int} -- The index of the well to update.
     """
-    for prop_name, prop_value in well_props.items():
-        params = (plate_barcode, prop_name, prop_value, well_index)
-        cursor.execute(SQL_DART_SET_WELL_PROPERTY, params)
+    set_dart_plate_well_properties(cursor, plate_barcode, [(well_props, well_index)])
 
 
-def add_dart_plate_if_doesnt_exist(cursor: pyodbc.Cursor, plate_barcode: str, biomek_labclass: str) -> str:
+def set_dart_plate_well_properties(
+    cursor: pyodbc.Cursor, plate_barcode: str, wells_props: List[Tuple[DartWellProp, int]]
+) -> None:
+    """Calls the DART stored procedure to add or update the properties of the wells of a plate. The stored procedure
+    is called for every property of every well in one round trip to the database using pyodbc's fast_executemany.
+
+    Arguments:
+        cursor {pyodbc.Cursor} -- The cursor with which to execute queries.
+        plate_barcode {str} -- The barcode of the plate whose well properties to update.
+        wells_props {List[Tuple[DartWellProp, int]]} -- The properties to update and index of each well to update.
+    """
+    params = [
+        (plate_barcode, prop_name, prop_value, well_index)
+        for well_props, well_index in wells_props
+        for prop_name, prop_value in well_props.items()
+    ]
+
+    if len(params) > 0:
+        # the cursor is shared with the caller, so its other executemany calls are left in the mode they were in
+        fast_executemany = cursor.fast_executemany
+        cursor.fast_executemany = True
+        try:
+            cursor.executemany(SQL_DART_SET_WELL_PROPERTY, params)
+        finally:
+            cursor.fast_executemany = fast_executemany
+
+
+def add_dart_plate_if_doesnt_exist(
+    cursor: pyodbc.Cursor, plate_barcode: str, biomek_labclass: str, plate_state: Optional[str] = None
+) -> str:
     """Adds a plate to DART if it does not already exist. Returns the state of the plate.
 
     Arguments:
         cursor {pyodbc.Cursor} -- The cursor with with to execute queries.
         plate_barcode {str} -- The barcode of the plate to add.
         biomek_labclass -- The biomek labware class of the plate.
+        plate_state {Optional[str]} -- The state of the plate if already fetched, e.g. with get_dart_plate_states;
+        when not given the state is fetched from DART.
 
     Returns:
         str -- The state of the plate in DART.
     """
-    state = get_dart_plate_state(cursor, plate_barcode)
+    state = plate_state if plate_state is not None else get_dart_plate_state(cursor, plate_barcode)
 
     if state == DART_STATE_NO_PLATE:
         cursor.execute(SQL_DART_ADD_PLATE, (plate_barcode, biomek_labclass, 96))
@@ -146,20 +215,27 @@ def add_dart_plate_if_doesnt_exist(cursor: pyodbc.Cursor, plate_barcode: str, bi
     return state
 
 
-def add_dart_well_properties_if_positive(cursor: pyodbc.Cursor, sample: SampleDoc, plate_barcode: str) -> None:
-    """Adds well properties to DART for the specified sample if that sample is positive.
+def add_dart_plate_well_properties_if_positive(
+    cursor: pyodbc.Cursor, samples: Iterable[SampleDoc], plate_barcode: str
+) -> None:
+    """Adds well properties to DART for the positive samples of a plate, in one round trip to the database.
 
     Arguments:
         cursor {pyodbc.Cursor} -- The cursor with which to execute queries.
-        sample {Sample} -- The sample for which to add well properties.
-        plate_barcode {str} -- The barcode of the plate to which this sample belongs.
+        samples {Iterable[Sample]} -- The samples of the plate for which to add well properties.
+        plate_barcode {str} -- The barcode of the plate to which the samples belong.
     """
-    if sample[FIELD_RESULT] == POSITIVE_RESULT_VALUE:
-        well_index = get_dart_well_index(str(sample.get(FIELD_COORDINATE)))
-        if well_index is not None:
-            dart_well_props = map_mongo_doc_to_dart_well_props(sample)
-            set_dart_well_properties(cursor, plate_barcode, dart_well_props, well_index)
-        else:
-            raise ValueError(
-                f"Unable to determine DART well index for {sample[FIELD_ROOT_SAMPLE_ID]} in plate {plate_barcode}"
-            )
+    wells_props: List[Tuple[DartWellProp, int]] = []
+
+    for sample in samples:
+        if sample[FIELD_RESULT] == POSITIVE_RESULT_VALUE:
+            well_index = get_dart_well_index(str(sample.get(FIELD_COORDINATE)))
+            if well_index is not None:
+                wells_props.append((map_mongo_doc_to_dart_well_props(sample), well_index))
+            else:
+                raise ValueError(
+                    f"Unable to determine DART well index for {sample[FIELD_ROOT_SAMPLE_ID]} in plate {plate_barcode}"
+                )
+
+    if len(wells_props) > 0:
+        set_dart_plate_well_properties(cursor, plate_barcode, wells_props)
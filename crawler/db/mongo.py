@@ -1,11 +1,13 @@
 import logging
+import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Iterator, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.monitoring import ConnectionPoolListener
 from pymongo.results import InsertOneResult
 
 from crawler.types import Config
@@ -13,23 +15,68 @@ from crawler.types import Config
 logger = logging.getLogger(__name__)
 
 
-def create_mongo_client(config: Config) -> MongoClient:
-    """Create a MongoClient with the given config parameters.
+class MongoConnectionCounter(ConnectionPoolListener):
+    """Counts the connection pools and connections opened by a MongoClient, to check that a run shares one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools_created = 0
+        self.connections_created = 0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools_created += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def create_mongo_client(config: Config, event_listeners: Optional[Sequence[Any]] = None) -> MongoClient:
+    """Create a MongoClient with the given config parameters. A client has its own pool of connections (of up to
+    MONGO_MAX_POOL_SIZE connections) and monitoring threads so it should be shared rather than created for every query.
 
     Arguments:
         config {Config} -- application config specifying host and port
+        event_listeners {Optional[Sequence[Any]]} -- pymongo event listeners, e.g. a MongoConnectionCounter
 
     Returns:
         MongoClient -- a client used to interact with the database server
     """
+    event_listeners = event_listeners or []
+
     try:
         logger.debug("Connecting to mongo")
 
         mongo_uri = config.MONGO_URI
 
-        return MongoClient(mongo_uri)
+        return MongoClient(mongo_uri, maxPoolSize=config.MONGO_MAX_POOL_SIZE, event_listeners=event_listeners)
     except AttributeError:
-        #  there is no MONGO_URI so try each config separately
+        #  there is no MONGO_URI so try each config separately
         mongo_host = config.MONGO_HOST
         mongo_port = config.MONGO_PORT
         mongo_username = config.MONGO_USERNAME
@@ -44,6 +91,8 @@ def create_mongo_client(config: Config) -> MongoClient:
             username=mongo_username,
             password=mongo_password,
             authSource=mongo_db,
+            maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+            event_listeners=event_listeners,
         )
 
 
@@ -95,6 +144,7 @@ def create_import_record(
     docs_inserted: int,
     file_name: str,
     errors: List[str],
+    stage_timings: Optional[Dict[str, Dict[str, float]]] = None,
 ) -> InsertOneResult:
     """Creates and inserts an import record for a centre.
 
@@ -104,6 +154,8 @@ def create_import_record(
         docs_inserted {int} -- to number of documents inserted for this centre
         file_name {str} -- file parsed for samples
         errors {List[str]} -- a list of errors while trying to process this centre
+        stage_timings {Optional[Dict[str, Dict[str, float]]]} -- the seconds and rows of each stage of processing the
+        file, by stage name
 
     Returns:
         InsertOneResult -- the result of inserting this document
@@ -119,6 +171,8 @@ def create_import_record(
         "number_of_records": docs_inserted,
         "errors": errors,
     }
+    if stage_timings is not None:
+        import_doc["stage_timings"] = stage_timings
 
     return import_collection.insert_one(import_doc)
 
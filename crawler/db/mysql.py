@@ -1,23 +1,52 @@
-import logging
-from typing import Any, Dict, List, cast
-
-import mysql.connector as mysql
-import sqlalchemy
-from mysql.connector.connection_cext import CMySQLConnection
-from mysql.connector.cursor_cext import CMySQLCursor
-from sqlalchemy.engine.base import Engine
+from __future__ import annotations
 
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Final, List, Mapping, Optional, Sequence, Type, cast
+
+from crawler.sql_queries import (
+    MLWH_SAMPLE_COLUMNS,
+    SQL_MLWH_CREATE_SAMPLES_STAGING_TABLE,
+    SQL_MLWH_DROP_SAMPLES_STAGING_TABLE,
+    SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE,
+    SQL_MLWH_UPSERT_SAMPLES_FROM_STAGING_TABLE,
+)
 from crawler.types import Config
 
+# the MySQL connector and SQLAlchemy are only imported when a connection or engine is created, so that importing the
+# crawler does not load them
+if TYPE_CHECKING:
+    from mysql.connector.connection_cext import CMySQLConnection
+    from mysql.connector.cursor_cext import CMySQLCursor
+    from sqlalchemy.engine.base import Engine
+
 logger = logging.getLogger(__name__)
 
+# the server's max_allowed_packet is used if it can be read, otherwise the smallest default of the supported servers
+DEFAULT_MAX_ALLOWED_PACKET: Final[int] = 4 * 1024 * 1024
+# proportion of max_allowed_packet filled by each multi-row insert, leaving room for the estimate of the row width
+PACKET_FILL_RATIO: Final[float] = 0.75
+# number of rows, spread through the values, whose width is measured to size the batches
+ROW_WIDTH_SAMPLE_SIZE: Final[int] = 100
+# width of a datetime value in an insert, as the quoted string 'YYYY-MM-DD HH:MM:SS.ffffff'
+DATETIME_VALUE_WIDTH: Final[int] = 28
+
 
-def create_mysql_connection(config: Config, readonly: bool = True) -> CMySQLConnection:
+def create_mysql_connection(
+    config: Config, readonly: bool = True, allow_local_infile: bool = False
+) -> CMySQLConnection:
     """Create a CMySQLConnection with the given config parameters.
 
     Arguments:
         config (Config): application config specifying database details
         readonly (bool, optional): use the readonly credentials. Defaults to True.
+        allow_local_infile (bool, optional): allow LOAD DATA LOCAL INFILE, see run_mysql_load_data_upsert. Defaults to
+        False.
 
     Returns:
         CMySQLConnection: a client used to interact with the database server
@@ -32,6 +61,8 @@ def create_mysql_connection(config: Config, readonly: bool = True) -> CMySQLConn
         mlwh_db_password = config.MLWH_DB_RW_PASSWORD
     mlwh_db_db = config.MLWH_DB_DBNAME
 
+    import mysql.connector as mysql
+
     logger.debug(f"Attempting to connect to {mlwh_db_host} on port {mlwh_db_port}")
 
     mysql_conn = None
@@ -45,6 +76,7 @@ def create_mysql_connection(config: Config, readonly: bool = True) -> CMySQLConn
             # whether to use pure python or the C extension.
             # default is false, but specify it so more predictable
             use_pure=False,
+            allow_local_infile=allow_local_infile,
         )
         if mysql_conn is not None:
             if mysql_conn.is_connected():
@@ -55,12 +87,15 @@ def create_mysql_connection(config: Config, readonly: bool = True) -> CMySQLConn
     except mysql.Error as e:
         logger.error(f"Exception on connecting to MySQL database: {e}")
 
-    return cast(CMySQLConnection, mysql_conn)
+    return cast("CMySQLConnection", mysql_conn)
 
 
 def run_mysql_executemany_query(mysql_conn: CMySQLConnection, sql_query: str, values: List[Dict[str, str]]) -> None:
     """Writes the sample testing information into the MLWH.
 
+    The values are written with multi-row inserts, in batches sized so that each insert fills most of the server's
+    max_allowed_packet given the measured width of the rows; see rows_per_query.
+
     Arguments:
         mysql_conn {CMySQLConnection} -- a client used to interact with the database server
         sql_query {str} -- the SQL query to run (see sql_queries.py)
@@ -71,27 +106,31 @@ def run_mysql_executemany_query(mysql_conn: CMySQLConnection, sql_query: str, va
     cursor: CMySQLCursor = mysql_conn.cursor()
 
     try:
+        start = time.perf_counter()
+
         # executing the query with values
         num_values = len(values)
 
-        # BN. If ROWS_PER_QUERY value is too high, you may get '2006 (HY000): MySQL server has
-        # gone away' error indicating you've exceeded the max_allowed_packet size for MySQL
-        ROWS_PER_QUERY = 15000
+        # N.B. if a query exceeds the max_allowed_packet size for MySQL you get a
+        # '2006 (HY000): MySQL server has gone away' error, so the batches are sized from it
+        max_allowed_packet = get_max_allowed_packet(cursor)
+        batch_size = rows_per_query(max_allowed_packet, sql_query, values)
         values_index = 0
         total_rows_affected = 0
         logger.debug(
-            f"Attempting to insert or update {num_values} rows in the MLWH database in batches of {ROWS_PER_QUERY}"
+            f"Attempting to insert or update {num_values} rows in the MLWH database in batches of {batch_size} "
+            f"(max_allowed_packet {max_allowed_packet} bytes)"
         )
 
         while values_index < num_values:
-            logger.debug(f"Inserting records between {values_index} and {values_index + ROWS_PER_QUERY}")
-            cursor.executemany(sql_query, values[values_index : (values_index + ROWS_PER_QUERY)])  # noqa: E203
+            logger.debug(f"Inserting records between {values_index} and {values_index + batch_size}")
+            cursor.executemany(sql_query, values[values_index : (values_index + batch_size)])  # noqa: E203
             logger.debug(
                 f"{cursor.rowcount} rows affected in MLWH. (Note: each updated row increases the "
                 "count by 2, instead of 1)"
             )
             total_rows_affected += cursor.rowcount
-            values_index += ROWS_PER_QUERY
+            values_index += batch_size
             logger.debug("Committing changes to MLWH database.")
             mysql_conn.commit()
 
@@ -103,6 +142,7 @@ def run_mysql_executemany_query(mysql_conn: CMySQLConnection, sql_query: str, va
             f"A total of {total_rows_affected} rows were affected in MLWH. (Note: each updated row "
             "increases the count by 2, instead of 1)"
         )
+        log_rows_per_second(num_values, time.perf_counter() - start)
     except Exception:
         logger.error("MLWH database executemany transaction failed")
         raise
@@ -116,6 +156,164 @@ def run_mysql_executemany_query(mysql_conn: CMySQLConnection, sql_query: str, va
         mysql_conn.close()
 
 
+def run_mysql_load_data_upsert(mysql_conn: CMySQLConnection, values: List[Dict[str, Any]]) -> None:
+    """Writes the sample testing information into the MLWH through a staging table, which is faster than multi-row
+    inserts for many rows: the rows are written to a file which is loaded into a temporary staging table with LOAD DATA
+    LOCAL INFILE, then inserted or updated from the staging table with a single statement, with the same rules as
+    SQL_MLWH_MULTIPLE_INSERT.
+
+    The connection must allow LOAD DATA LOCAL INFILE (see create_mysql_connection) and the server must have local_infile
+    enabled.
+
+    Arguments:
+        mysql_conn {CMySQLConnection} -- a client used to interact with the database server
+        values {List[Dict[str, Any]]} -- the MLWH rows of the samples, with a value for each of MLWH_SAMPLE_COLUMNS
+    """
+    cursor: CMySQLCursor = mysql_conn.cursor()
+    load_file_path = None
+
+    try:
+        start = time.perf_counter()
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", newline="", prefix="mlwh_samples_", suffix=".tsv", delete=False
+        ) as load_file:
+            load_file_path = load_file.name
+            for row in values:
+                load_file.write("\t".join(mysql_load_data_value(row[column]) for column in MLWH_SAMPLE_COLUMNS) + "\n")
+
+        logger.debug(f"Loading {len(values)} rows into the MLWH staging table")
+        cursor.execute(SQL_MLWH_CREATE_SAMPLES_STAGING_TABLE)
+        cursor.execute(SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE, (load_file_path,))
+
+        logger.debug("Inserting or updating the rows of the MLWH staging table")
+        cursor.execute(SQL_MLWH_UPSERT_SAMPLES_FROM_STAGING_TABLE)
+        logger.info(
+            f"A total of {cursor.rowcount} rows were affected in MLWH. (Note: each updated row "
+            "increases the count by 2, instead of 1)"
+        )
+
+        logger.debug("Committing changes to MLWH database.")
+        mysql_conn.commit()
+        log_rows_per_second(len(values), time.perf_counter() - start)
+    except Exception:
+        logger.error("MLWH database load data transaction failed")
+        raise
+    finally:
+        if load_file_path is not None and os.path.exists(load_file_path):
+            os.remove(load_file_path)
+
+        # a pooled connection is not closed when it is returned to the pool, so the staging table is dropped rather
+        # than kept filled until the connection's next file
+        try:
+            cursor.execute(SQL_MLWH_DROP_SAMPLES_STAGING_TABLE)
+        except Exception as e:
+            logger.warning(f"Failed dropping the MLWH staging table: {e}")
+
+        logger.debug("Closing the cursor.")
+        cursor.close()
+
+        logger.debug("Closing the MLWH database connection.")
+        mysql_conn.close()
+
+
+def get_max_allowed_packet(cursor: CMySQLCursor) -> int:
+    """The largest query the server accepts, in bytes.
+
+    Arguments:
+        cursor {CMySQLCursor} -- a cursor of the connection to the server
+
+    Returns:
+        int -- the server's max_allowed_packet, or DEFAULT_MAX_ALLOWED_PACKET if it cannot be read
+    """
+    try:
+        cursor.execute("SELECT @@max_allowed_packet")
+        row = cursor.fetchone()
+        if row is not None and (max_allowed_packet := int(cast(int, row[0]))) > 0:
+            return max_allowed_packet
+    except Exception as e:
+        logger.warning(f"Failed reading max_allowed_packet from the MLWH database: {e}")
+
+    return DEFAULT_MAX_ALLOWED_PACKET
+
+
+def rows_per_query(max_allowed_packet: int, sql_query: str, values: Sequence[Mapping[str, Any]]) -> int:
+    """The number of rows to write with each multi-row insert, so that each insert fills PACKET_FILL_RATIO of the
+    max_allowed_packet given the widest of the rows measured.
+
+    Arguments:
+        max_allowed_packet {int} -- the largest query the server accepts, in bytes
+        sql_query {str} -- the SQL query run for the rows
+        values {Sequence[Mapping[str, Any]]} -- the rows
+
+    Returns:
+        int -- the number of rows in each insert, at least 1
+    """
+    if not values:
+        return 1
+
+    step = max(1, len(values) // ROW_WIDTH_SAMPLE_SIZE)
+    row_width = max(estimate_row_width(row) for row in values[::step])
+
+    return max(1, int(max_allowed_packet * PACKET_FILL_RATIO - len(sql_query.encode())) // row_width)
+
+
+def estimate_row_width(row: Mapping[str, Any]) -> int:
+    """Estimates the size of a row in a multi-row insert: each value quoted or as NULL, between parentheses and
+    separated by commas. A string with characters which are escaped is underestimated, which PACKET_FILL_RATIO allows
+    for.
+
+    Arguments:
+        row {Mapping[str, Any]} -- the values of the row
+
+    Returns:
+        int -- the estimated size of the row, in bytes
+    """
+    width = len(row) + 2
+    for value in row.values():
+        if value is None:
+            width += 4
+        elif isinstance(value, datetime):
+            width += DATETIME_VALUE_WIDTH
+        else:
+            width += len(str(value).encode()) + 2
+
+    return width
+
+
+def mysql_load_data_value(value: Any) -> str:
+    """Formats a value as a field of a file loaded with LOAD DATA, with the default field and line terminators.
+
+    Arguments:
+        value {Any} -- the value
+
+    Returns:
+        str -- the field, with tabs, newlines and backslashes escaped, or \\N for NULL
+    """
+    if value is None:
+        return "\\N"
+
+    if isinstance(value, bool):
+        return "1" if value else "0"
+
+    if isinstance(value, datetime):
+        # the same format as the connector uses for a datetime in a query, without the timezone
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+def log_rows_per_second(num_rows: int, seconds: float) -> None:
+    logger.info(f"Wrote {num_rows} rows to the MLWH in {seconds:.2f}s ({num_rows / max(seconds, 1e-6):.0f} rows/sec)")
+
+
 def run_mysql_execute_formatted_query(
     mysql_conn: CMySQLConnection, formatted_sql_query: str, formatting_args: List[str], query_args: List[Any]
 ) -> None:
@@ -183,19 +381,347 @@ def run_mysql_execute_formatted_query(
         cursor.close()
 
 
-def create_mysql_connection_engine(connection_string: str, database: str = "") -> Engine:
+def create_mysql_connection_engine(connection_string: str, database: str = "", pool_size: int = 5) -> Engine:
     """Creates a SQLAlchemy engine from the connection string and optional database.
 
     Arguments:
         connection_string (str): connection string containing host, port, username and password.
         database (str, optional): name of the database to connect to. Defaults to "".
+        pool_size (int, optional): number of connections kept open by the engine. Defaults to 5.
 
     Returns:
         Engine: SQLAlchemy engine to use for querying the MySQL database.
     """
+    import sqlalchemy
+
     create_engine_string = f"mysql+pymysql://{connection_string}"
 
     if database:
         create_engine_string += f"/{database}"
 
-    return sqlalchemy.create_engine(create_engine_string, pool_recycle=3600)
+    return sqlalchemy.create_engine(create_engine_string, pool_recycle=3600, pool_size=pool_size)
+
+
+class PooledConnection:
+    """A connection borrowed from a MySQLConnectionPool. It is used like the CMySQLConnection it wraps, except that
+    closing it returns the connection to the pool rather than closing it.
+    """
+
+    def __init__(self, pool: "MySQLConnectionPool", connection: CMySQLConnection):
+        self._pool = pool
+        self._connection: Optional[CMySQLConnection] = connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Returns the connection to the pool; closing it again does nothing."""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+
+class MySQLConnectionPool:
+    """A pool of up to pool_size connections to a MySQL server, shared by the threads of a process.
+
+    Borrowing a connection reuses an idle one if there is one, opens one if fewer than pool_size are open and otherwise
+    waits for one to be returned. A returned connection has its session reset, which rolls back anything uncommitted
+    and drops temporary tables, before it is borrowed again.
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Optional[CMySQLConnection]], pool_size: int):
+        """Initialiser for a pool which opens connections when they are first needed.
+
+        Arguments:
+            name {str} -- the name of the pool, used in its stats
+            connect {Callable[[], Optional[CMySQLConnection]]} -- opens a connection, e.g. create_mysql_connection
+            pool_size {int} -- the maximum number of connections open at once
+        """
+        self.name = name
+        self.pool_size = max(1, pool_size)
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._idle: List[CMySQLConnection] = []
+
+        self.connections_created = 0
+        self.checkouts = 0
+        self.in_use = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def get_connection(self) -> CMySQLConnection:
+        """Borrows a connection, which is returned to the pool when it is closed.
+
+        Returns:
+            CMySQLConnection -- a connection, or what create_mysql_connection returned if a new connection could not be
+            opened (None or an unconnected connection), in which case nothing is borrowed
+        """
+        if not self._slots.acquire(blocking=False):
+            start = time.perf_counter()
+            self._slots.acquire()
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - start
+
+        try:
+            connection = self._idle_connection()
+            if connection is None:
+                connection = self._connect()
+                if connection is None or not connection.is_connected():
+                    self._slots.release()
+                    return cast("CMySQLConnection", connection)
+
+                with self._lock:
+                    self.connections_created += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+
+        # the wrapper is used in place of the connection by callers expecting a CMySQLConnection
+        return cast("CMySQLConnection", PooledConnection(self, connection))
+
+    def release(self, connection: CMySQLConnection) -> None:
+        """Returns a borrowed connection to the pool, closing it if its session cannot be reset.
+
+        Arguments:
+            connection {CMySQLConnection} -- the connection borrowed
+        """
+        try:
+            connection.cmd_reset_connection()
+            with self._lock:
+                self._idle.append(connection)
+        except Exception as e:
+            logger.warning(f"Closing a connection of the {self.name} pool which could not be reset: {e}")
+            close_quietly(connection)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def _idle_connection(self) -> Optional[CMySQLConnection]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()
+
+            # the server closes connections which have been idle for longer than its wait_timeout
+            if connection.is_connected():
+                return connection
+
+            close_quietly(connection)
+
+    def stats(self) -> Dict[str, float]:
+        """The use of the pool since it was created.
+
+        Returns:
+            Dict[str, float] -- the size of the pool, the connections open, idle and in use, the connections created
+            and borrowed and the number of times and total seconds spent waiting for a connection
+        """
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "open": len(self._idle) + self.in_use,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+            }
+
+    def close(self) -> None:
+        """Closes the idle connections; connections in use are closed when they are returned."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            close_quietly(connection)
+
+
+def close_quietly(connection: CMySQLConnection) -> None:
+    try:
+        connection.close()
+    except Exception as e:
+        logger.debug(f"Failed closing a MySQL connection: {e}")
+
+
+class MySQLConnectionProvider:
+    """The connections of a process to the MLWH server, which also hosts the events warehouse: a read-only and a
+    read-write pool of MySQL connections, and SQLAlchemy engines (which pool their own connections) for the pandas
+    queries across the two warehouses. Sharing them avoids opening connections for every file or migration query.
+
+    Use get_mysql_connection_provider rather than creating a provider, so that a process has one.
+    """
+
+    def __init__(self, config: Config):
+        """Initialiser for a provider which creates its pools and engines when they are first used.
+
+        Arguments:
+            config {Config} -- application config specifying database details
+        """
+        self.config = config
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pools: Dict[bool, MySQLConnectionPool] = {}
+        self._engines: Dict[bool, Engine] = {}
+
+    def connection(self, readonly: bool = True) -> CMySQLConnection:
+        """Borrows a connection to the MLWH database, which is returned to the pool when it is closed.
+
+        Read-write connections allow LOAD DATA LOCAL INFILE when MLWH_LOAD_DATA_MIN_ROWS is set, see
+        run_mysql_load_data_upsert.
+
+        Arguments:
+            readonly {bool} -- use the readonly credentials. Defaults to True.
+
+        Returns:
+            CMySQLConnection -- a connection, or None if a connection could not be opened
+        """
+        return self._pool(readonly).get_connection()
+
+    def engine(self, readonly: bool = True) -> Engine:
+        """The SQLAlchemy engine of the MLWH server, without a default database so that queries can join the MLWH and
+        events warehouse databases.
+
+        Arguments:
+            readonly {bool} -- use the readonly credentials. Defaults to True.
+
+        Returns:
+            Engine -- the engine shared by the process
+        """
+        with self._lock:
+            if (engine := self._engines.get(readonly)) is None:
+                config = self.config
+                if readonly:
+                    credentials = f"{config.MLWH_DB_RO_USER}:{config.MLWH_DB_RO_PASSWORD}"
+                else:
+                    credentials = f"{config.MLWH_DB_RW_USER}:{config.MLWH_DB_RW_PASSWORD}"
+
+                engine = self._engines[readonly] = create_mysql_connection_engine(
+                    f"{credentials}@{config.MLWH_DB_HOST}:{config.MLWH_DB_PORT}", pool_size=config.MLWH_POOL_SIZE
+                )
+
+        return engine
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """The use of the pools and engines created so far.
+
+        Returns:
+            Dict[str, Dict[str, Any]] -- the stats of each pool (see MySQLConnectionPool.stats) and the connections
+            open, idle and in use of each engine, by name
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            engines = dict(self._engines)
+
+        stats: Dict[str, Dict[str, Any]] = {pool.name: pool.stats() for pool in pools}
+        for readonly, engine in engines.items():
+            engine_pool = engine.pool
+            stats[f"mlwh_engine_{'ro' if readonly else 'rw'}"] = {
+                "pool_size": getattr(engine_pool, "size", lambda: 0)(),
+                "idle": getattr(engine_pool, "checkedin", lambda: 0)(),
+                "in_use": getattr(engine_pool, "checkedout", lambda: 0)(),
+            }
+
+        return stats
+
+    def log_stats(self) -> None:
+        for name, pool_stats in self.stats().items():
+            logger.info(f"MySQL pool {name}: " + ", ".join(f"{stat} {value}" for stat, value in pool_stats.items()))
+
+    def close(self) -> None:
+        """Closes the idle connections of the pools and engines."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+            engines, self._engines = list(self._engines.values()), {}
+
+        for pool in pools:
+            pool.close()
+        for engine in engines:
+            engine.dispose()
+
+    def _pool(self, readonly: bool) -> MySQLConnectionPool:
+        with self._lock:
+            if (pool := self._pools.get(readonly)) is None:
+                config = self.config
+                allow_local_infile = not readonly and config.MLWH_LOAD_DATA_MIN_ROWS > 0
+
+                def connect() -> Optional[CMySQLConnection]:
+                    return create_mysql_connection(config, readonly, allow_local_infile=allow_local_infile)
+
+                pool = self._pools[readonly] = MySQLConnectionPool(
+                    f"mlwh_{'ro' if readonly else 'rw'}", connect, config.MLWH_POOL_SIZE
+                )
+
+        return pool
+
+
+_connection_provider: Optional[MySQLConnectionProvider] = None
+_connection_provider_lock = threading.Lock()
+
+
+def get_mysql_connection_provider(config: Config) -> MySQLConnectionProvider:
+    """The MySQL connection provider of the process, which is created the first time it is used.
+
+    A provider created with another config is closed and replaced. A process forked from one with a provider creates
+    its own, as connections cannot be shared between processes.
+
+    Arguments:
+        config {Config} -- application config specifying database details
+
+    Returns:
+        MySQLConnectionProvider -- the provider of the process
+    """
+    global _connection_provider
+
+    with _connection_provider_lock:
+        provider = _connection_provider
+        if provider is None or provider.pid != os.getpid() or provider.config is not config:
+            if provider is not None and provider.pid == os.getpid():
+                provider.close()
+
+            provider = _connection_provider = MySQLConnectionProvider(config)
+
+    return provider
+
+
+def close_mysql_connection_provider() -> None:
+    """Closes the MySQL connection provider of the process, if there is one."""
+    global _connection_provider
+
+    with _connection_provider_lock:
+        provider, _connection_provider = _connection_provider, None
+
+    if provider is not None and provider.pid == os.getpid():
+        provider.close()
+
+
+def get_mysql_connection(config: Config, readonly: bool = True) -> CMySQLConnection:
+    """Borrows a connection to the MLWH database from the pools of the process. Closing the connection returns it to
+    the pool.
+
+    Arguments:
+        config {Config} -- application config specifying database details
+        readonly {bool} -- use the readonly credentials. Defaults to True.
+
+    Returns:
+        CMySQLConnection -- a connection, or None if a connection could not be opened
+    """
+    return get_mysql_connection_provider(config).connection(readonly)
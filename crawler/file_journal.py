@@ -0,0 +1,85 @@
+import logging
+from typing import Any, Dict, Final, Optional
+
+from bson import json_util
+
+from crawler.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+FILE_JOURNAL_FILE: Final[str] = "file_journal.sqlite3"
+
+SQL_CREATE_CHUNK_STAGES_TABLE = """\
+CREATE TABLE IF NOT EXISTS chunk_stages (
+    checksum TEXT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    chunk INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    details TEXT,
+    PRIMARY KEY (checksum, chunk_size, chunk, stage)
+)
+"""
+SQL_UPSERT_CHUNK_STAGE = "INSERT OR REPLACE INTO chunk_stages VALUES (?, ?, ?, ?, ?)"
+SQL_SELECT_CHUNK_STAGES = "SELECT chunk, stage, details FROM chunk_stages WHERE checksum = ? AND chunk_size = ?"
+SQL_DELETE_CHUNK_STAGES = "DELETE FROM chunk_stages WHERE checksum = ?"
+
+# the stages committed for each chunk of a file, with the details recorded for each stage, by chunk number
+CommittedStages = Dict[int, Dict[str, Optional[Dict[str, Any]]]]
+
+
+class FileJournal(SqliteStore):
+    """A journal of the writes committed while processing the files of a centre, so that a run which dies part way
+    through a file can be resumed rather than writing the whole file again.
+
+    The journal is a SQLite database stored in the centre's backups folder, next to the checksum index. A file is
+    parsed in chunks of the same samples every time it is processed, so each stage written for a chunk (e.g. its mongo
+    insert) is recorded by the checksum of the file, the chunk size and the number of the chunk. A stage is recorded
+    once it has been written, so a run which dies in between writes the chunk's stage again when resumed. The records
+    of a file are discarded once the file has been backed up.
+    """
+
+    FILE_NAME = FILE_JOURNAL_FILE
+    SCHEMA = (SQL_CREATE_CHUNK_STAGES_TABLE,)
+
+    def committed_stages(self, checksum: str, chunk_size: int) -> CommittedStages:
+        """The stages recorded for the chunks of a file. Nothing is returned for a file last processed in chunks of a
+        different size, as its chunks held different samples.
+
+        Arguments:
+            checksum {str} -- the checksum of the file
+            chunk_size {int} -- the number of samples in each chunk of the file
+
+        Returns:
+            CommittedStages -- the stages recorded for each chunk and their details
+        """
+        committed: CommittedStages = {}
+        for chunk, stage, details in self.fetch_all(SQL_SELECT_CHUNK_STAGES, (checksum, chunk_size)):
+            committed.setdefault(chunk, {})[stage] = json_util.loads(details) if details is not None else None
+
+        return committed
+
+    def commit(
+        self, checksum: str, chunk_size: int, chunk: int, stage: str, details: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record a stage written for a chunk of a file. The record is durable once this returns.
+
+        Arguments:
+            checksum {str} -- the checksum of the file
+            chunk_size {int} -- the number of samples in each chunk of the file
+            chunk {int} -- the number of the chunk, from 0
+            stage {str} -- the stage written, e.g. STAGE_MONGO_INSERT
+            details {Optional[Dict[str, Any]]} -- anything needed to resume the chunk after the stage, e.g. the ids of
+            the samples inserted; stored as extended JSON so mongo ids and decimals are kept
+        """
+        self.execute(
+            SQL_UPSERT_CHUNK_STAGE,
+            (checksum, chunk_size, chunk, stage, json_util.dumps(details) if details is not None else None),
+        )
+
+    def discard(self, checksum: str) -> None:
+        """Forget the stages recorded for a file, once it has been processed.
+
+        Arguments:
+            checksum {str} -- the checksum of the file
+        """
+        self.execute(SQL_DELETE_CHUNK_STAGES, (checksum,))
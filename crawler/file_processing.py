@@ -6,18 +6,21 @@ import re
 import shutil
 import uuid
 from csv import DictReader
-from datetime import datetime, timezone
-from decimal import Decimal
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 from hashlib import md5
 from logging import INFO, WARN
 from pathlib import Path
-from typing import Any, Dict, Final, List, Optional, Set, Tuple, cast
+from typing import Any, Dict, Final, Iterable, Iterator, List, Optional, Set, Tuple, cast
 
 from bson.decimal128 import Decimal128
-from more_itertools import groupby_transform
+from more_itertools import chunked, groupby_transform
+from pymongo import MongoClient
+from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.errors import BulkWriteError
 
+from crawler.checksum_index import ChecksumIndex
 from crawler.constants import (
     ALLOWED_CH_RESULT_VALUES,
     ALLOWED_CH_TARGET_VALUES,
@@ -40,38 +43,31 @@ from crawler.constants import (
     FIELD_CH4_CQ,
     FIELD_CH4_RESULT,
     FIELD_CH4_TARGET,
-    FIELD_COORDINATE,
-    FIELD_CREATED_AT,
     FIELD_DATE_TESTED,
-    FIELD_FILE_NAME,
-    FIELD_FILE_NAME_DATE,
-    FIELD_FILTERED_POSITIVE,
-    FIELD_FILTERED_POSITIVE_TIMESTAMP,
-    FIELD_FILTERED_POSITIVE_VERSION,
     FIELD_LAB_ID,
-    FIELD_LH_SAMPLE_UUID,
     FIELD_LH_SOURCE_PLATE_UUID,
-    FIELD_LINE_NUMBER,
     FIELD_MONGODB_ID,
     FIELD_PLATE_BARCODE,
     FIELD_RESULT,
     FIELD_RNA_ID,
     FIELD_RNA_PCR_ID,
     FIELD_ROOT_SAMPLE_ID,
-    FIELD_SOURCE,
-    FIELD_UPDATED_AT,
     FIELD_VIRAL_PREP_ID,
     MAX_CQ_VALUE,
     MIN_CQ_VALUE,
     POSITIVE_RESULT_VALUE,
+    SAMPLES_UNIQUE_FIELDS,
 )
+from crawler.date_tested_parser import DateTestedParser
 from crawler.db.dart import (
     add_dart_plate_if_doesnt_exist,
-    add_dart_well_properties_if_positive,
+    add_dart_plate_well_properties_if_positive,
     create_dart_sql_server_conn,
+    get_dart_plate_states,
 )
 from crawler.db.mongo import create_import_record, create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection, run_mysql_executemany_query
+from crawler.db.mysql import get_mysql_connection, run_mysql_executemany_query, run_mysql_load_data_upsert
+from crawler.file_journal import CommittedStages, FileJournal
 from crawler.filtered_positive_identifier import current_filtered_positive_identifier
 from crawler.helpers.enums import CentreFileState
 from crawler.helpers.general_helpers import (
@@ -82,8 +78,36 @@ from crawler.helpers.general_helpers import (
     pad_coordinate,
 )
 from crawler.helpers.logging_helpers import LoggingCollection
+from crawler.sample import Sample
+from crawler.sample_filter import SampleFilter, get_sample_filter
+from crawler.sample_writer import SampleWritePipeline
+from crawler.sftp_download import download_files
+from crawler.sftp_manifest import SftpManifest
 from crawler.sql_queries import SQL_MLWH_MULTIPLE_INSERT
-from crawler.types import CentreConf, CentreDoc, Config, CSVRow, ModifiedRow, RowSignature, SourcePlateDoc
+from crawler.stage_timer import (
+    STAGE_BACKUP,
+    STAGE_DART_INSERT,
+    STAGE_MLWH_INSERT,
+    STAGE_MONGO_INSERT,
+    STAGE_PARSE,
+    STAGE_SOURCE_PLATES,
+    STAGE_STATE_CHECK,
+    StageTimer,
+    write_prometheus_textfile,
+)
+from crawler.types import (
+    CentreConf,
+    CentreDoc,
+    ColumnPlan,
+    Config,
+    CSVRow,
+    ModifiedRow,
+    RemoteFile,
+    RowSignature,
+    SampleDoc,
+    SampleFileDetails,
+    SourcePlateDoc,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -93,17 +117,53 @@ REGEX_FIELD = "sftp_file_regex"
 ERRORS_DIR = "errors"
 SUCCESSES_DIR = "successes"
 
+# number of failed writes looked up in the samples collection with each query when classifying duplicates
+DUPLICATES_LOOKUP_BATCH_SIZE: Final = 1000
+
 
 class Centre:
-    def __init__(self, config: Config, centre_config: CentreConf):
+    def __init__(self, config: Config, centre_config: CentreConf, mongo_client: Optional[MongoClient] = None):
+        """Initialiser for the class representing a lighthouse centre.
+
+        Arguments:
+            config {Config} -- application config
+            centre_config {CentreConf} -- the config of the centre
+            mongo_client {Optional[MongoClient]} -- the mongo client shared by the run; if not given, the centre creates
+            its own client the first time it is needed
+        """
         self.config = config
         self.centre_config = centre_config
         self.is_download_dir_walkable = False
+        self._mongo_client = mongo_client
 
         # create backup directories for files
         os.makedirs(f"{self.centre_config['backups_folder']}/{ERRORS_DIR}", exist_ok=True)
         os.makedirs(f"{self.centre_config['backups_folder']}/{SUCCESSES_DIR}", exist_ok=True)
 
+        # index of the checksums of the backed up files, used to find files which have already been processed
+        self.checksum_index = ChecksumIndex(self.centre_config["backups_folder"], (ERRORS_DIR, SUCCESSES_DIR))
+
+        # journal of the chunks written for the files being processed, used to resume a file after a run dies
+        self.file_journal = FileJournal(self.centre_config["backups_folder"])
+
+        # manifest of the processed files on the SFTP server, used to only download new or changed files
+        self.sftp_manifest = SftpManifest(self.centre_config["backups_folder"])
+        self.downloaded_files: Dict[str, RemoteFile] = {}
+
+        # time taken by each stage of processing the centre's files, summed over the files processed
+        self.stage_timer = StageTimer()
+
+    def get_mongo_client(self) -> MongoClient:
+        """The mongo client used for all the files of the centre.
+
+        Returns:
+            MongoClient -- the client shared by the run, or one created for this centre
+        """
+        if self._mongo_client is None:
+            self._mongo_client = create_mongo_client(self.config)
+
+        return self._mongo_client
+
     def get_files_in_download_dir(self) -> List[str]:
         """Get all the files in the download directory for this centre and filter the file names using the regex
         described in the centre's 'regex_field'.
@@ -150,6 +210,9 @@ class Centre:
             add_to_dart {bool} -- whether to add the samples to DART
         """
         self.centre_files = sorted(self.get_files_in_download_dir())
+        files_processed = 0
+        # the centre may be kept between runs by a daemon, so the timings are of this run only
+        self.stage_timer = StageTimer()
 
         # iterate through each file in the centre
         for file_name in self.centre_files:
@@ -158,28 +221,42 @@ class Centre:
             # create an instance of the file class to handle the file
             centre_file = CentreFile(file_name, self)
 
-            centre_file.set_state_for_file()
+            with centre_file.stage_timer.time(STAGE_STATE_CHECK):
+                centre_file.set_state_for_file()
             logger.debug(f"File state: {CentreFileState[centre_file.file_state.name]}")
 
             # Process depending on file state
             if centre_file.file_state == CentreFileState.FILE_IN_BLACKLIST:
                 logger.debug("File in blacklist, skipping")
-                # next file
+                # next file, without recording it as processed in case it is taken off the blacklist
                 continue
             elif centre_file.file_state == CentreFileState.FILE_NOT_PROCESSED_YET:
                 # process it
                 centre_file.process_samples(add_to_dart)
+                self.stage_timer.add(centre_file.stage_timer)
+                files_processed += 1
             elif centre_file.file_state == CentreFileState.FILE_PROCESSED_WITH_ERROR:
                 logger.debug("File already processed as errored, skipping")
-                # next file
-                continue
             elif centre_file.file_state == CentreFileState.FILE_PROCESSED_WITH_SUCCESS:
                 logger.debug("File already processed successfully, skipping")
-                # next file
-                continue
             else:
                 # error unrecognised
                 logger.error(f"Unrecognised file state: {centre_file.file_state.name}")
+                # next file
+                continue
+
+            # the file will not be downloaded again by an incremental sync unless it changes on the SFTP server
+            if (remote_file := self.downloaded_files.get(file_name)) is not None:
+                self.sftp_manifest.add(remote_file)
+
+        if self.config.PROMETHEUS_TEXTFILE_DIR:
+            write_prometheus_textfile(
+                self.config.PROMETHEUS_TEXTFILE_DIR,
+                self.centre_config["prefix"],
+                self.centre_config["name"],
+                self.stage_timer,
+                files_processed,
+            )
 
     def get_download_dir(self) -> str:
         """Get the download directory where the files from the SFTP are stored.
@@ -192,6 +269,7 @@ class Centre:
     def download_csv_files(self) -> None:
         """Downloads the centre's file from the SFTP server"""
         logger.info("Downloading CSV file(s) from SFTP")
+        self.downloaded_files = {}
 
         logger.debug("Create download directory for centre")
         try:
@@ -199,16 +277,54 @@ class Centre:
         except FileExistsError:
             pass
 
+        if self.config.SFTP_INCREMENTAL_SYNC:
+            self.sync_csv_files()
+        else:
+            with get_sftp_connection(self.config) as sftp:
+                logger.debug("Connected to SFTP")
+                logger.debug("Listing centre's root directory")
+                logger.debug(f"ls: {sftp.listdir(self.centre_config['sftp_root_read'])}")
+
+                # downloads all files
+                logger.info("Downloading CSV files...")
+                sftp.get_d(self.centre_config["sftp_root_read"], self.get_download_dir())
+
+        return None
+
+    def sync_csv_files(self) -> None:
+        """Downloads the centre's files from the SFTP server which match the centre's 'sftp_file_regex' and are new or
+        have changed since they were last processed, according to the centre's SFTP manifest. The files which were
+        already processed are skipped without being transferred; the others are downloaded concurrently by up to
+        SFTP_DOWNLOAD_WORKERS workers.
+        """
+        sftp_root_read = self.centre_config["sftp_root_read"]
+        pattern = re.compile(self.centre_config[REGEX_FIELD])
+        processed_files = self.sftp_manifest.processed_files()
+
         with get_sftp_connection(self.config) as sftp:
             logger.debug("Connected to SFTP")
             logger.debug("Listing centre's root directory")
-            logger.debug(f"ls: {sftp.listdir(self.centre_config['sftp_root_read'])}")
-
-            # downloads all files
-            logger.info("Downloading CSV files...")
-            sftp.get_d(self.centre_config["sftp_root_read"], self.get_download_dir())
+            remote_files = [
+                RemoteFile(attrs.filename, attrs.st_size, attrs.st_mtime)
+                for attrs in sftp.listdir_attr(sftp_root_read)
+                if pattern.match(attrs.filename)
+            ]
+
+        files_to_download = [remote_file for remote_file in remote_files if remote_file not in processed_files]
+        logger.info(
+            f"Downloading {len(files_to_download)} new or changed CSV file(s), skipping "
+            f"{len(remote_files) - len(files_to_download)} already processed"
+        )
 
-        return None
+        transfers = download_files(
+            self.config,
+            sftp_root_read,
+            self.get_download_dir(),
+            files_to_download,
+            self.config.SFTP_DOWNLOAD_WORKERS,
+        )
+        for transfer in transfers:
+            self.downloaded_files[transfer.remote_file.file_name] = transfer.remote_file
 
 
 class CentreFile:
@@ -259,9 +375,21 @@ class CentreFile:
         self.centre_config = centre.centre_config
         self.file_name = file_name
         self.file_state = CentreFileState.FILE_UNCHECKED
+        self._checksum: Optional[str] = None
+        self._column_plans: Dict[Tuple[str, ...], ColumnPlan] = {}
+        self.date_tested_parser = DateTestedParser()
+        # the Cq values converted to Decimal128, or None for those which are not numbers
+        self._cq_values: Dict[str, Optional[Decimal128]] = {}
+        self._sample_file_details: Optional[SampleFileDetails] = None
+        self.stage_timer = StageTimer()
 
         self.docs_inserted = 0
 
+        # the stages of each chunk written by an earlier run which died part way through the file
+        self.committed_stages: CommittedStages = {}
+        # the errors found assigning source plates to and inserting the current chunk into mongo
+        self._mongo_insert_errors: List[Tuple[str, Any]] = []
+
         # These headers are required in ALL files from ALL lighthouses
         self.required_fields = {
             FIELD_ROOT_SAMPLE_ID,
@@ -283,49 +411,44 @@ class CentreFile:
         return PROJECT_ROOT.joinpath(f"{self.centre.get_download_dir()}{self.file_name}")
 
     def checksum(self) -> str:
-        """Returns the checksum for the file
+        """Returns the checksum for the file. The file does not change while it is processed so the checksum is only
+        calculated once.
 
         Returns:
             str -- the checksum for the file
         """
-        with open(self.filepath(), "rb") as file:
-            file_hash = md5()
-            while chunk := file.read(8192):
-                file_hash.update(chunk)
+        if self._checksum is None:
+            with open(self.filepath(), "rb") as file:
+                file_hash = md5()
+                while chunk := file.read(8192):
+                    file_hash.update(chunk)
+
+            self._checksum = file_hash.hexdigest()
 
-        return file_hash.hexdigest()
+        return self._checksum
 
     def checksum_match(self, dir_path: str) -> bool:
-        """Checks a directory for a file matching the checksum of this file
+        """Checks the checksum index of a backup directory for a file matching the checksum of this file
 
         Arguments:
-            dir_path {str} -> the directory path to be checked
+            dir_path {str} -> the backup directory to be checked
 
         Returns:
             boolean -- whether the file matches or not
         """
-        regexp = re.compile(r"^([\d]{6}_[\d]{4})_(.*)_(\w*)$")
-
         checksum_for_file = self.checksum()
         logger.debug(f"Checksum for file = {checksum_for_file}")
 
-        backup_folder = f"{self.centre_config['backups_folder']}/{dir_path}"
-        files_from_backup_folder = os.listdir(backup_folder)
+        if not (backup_filenames := self.centre.checksum_index.find_file_names(dir_path, checksum_for_file)):
+            return False
 
-        for backup_copy_file in files_from_backup_folder:
-            if matches := regexp.match(backup_copy_file):
-                # backup_timestamp = matches.group(1)
-                backup_filename = matches.group(2)
-                backup_checksum = matches.group(3)
+        if self.file_name not in backup_filenames:
+            logger.warning(
+                f"Found an identical file {backup_filenames[0]} in path {dir_path} which has the same checksum "
+                "but a different filename"
+            )
 
-                if checksum_for_file == backup_checksum:
-                    if backup_filename != self.file_name:
-                        logger.warning(
-                            f"Found an identical file {backup_filename} in path {dir_path} which has the same checksum "
-                            "but a different filename"
-                        )
-                    return True
-        return False
+        return True
 
     def get_centre_from_db(self) -> CentreDoc:
         """Gets a document from the mongo centre collection which describes a lighthouse centre.
@@ -378,40 +501,206 @@ class CentreFile:
         """
         logger.info("Processing samples")
 
-        # Internally traps TYPE 2: missing headers and TYPE 10 malformed files and returns
-        docs_to_insert = self.process_csv()
+        num_docs_to_insert = 0
+        chunk_size = self.config.FILE_PROCESSING_CHUNK_SIZE
+
+        # the file is resumed from the chunks written by a run which died part way through it, if there was one
+        self.committed_stages = self.centre.file_journal.committed_stages(self.checksum(), chunk_size)
+        if self.committed_stages:
+            logger.info(f"Resuming file {self.file_name} from the {len(self.committed_stages)} chunks in its journal")
+
+        # the rows of the file are parsed and written to the databases in chunks so that the memory used does not grow
+        # with the size of the file
+        # Internally traps TYPE 2: missing headers and TYPE 10 malformed files and stops yielding chunks
+        # each chunk is written to the MLWH and DART in the background once it has been inserted into mongo, while the
+        # next chunk is parsed and inserted
+        sample_writer = SampleWritePipeline(
+            self.write_docs_to_mlwh,
+            self.write_docs_to_dart if add_to_dart else None,
+            self.config.SAMPLE_WRITE_QUEUE_SIZE,
+            self.record_chunk_written,
+        )
+        with sample_writer:
+            chunks = self.process_csv(chunk_size)
+            for chunk, samples in enumerate(self.stage_timer.time_iteration(STAGE_PARSE, chunks)):
+                num_docs_to_insert += self.insert_docs(samples, sample_writer, chunk)
 
         if self.logging_collection.get_count_of_all_errors_and_criticals() > 0:
             logger.error(f"Errors present in file {self.file_name}")
         else:
             logger.info(f"File {self.file_name} is valid")
 
+        if num_docs_to_insert == 0:
+            logger.info("No new docs to insert")
+
+        with self.stage_timer.time(STAGE_BACKUP):
+            self.backup_file()
+
+        # the file will not be processed again now that its checksum is in the checksum index
+        self.centre.file_journal.discard(self.checksum())
+
+        logger.info(f"Stage timings for file {self.file_name}: {self.stage_timer.summary()}")
+        self.create_import_record_for_file()
+
+    def insert_docs(
+        self, samples: List[Sample], sample_writer: SampleWritePipeline, chunk: Optional[int] = None
+    ) -> int:
+        """Assigns source plates to a chunk of parsed samples and inserts them into mongo, then submits the samples
+        inserted to be written to the MLWH and optionally, DART.
+
+        If the chunk was inserted into mongo by an earlier run of the file, the insert is not repeated: see
+        resume_docs.
+
+        Arguments:
+            samples {List[Sample]} -- a chunk of the parsed and formatted samples of the file
+            sample_writer {SampleWritePipeline} -- writes the samples inserted into mongo to the MLWH and DART
+            chunk {Optional[int]} -- the number of the chunk in the file, to record the writes of in the file journal.
+            Defaults to None, to not record them.
+
+        Returns:
+            int -- the number of docs which were attempted to be inserted after assigning source plates
+        """
+        if chunk is not None and (mongo_insert := self.committed_stages.get(chunk, {}).get(STAGE_MONGO_INSERT)):
+            return self.resume_docs(chunk, mongo_insert, sample_writer)
+
+        self._mongo_insert_errors = []
+
+        # the samples are only converted to documents when they are written to the databases
+        docs_to_insert = [sample.to_mongo_doc() for sample in samples]
+
         # Internally traps TYPE 26 failed assigning source plate UUIDs error and returns []
-        docs_to_insert = self.docs_to_insert_updated_with_source_plate_uuids(docs_to_insert)
+        with self.stage_timer.time(STAGE_SOURCE_PLATES) as stage_timing:
+            docs_to_insert = self.docs_to_insert_updated_with_source_plate_uuids(docs_to_insert)
+            stage_timing.rows += len(docs_to_insert)
 
+        inserted_ids: List[Any] = []
         if (num_docs_to_insert := len(docs_to_insert)) > 0:
             logger.debug(f"{num_docs_to_insert} docs to insert")
 
-            mongo_ids_of_inserted = self.insert_samples_from_docs_into_mongo_db(docs_to_insert)
+            with self.stage_timer.time(STAGE_MONGO_INSERT) as stage_timing:
+                inserted_ids = self.insert_samples_from_docs_into_mongo_db(docs_to_insert)
+                stage_timing.rows += len(inserted_ids)
+
+        # an insert which failed without inserting a sample or finding an error in the samples is tried again when
+        # the file is resumed
+        if chunk is not None and (inserted_ids or self._mongo_insert_errors):
+            self.record_chunk_written(
+                chunk,
+                STAGE_MONGO_INSERT,
+                {
+                    "docs_to_insert": num_docs_to_insert,
+                    "inserted_ids": inserted_ids,
+                    "errors": self._mongo_insert_errors,
+                },
+            )
 
-            if len(mongo_ids_of_inserted) > 0:
-                # Filter out docs which failed to insert into mongo - we don't want to create MLWH records for these.
-                docs_to_insert_mlwh = list(
-                    filter(lambda x: x[FIELD_MONGODB_ID] in mongo_ids_of_inserted, docs_to_insert)
-                )
+        if len(mongo_ids_of_inserted := set(inserted_ids)) > 0:
+            # Filter out docs which failed to insert into mongo - we don't want to create MLWH records for these.
+            docs_to_insert_mlwh = [doc for doc in docs_to_insert if doc[FIELD_MONGODB_ID] in mongo_ids_of_inserted]
 
-                mlwh_success = self.insert_samples_from_docs_into_mlwh(docs_to_insert_mlwh)
+            # added to the DART database once we have successfully updated the MLWH, if adding to DART
+            sample_writer.submit(docs_to_insert_mlwh, chunk)
 
-                # add to the DART database if the config flag is set and we have successfully updated the MLWH
-                if add_to_dart and mlwh_success:
-                    logger.info("MLWH insert successful and adding to DART")
+        return num_docs_to_insert
 
-                    self.insert_plates_and_wells_from_docs_into_dart(docs_to_insert_mlwh)
-        else:
-            logger.info("No new docs to insert")
+    def resume_docs(self, chunk: int, mongo_insert: Dict[str, Any], sample_writer: SampleWritePipeline) -> int:
+        """Resumes a chunk which an earlier run of the file inserted into mongo, from the file journal. The errors found
+        inserting the chunk are added again and the samples inserted are fetched from mongo to be written to the MLWH
+        and DART, unless they were already written to both. The MLWH insert is an upsert, so a chunk written to the
+        MLWH but not DART is written to both again.
 
-        self.backup_file()
-        self.create_import_record_for_file()
+        Arguments:
+            chunk {int} -- the number of the chunk in the file
+            mongo_insert {Dict[str, Any]} -- the details of the mongo insert recorded in the file journal
+            sample_writer {SampleWritePipeline} -- writes the samples inserted into mongo to the MLWH and DART
+
+        Returns:
+            int -- the number of docs which were attempted to be inserted after assigning source plates
+        """
+        for error_type, message in mongo_insert["errors"]:
+            self.logging_collection.add_error(error_type, message)
+
+        inserted_ids = mongo_insert["inserted_ids"]
+        self.docs_inserted += len(inserted_ids)
+
+        committed_stages = self.committed_stages[chunk]
+        written = STAGE_MLWH_INSERT in committed_stages and (
+            sample_writer.write_dart is None or STAGE_DART_INSERT in committed_stages
+        )
+
+        if inserted_ids and not written:
+            samples_collection = get_mongo_collection(self.get_db(), COLLECTION_SAMPLES)
+            docs_by_id = {
+                doc[FIELD_MONGODB_ID]: doc for doc in samples_collection.find({FIELD_MONGODB_ID: {"$in": inserted_ids}})
+            }
+
+            sample_writer.submit([docs_by_id[mongo_id] for mongo_id in inserted_ids if mongo_id in docs_by_id], chunk)
+
+        return cast(int, mongo_insert["docs_to_insert"])
+
+    def record_chunk_written(self, chunk: int, stage: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """Records a stage of a chunk of the file as written in the file journal.
+
+        Arguments:
+            chunk {int} -- the number of the chunk in the file
+            stage {str} -- the stage written, e.g. STAGE_MONGO_INSERT
+            details {Optional[Dict[str, Any]]} -- anything needed to resume the chunk after the stage. Defaults to None.
+        """
+        self.centre.file_journal.commit(self.checksum(), self.config.FILE_PROCESSING_CHUNK_SIZE, chunk, stage, details)
+
+    def add_mongo_insert_error(self, error_type: str, message: Any) -> None:
+        """Adds an error found assigning source plates to or inserting the current chunk into mongo, which is recorded
+        with the chunk in the file journal so a resumed run reports it again.
+
+        Arguments:
+            error_type {str} -- the type of the error, e.g. "TYPE 6"
+            message {Any} -- the message of the error
+        """
+        self.logging_collection.add_error(error_type, message)
+        self._mongo_insert_errors.append((error_type, message))
+
+    def write_docs_to_mlwh(self, docs_to_insert: List[SampleDoc]) -> bool:
+        """Inserts a chunk of samples into the MLWH, recording the time taken.
+
+        Arguments:
+            docs_to_insert {List[SampleDoc]} -- the samples inserted into mongo, including their mongo ids
+
+        Returns:
+            bool -- True if the insert was successful; otherwise False
+        """
+        with self.stage_timer.time(STAGE_MLWH_INSERT) as stage_timing:
+            if mlwh_success := self.insert_samples_from_docs_into_mlwh(docs_to_insert):
+                stage_timing.rows += len(docs_to_insert)
+
+        return mlwh_success
+
+    def write_docs_to_dart(self, docs_to_insert: List[SampleDoc]) -> bool:
+        """Inserts the plates and wells of a chunk of samples into DART, recording the time taken.
+
+        Arguments:
+            docs_to_insert {List[SampleDoc]} -- the samples successfully inserted into mongo and the MLWH
+
+        Returns:
+            bool -- True if all the plates were inserted; otherwise False
+        """
+        logger.info("MLWH insert successful and adding to DART")
+
+        with self.stage_timer.time(STAGE_DART_INSERT) as stage_timing:
+            dart_success = self.insert_plates_and_wells_from_docs_into_dart(docs_to_insert)
+            stage_timing.rows += len(docs_to_insert)
+
+        return dart_success
+
+    def backup_dir(self) -> str:
+        """The backup directory for the file, depending on whether there were errors processing it.
+
+        Returns:
+            str -- the backup directory in the centre's backups folder
+        """
+        if self.logging_collection.get_count_of_all_errors_and_criticals() > 0:
+            return ERRORS_DIR
+        else:
+            return SUCCESSES_DIR
 
     def backup_filename(self) -> str:
         """Backup the file.
@@ -419,10 +708,7 @@ class CentreFile:
         Returns:
             str -- the filepath of the file backup
         """
-        if self.logging_collection.get_count_of_all_errors_and_criticals() > 0:
-            return f"{self.centre_config['backups_folder']}/{ERRORS_DIR}/{self.timestamped_filename()}"
-        else:
-            return f"{self.centre_config['backups_folder']}/{SUCCESSES_DIR}/{self.timestamped_filename()}"
+        return f"{self.centre_config['backups_folder']}/{self.backup_dir()}/{self.timestamped_filename()}"
 
     def timestamped_filename(self) -> str:
         return f"{current_time()}_{self.file_name}_{self.checksum()}"
@@ -431,11 +717,15 @@ class CentreFile:
         return PROJECT_ROOT.joinpath(self.centre.get_download_dir(), self.file_name)
 
     def backup_file(self) -> None:
-        """Backup the file."""
+        """Backup the file and record its checksum in the centre's checksum index."""
         destination = self.backup_filename()
 
         shutil.copyfile(self.full_path_to_file(), destination)
 
+        self.centre.checksum_index.add(
+            self.backup_dir(), self.checksum(), self.file_name, os.path.basename(destination)
+        )
+
     def create_import_record_for_file(self) -> None:
         """Writes to the imports collection with information about the CSV file processed."""
         imports_collection = get_mongo_collection(self.get_db(), COLLECTION_IMPORTS)
@@ -446,21 +736,21 @@ class CentreFile:
             self.docs_inserted,
             self.file_name,
             self.logging_collection.get_messages_for_import(),
+            self.stage_timer.to_doc(),
         )
 
     def get_db(self) -> Database:
-        """Fetch the mongo database.
+        """Fetch the mongo database using the centre's mongo client.
 
         Returns:
             Database -- a reference to the database in mongo
         """
-        client = create_mongo_client(self.config)
-        db = get_mongo_db(self.config, client)
-
-        return db
+        return get_mongo_db(self.config, self.centre.get_mongo_client())
 
     def add_duplication_errors(self, exception: BulkWriteError) -> None:
-        """Add errors to the logging collection when we have the BulkWriteError exception.
+        """Add errors to the logging collection when we have the BulkWriteError exception. The samples already in the
+        database are fetched in batches using the fields of the unique index and matched to the failed writes in memory,
+        rather than with a query for each failed write.
 
         Args:
             exception (BulkWriteError): Exception with all the failed writes.
@@ -468,39 +758,112 @@ class CentreFile:
         try:
             wrong_instances = [write_error["op"] for write_error in exception.details["writeErrors"]]
             samples_collection = get_mongo_collection(self.get_db(), COLLECTION_SAMPLES)
+
+            entries = self.samples_in_mongo_db(samples_collection, wrong_instances)
+
             for wrong_instance in wrong_instances:
-                # To identify TYPE 7 we need to do a search for
-                entry = samples_collection.find(
-                    {
-                        FIELD_ROOT_SAMPLE_ID: wrong_instance[FIELD_ROOT_SAMPLE_ID],
-                        FIELD_RNA_ID: wrong_instance[FIELD_RNA_ID],
-                        FIELD_RESULT: wrong_instance[FIELD_RESULT],
-                        FIELD_LAB_ID: wrong_instance[FIELD_LAB_ID],
-                    }
-                )[0]
-                if not (entry):
+                if (entry := entries.get(self.unique_fields(wrong_instance))) is None:
                     logger.critical(
                         f"When trying to insert root_sample_id: "
                         f"{wrong_instance[FIELD_ROOT_SAMPLE_ID]}, contents: {wrong_instance}"
                     )
                     continue
 
-                if entry[FIELD_DATE_TESTED] != wrong_instance[FIELD_DATE_TESTED]:
-                    self.logging_collection.add_error(
-                        "TYPE 7",
-                        f"Already in database, line: {wrong_instance['line_number']}, root sample "
-                        f"id: {wrong_instance['Root Sample ID']}, dates: "
-                        f"({entry[FIELD_DATE_TESTED]} != {wrong_instance[FIELD_DATE_TESTED]})",
-                    )
-                else:
-                    self.logging_collection.add_error(
-                        "TYPE 6",
-                        f"Already in database, line: {wrong_instance['line_number']}, root sample "
-                        f"id: {wrong_instance['Root Sample ID']}",
-                    )
+                self.add_duplication_error(wrong_instance, entry)
         except Exception as e:
             logger.critical(f"Unknown error with file {self.file_name}: {e}")
 
+    @staticmethod
+    def unique_fields(sample: Dict[str, Any]) -> Tuple[Any, ...]:
+        """The values of the fields of the unique index on the samples collection of a sample.
+
+        Arguments:
+            sample {Dict[str, Any]} -- the sample, as inserted into or read from the samples collection
+
+        Returns:
+            Tuple[Any, ...] -- the values of SAMPLES_UNIQUE_FIELDS
+        """
+        return tuple(sample.get(field) for field in SAMPLES_UNIQUE_FIELDS)
+
+    def samples_in_mongo_db(
+        self, samples_collection: Collection, samples: List[ModifiedRow]
+    ) -> Dict[Tuple[Any, ...], SampleDoc]:
+        """Fetches the samples in the database with the same values for the fields of the unique index as the given
+        samples, in batches.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection
+            samples {List[ModifiedRow]} -- the samples to look for
+
+        Returns:
+            Dict[Tuple[Any, ...], SampleDoc] -- the samples found, by the values of the fields of the unique index
+        """
+        entries: Dict[Tuple[Any, ...], SampleDoc] = {}
+        for batch in chunked(samples, DUPLICATES_LOOKUP_BATCH_SIZE):
+            # To identify TYPE 7 we need to do a search for the samples already in the database
+            for entry in samples_collection.find(
+                {"$or": [dict(zip(SAMPLES_UNIQUE_FIELDS, self.unique_fields(sample))) for sample in batch]},
+                projection=[*SAMPLES_UNIQUE_FIELDS, FIELD_DATE_TESTED],
+            ):
+                entries[self.unique_fields(entry)] = entry
+
+        return entries
+
+    def add_duplication_error(self, duplicate: ModifiedRow, entry: SampleDoc) -> None:
+        """Add the error for a sample which is already in the database: TYPE 7 if it was tested at a different time to
+        the sample in the database, otherwise TYPE 6.
+
+        Arguments:
+            duplicate {ModifiedRow} -- the sample which was not inserted
+            entry {SampleDoc} -- the sample already in the database
+        """
+        if entry[FIELD_DATE_TESTED] != duplicate[FIELD_DATE_TESTED]:
+            self.add_mongo_insert_error(
+                "TYPE 7",
+                f"Already in database, line: {duplicate['line_number']}, root sample "
+                f"id: {duplicate['Root Sample ID']}, dates: "
+                f"({entry[FIELD_DATE_TESTED]} != {duplicate[FIELD_DATE_TESTED]})",
+            )
+        else:
+            self.add_mongo_insert_error(
+                "TYPE 6",
+                f"Already in database, line: {duplicate['line_number']}, root sample "
+                f"id: {duplicate['Root Sample ID']}",
+            )
+
+    def docs_not_in_mongo_db(
+        self, samples_collection: Collection, sample_filter: SampleFilter, docs_to_insert: List[ModifiedRow]
+    ) -> List[ModifiedRow]:
+        """Removes the samples which are already in the database before they are inserted, adding their TYPE 6 or TYPE
+        7 errors. Only the samples found in the samples filter are looked up in the database, so a file of new samples
+        needs no queries. A sample missed by the filter is still not inserted because of the unique index, and its
+        error is added from the BulkWriteError.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection
+            sample_filter {SampleFilter} -- the filter of the samples in the database
+            docs_to_insert {List[ModifiedRow]} -- the samples to insert
+
+        Returns:
+            List[ModifiedRow] -- the samples which are not in the database
+        """
+        might_contain = sample_filter.might_contain(samples_collection, docs_to_insert)
+        probable_duplicates = [doc for doc, found in zip(docs_to_insert, might_contain) if found]
+        if not probable_duplicates:
+            return docs_to_insert
+
+        entries = self.samples_in_mongo_db(samples_collection, probable_duplicates)
+        logger.debug(f"{len(entries)} of {len(probable_duplicates)} samples found in the samples filter are duplicates")
+
+        new_docs = []
+        for doc in docs_to_insert:
+            if (entry := entries.get(self.unique_fields(doc))) is None:
+                new_docs.append(doc)
+            else:
+                self.add_duplication_error(doc, entry)
+
+        return new_docs
+
     def docs_to_insert_updated_with_source_plate_uuids(self, docs_to_insert: List[ModifiedRow]) -> List[ModifiedRow]:
         """Updates sample records with source plate UUIDs, returning only those for which a source plate UUID could
         be determined. Adds any new source plates to mongo.
@@ -526,31 +889,33 @@ class CentreFile:
                     f"Source plate barcode {row[FIELD_PLATE_BARCODE]} in file {self.file_name} "
                     f"already exists with different lab_id {existing_plate[FIELD_LAB_ID]}",
                 )
-                self.logging_collection.add_error("TYPE 25", error_message)
+                self.add_mongo_insert_error("TYPE 25", error_message)
                 logger.error(error_message)
 
         try:
             new_plates: List[SourcePlateDoc] = []
             source_plates_collection = get_mongo_collection(self.get_db(), COLLECTION_SOURCE_PLATES)
 
+            # fetch the plates that already exist in mongo with one query for all the plate barcodes in the docs
+            plate_barcodes = list({doc[FIELD_PLATE_BARCODE] for doc in docs_to_insert})
+            plates_by_barcode: Dict[Any, SourcePlateDoc] = {
+                plate[FIELD_BARCODE]: plate
+                for plate in source_plates_collection.find({FIELD_BARCODE: {"$in": plate_barcodes}})
+            }
+
             for doc in docs_to_insert:
                 plate_barcode = doc[FIELD_PLATE_BARCODE]
 
-                # first attempt an update from new plates (added for other samples in this file)
-                existing_new_plate = next((x for x in new_plates if x[FIELD_BARCODE] == plate_barcode), None)
-                if existing_new_plate is not None:
-                    update_doc_from_source_plate(doc, existing_new_plate)
-                    continue
-
-                # then attempt an update from plates that exist in mongo
-                existing_mongo_plate = source_plates_collection.find_one({FIELD_BARCODE: plate_barcode})
-                if existing_mongo_plate is not None:
-                    update_doc_from_source_plate(doc, existing_mongo_plate)
+                # first attempt an update from plates that exist in mongo or were added for other samples in this file
+                existing_plate = plates_by_barcode.get(plate_barcode)
+                if existing_plate is not None:
+                    update_doc_from_source_plate(doc, existing_plate)
                     continue
 
                 # then add a new plate
                 new_plate = create_source_plate_doc(str(plate_barcode), str(doc[FIELD_LAB_ID]))
                 new_plates.append(new_plate)
+                plates_by_barcode[plate_barcode] = new_plate
                 update_doc_from_source_plate(doc, new_plate, True)
 
             if (new_plates_count := len(new_plates)) > 0:
@@ -558,7 +923,7 @@ class CentreFile:
                 source_plates_collection.insert_many(new_plates, ordered=False)
 
         except Exception as e:
-            self.logging_collection.add_error(
+            self.add_mongo_insert_error(
                 "TYPE 26",
                 f"Failed assigning source plate UUIDs to samples in file {self.file_name}",
             )
@@ -577,13 +942,25 @@ class CentreFile:
         logger.debug(f"Attempting to insert {len(docs_to_insert)} docs")
 
         samples_collection = get_mongo_collection(self.get_db(), COLLECTION_SAMPLES)
+
+        if (sample_filter := get_sample_filter(self.config)) is not None:
+            try:
+                docs_to_insert = self.docs_not_in_mongo_db(samples_collection, sample_filter, docs_to_insert)
+            except Exception as e:
+                # the duplicates are found by the unique index instead
+                logger.error(f"Failed finding duplicates with the samples filter in file {self.file_name}: {e}")
+
+            if not docs_to_insert:
+                return []
+
         try:
             # Inserts new version for samples
             #  insert_many will add the '_id' field to each document inserted, making document["_id"] available
             # https://pymongo.readthedocs.io/en/stable/faq.html#writes-and-ids
             result = samples_collection.insert_many(docs_to_insert, ordered=False)
 
-            self.docs_inserted = len(result.inserted_ids)
+            self.docs_inserted += len(result.inserted_ids)
+            self.add_to_sample_filter(sample_filter, samples_collection, docs_to_insert)
 
             # inserted_ids is in the same order as docs_to_insert, even if the query has ordered=False parameter
             return list(result.inserted_ids)
@@ -606,7 +983,7 @@ class CentreFile:
                 )
                 logger.info(filtered_errors[0])
 
-            self.docs_inserted = e.details["nInserted"]
+            self.docs_inserted += e.details["nInserted"]
 
             self.add_duplication_errors(e)
 
@@ -621,18 +998,37 @@ class CentreFile:
                 """
                 return error["op"][FIELD_MONGODB_ID]
 
-            errored_ids = list(map(get_errored_ids, e.details["writeErrors"]))
+            errored_ids = set(map(get_errored_ids, e.details["writeErrors"]))
 
             logger.warning(f"{len(errored_ids)} records were not inserted")
 
-            inserted_ids = [doc[FIELD_MONGODB_ID] for doc in docs_to_insert if doc[FIELD_MONGODB_ID] not in errored_ids]
+            inserted_docs = [doc for doc in docs_to_insert if doc[FIELD_MONGODB_ID] not in errored_ids]
+            self.add_to_sample_filter(sample_filter, samples_collection, inserted_docs)
 
-            return inserted_ids
+            return [doc[FIELD_MONGODB_ID] for doc in inserted_docs]
         except Exception as e:
             logger.critical(f"Critical error in file {self.file_name}: {e}")
             logger.exception(e)
             return []
 
+    def add_to_sample_filter(
+        self, sample_filter: Optional[SampleFilter], samples_collection: Collection, docs: List[ModifiedRow]
+    ) -> None:
+        """Adds samples inserted into the database to the samples filter, if there is one.
+
+        Arguments:
+            sample_filter {Optional[SampleFilter]} -- the filter of the samples in the database
+            samples_collection {Collection} -- the samples collection
+            docs {List[ModifiedRow]} -- the samples inserted
+        """
+        if sample_filter is None:
+            return
+
+        try:
+            sample_filter.add(samples_collection, docs)
+        except Exception as e:
+            logger.error(f"Failed adding the samples of file {self.file_name} to the samples filter: {e}")
+
     def insert_samples_from_docs_into_mlwh(self, docs_to_insert: List[ModifiedRow]) -> bool:
         """Insert sample records into the MLWH database from the parsed file information, including the corresponding
         mongodb _id
@@ -648,11 +1044,18 @@ class CentreFile:
         for sample_doc in docs_to_insert:
             values.append(map_mongo_sample_to_mysql(sample_doc))
 
-        mysql_conn = create_mysql_connection(self.config, False)
+        load_data_min_rows = self.config.MLWH_LOAD_DATA_MIN_ROWS
+        use_load_data = 0 < load_data_min_rows <= len(values)
+
+        # a connection of the process's pool, which is returned to the pool when the query closes it
+        mysql_conn = get_mysql_connection(self.config, False)
 
         if mysql_conn is not None and mysql_conn.is_connected():
             try:
-                run_mysql_executemany_query(mysql_conn, SQL_MLWH_MULTIPLE_INSERT, values)
+                if use_load_data:
+                    run_mysql_load_data_upsert(mysql_conn, values)
+                else:
+                    run_mysql_executemany_query(mysql_conn, SQL_MLWH_MULTIPLE_INSERT, values)
 
                 logger.debug(f"MLWH database inserts completed successfully for file {self.file_name}")
                 return True
@@ -672,26 +1075,36 @@ class CentreFile:
 
         return False
 
-    def insert_plates_and_wells_from_docs_into_dart(self, docs_to_insert: List[ModifiedRow]) -> None:
+    def insert_plates_and_wells_from_docs_into_dart(self, docs_to_insert: List[ModifiedRow]) -> bool:
         """Insert plates and wells into the DART database.
 
         Arguments:
             docs_to_insert {List[ModifiedRow]} -- List of filtered sample information extracted from CSV files.
+
+        Returns:
+            {bool} -- True if all the plates were inserted; otherwise False
         """
         if (sql_server_connection := create_dart_sql_server_conn(self.config)) is not None:
+            dart_success = True
             try:
                 cursor = sql_server_connection.cursor()
 
+                # fetch the states of all the plates up front so only the missing plates cost a round trip each
+                plate_states = get_dart_plate_states(cursor, (str(doc[FIELD_PLATE_BARCODE]) for doc in docs_to_insert))
+
                 for plate_barcode, samples in groupby_transform(  # type: ignore
                     docs_to_insert, lambda x: x[FIELD_PLATE_BARCODE]
                 ):
                     try:
                         plate_state = add_dart_plate_if_doesnt_exist(
-                            cursor, plate_barcode, self.centre_config["biomek_labware_class"]  # type: ignore
+                            cursor,
+                            plate_barcode,
+                            self.centre_config["biomek_labware_class"],
+                            plate_states.get(plate_barcode),
                         )
+                        plate_states[plate_barcode] = plate_state
                         if plate_state == DART_STATE_PENDING:
-                            for sample in samples:
-                                add_dart_well_properties_if_positive(cursor, sample, plate_barcode)  # type: ignore
+                            add_dart_plate_well_properties_if_positive(cursor, samples, plate_barcode)
                         cursor.commit()
                     except Exception as e:
                         self.logging_collection.add_error(
@@ -701,8 +1114,10 @@ class CentreFile:
                         logger.exception(e)
                         # rollback statements executed since previous commit/rollback
                         cursor.rollback()
+                        dart_success = False
 
                 logger.debug(f"DART database inserts completed successfully for file {self.file_name}")
+                return dart_success
             except Exception as e:
                 self.logging_collection.add_error(
                     "TYPE 23",
@@ -719,11 +1134,19 @@ class CentreFile:
             )
             logger.critical(f"Error writing to DART for file {self.file_name}, could not create Database connection")
 
-    def process_csv(self) -> List[ModifiedRow]:
-        """Parses and processes the CSV file of the centre.
+        return False
 
-        Returns:
-            List[ModifiedRow] -- the augmented data
+    def process_csv(self, chunk_size: int) -> Iterator[List[Sample]]:
+        """Parses and processes the CSV file of the centre, yielding the samples in chunks. The file is read as
+        the chunks are consumed so only one chunk of rows is held in memory at a time.
+
+        If the file cannot be read part way through, the chunks already yielded are not retracted.
+
+        Arguments:
+            chunk_size {int} -- the maximum number of rows in each chunk
+
+        Yields:
+            List[Sample] -- a chunk of the samples
         """
         csvfile_path = self.filepath()
 
@@ -739,14 +1162,10 @@ class CentreFile:
                 # first check the required file headers are present
                 if self.check_for_required_headers(csvreader):
                     # then parse and format the rows in the file
-                    documents = self.parse_and_format_file_rows(csvreader)
-
-                    return documents
+                    yield from chunked(self.iter_parsed_file_rows(csvreader), chunk_size)
             except (csv.Error, UnicodeDecodeError):
                 self.logging_collection.add_error("TYPE 10", "Wrong read from file")
 
-        return []
-
     def remove_bom(self, csvreader: DictReader) -> None:
         """Checks if there's a byte order mark (BOM) and removes it if so.
         We can't assume that the incoming file will or will not have one, have to cope with both.
@@ -914,59 +1333,75 @@ class CentreFile:
                 modified_row[FIELD_LAB_ID] = self.centre_config["lab_id_default"]
                 self.log_adding_default_lab_id(row, line_number)
 
-        seen_headers: List[str] = []
-
-        # next check the row for values for each of the accepted fields (except for the CT fields) and copy them across
-        for key in self.ACCEPTED_FIELDS:
-            if key in row:
-                seen_headers.append(key)
-                modified_row[key] = row[key]
+        plan = self.column_plan(tuple(row))
 
-        # and check the row for values for any of the optional CT channel headers and copy them across
-        seen_headers, modified_row = self.extract_channel_fields(seen_headers, row, modified_row)
+        # next copy across the values of the accepted fields (except for the CT fields)
+        for key in plan.accepted_fields:
+            modified_row[key] = row[key]
 
-        # now check if we still have any columns left in the file row that we do not recognise
-        unexpected_headers = list(row.keys() - seen_headers)
+        # and copy across the values of the optional CT channel headers which are not blank
+        for csv_field, channel_field in plan.channel_fields:
+            if row[csv_field]:
+                modified_row[channel_field] = row[csv_field]
 
-        if len(unexpected_headers) > 0:
+        # now check if we have any columns in the file row that we do not recognise
+        if len(plan.unexpected_headers) > 0:
             self.logging_collection.add_error(
                 "TYPE 13",
                 f"Unexpected headers, line: {line_number}, "
                 f"root_sample_id: {row.get(FIELD_ROOT_SAMPLE_ID)}, "
-                f"extra headers: {unexpected_headers}",
+                f"extra headers: {plan.unexpected_headers}",
             )
 
         return modified_row
 
-    def extract_channel_fields(
-        self, seen_headers: List[str], csv_row: CSVRow, modified_row: ModifiedRow
-    ) -> Tuple[List[str], ModifiedRow]:
-        """Extract the channel fields by trying to match the header fields using regex.
+    def column_plan(self, headers: Tuple[str, ...]) -> ColumnPlan:
+        """Returns the plan mapping the columns of the file to the fields of a sample. The rows of a file all have the
+        same headers so the plan is only worked out once for each set of headers.
 
         Arguments:
-            seen_headers (List[str]): headers already seen in the file
-            csv_row (CSVRow): row from csv.DictReader
-            modified_row (ModifiedRow): row with updated fields
+            headers (Tuple[str, ...]): the headers of a row from csv.DictReader
 
         Returns:
-            Tuple[List[str], ModifiedRow]: updated seen_headers and modified_row
+            ColumnPlan: the accepted fields, channel fields and unexpected headers for rows with these headers
         """
+        if (plan := self._column_plans.get(headers)) is None:
+            seen_headers = [key for key in self.ACCEPTED_FIELDS if key in headers]
+            accepted_fields = tuple(seen_headers)
+            channel_fields = tuple(self.match_channel_headers(headers, seen_headers))
+
+            plan = ColumnPlan(accepted_fields, channel_fields, list(set(headers) - set(seen_headers)))
+            self._column_plans[headers] = plan
+
+        return plan
+
+    def match_channel_headers(self, headers: Iterable[str], seen_headers: List[str]) -> List[Tuple[str, str]]:
+        """Match the headers which have not been seen yet to the channel fields using regex.
+
+        Arguments:
+            headers (Iterable[str]): headers of the file
+            seen_headers (List[str]): headers already seen in the file, the matched headers are appended to it
+
+        Returns:
+            List[Tuple[str, str]]: the matched (header, channel field) pairs
+        """
+        matches: List[Tuple[str, str]] = []
+
         for channel_field, regex in self.get_channel_headers_mapping().items():
             pattern = re.compile(regex, re.IGNORECASE)
 
-            for csv_field in csv_row:
-                if csv_field in seen_headers:
+            for csv_field in headers:
+                # values without a header are under the None key
+                if csv_field is None or csv_field in seen_headers:
                     continue
 
                 if pattern.match(csv_field):
                     seen_headers.append(csv_field)
+                    matches.append((csv_field, channel_field))
 
-                    if csv_row[csv_field]:
-                        modified_row[channel_field] = csv_row[csv_field]
-
-        return seen_headers, modified_row
+        return matches
 
-    def parse_and_format_file_rows(self, csvreader: DictReader) -> List[ModifiedRow]:
+    def parse_and_format_file_rows(self, csvreader: DictReader) -> List[SampleDoc]:
         """Attempts to parse and format the file rows
            Adds additional derived and calculated fields to the imported rows that will aid querying
            later. Filters out blank rows, duplicated rows, and rows with values failing various
@@ -977,23 +1412,31 @@ class CentreFile:
             csvreader {DictReader} -- CSV file reader to iterate over
 
         Returns:
-            List[ModifiedRow] -- list of errors and the augmented data
+            List[SampleDoc] -- the documents of the augmented data
         """
-        logger.debug("Adding extra fields")
+        return [sample.to_mongo_doc() for sample in self.iter_parsed_file_rows(csvreader)]
+
+    def iter_parsed_file_rows(self, csvreader: DictReader) -> Iterator[Sample]:
+        """Parses and formats the file rows as they are read, see parse_and_format_file_rows.
 
-        verified_rows: List[ModifiedRow] = []
+        Arguments:
+            csvreader {DictReader} -- CSV file reader to iterate over
+
+        Yields:
+            Sample -- the sample of each valid row
+        """
+        logger.debug("Adding extra fields")
 
         # Detect duplications and filters them out
         seen_rows: Set[RowSignature] = set()
         failed_validation_count = 0
         invalid_rows_count = 0
-        line_number = 2
 
-        for row in csvreader:
+        for line_number, row in enumerate(csvreader, start=2):
             # only process rows that have at least a minimum level of data
             if self.row_required_fields_present(row, line_number):
-                if parsed_row := self.parse_and_format_row(row, line_number, seen_rows):
-                    verified_rows.append(parsed_row)
+                if sample := self.parse_and_format_row(row, line_number, seen_rows):
+                    yield sample
                 else:
                     # this counter catches rows where field validation failed
                     failed_validation_count += 1
@@ -1001,8 +1444,6 @@ class CentreFile:
                 # this counter catches blank rows and rows with empty fields
                 invalid_rows_count += 1
 
-            line_number += 1
-
         logger.log(
             INFO if invalid_rows_count == 0 else WARN,
             f"Rows with invalid structure in this file = {invalid_rows_count}",
@@ -1011,12 +1452,9 @@ class CentreFile:
             INFO if failed_validation_count == 0 else WARN,
             f"Rows that failed validation in this file = {failed_validation_count}",
         )
+        logger.info(f"Date tested formats in this file = {self.date_tested_parser.formats_used()}")
 
-        return verified_rows
-
-    def parse_and_format_row(
-        self, row: CSVRow, line_number: int, seen_rows: Set[RowSignature]
-    ) -> Optional[ModifiedRow]:
+    def parse_and_format_row(self, row: CSVRow, line_number: int, seen_rows: Set[RowSignature]) -> Optional[Sample]:
         """Parses a single row and runs validations on content.
 
         Arguments:
@@ -1025,7 +1463,7 @@ class CentreFile:
             seen_rows {tuple} - row signature of key values, used to exclude duplicates
 
         Returns:
-            modified_row {Optional[ModifiedRow]} - modified filtered and formatted version of the row
+            Optional[Sample] - the sample of the row, or None if the row is not imported
         """
         # ---- create new row dict with just the recognized columns ----
         modified_row = self.filtered_row(row, line_number)
@@ -1033,81 +1471,146 @@ class CentreFile:
         # ---- check if this row has already been seen in this file, based on key fields ----
         row_signature = self.create_row_signature(modified_row)
 
+        if self.is_duplicate_row(modified_row, line_number, row_signature, seen_rows):
+            return None
+
+        if not self.validate_row(modified_row, line_number):
+            return None
+
+        # ---- add a few additional, computed or derived fields ----
+        if (sample := self.create_sample(modified_row, line_number)) is None:
+            return None
+
+        # ---- store row signature to allow checking for duplicates in following rows ----
+        seen_rows.add(row_signature)
+
+        return sample
+
+    def is_duplicate_row(
+        self, row: ModifiedRow, line_number: int, row_signature: RowSignature, seen_rows: Set[RowSignature]
+    ) -> bool:
+        """Checks if a row with the same key fields has already been seen in this file.
+
+        Arguments:
+            row {ModifiedRow} - modified filtered and formatted version of the row
+            line_number {int} - line number within the file
+            row_signature {RowSignature} - signature of the key values of the row
+            seen_rows {Set[RowSignature]} - signatures of the rows already seen
+
+        Returns:
+            bool - whether the row is a duplicate
+        """
         if row_signature in seen_rows:
             logger.debug(f"Skipping {row_signature}: duplicate")
             self.logging_collection.add_error(
                 "TYPE 5",
-                f"Duplicated, line: {line_number}, root_sample_id: {modified_row[FIELD_ROOT_SAMPLE_ID]}",
+                f"Duplicated, line: {line_number}, root_sample_id: {row[FIELD_ROOT_SAMPLE_ID]}",
             )
-            return None
+            return True
 
+        return False
+
+    def validate_row(self, modified_row: ModifiedRow, line_number: int) -> bool:
+        """Runs the validations on the values of a row, converting the Cq values and date tested of the row as they
+        are validated. Validation stops at the first error found in the row.
+
+        Arguments:
+            modified_row {ModifiedRow} - modified filtered and formatted version of the row
+            line_number {int} - line number within the file
+
+        Returns:
+            bool - whether the row passed validation
+        """
         # ---- convert data types for channel fields ----
         if not self.convert_and_validate_cq_values(modified_row, line_number):
-            return None
+            return False
 
         # ---- perform various validations on row values ----
         # Check that the date is a valid format and if so, convert it to a datetime before saving to mongo
-        date_format_valid, date_string_dict = self.is_valid_date_format(modified_row, line_number, FIELD_DATE_TESTED)
-        if date_format_valid:
-            if date_string_dict:
-                # > By default all datetime.datetime objects returned by PyMongo will be naive but reflect UTC
-                # https://pymongo.readthedocs.io/en/stable/examples/datetimes.html
-                modified_row[FIELD_DATE_TESTED] = self.convert_datetime_string_to_datetime(**date_string_dict)
-            else:
-                modified_row[FIELD_DATE_TESTED] = None
-        else:
-            return None
+        # > By default all datetime.datetime objects returned by PyMongo will be naive but reflect UTC
+        # https://pymongo.readthedocs.io/en/stable/examples/datetimes.html
+        date_format_valid, date_tested = self.date_tested_parser.parse(
+            cast(Optional[str], modified_row.get(FIELD_DATE_TESTED))
+        )
+        if not date_format_valid:
+            self.logging_collection.add_error(
+                "TYPE 27",
+                f"{FIELD_DATE_TESTED} has an unknown date format, line: {line_number}",
+            )
+            return False
+
+        modified_row[FIELD_DATE_TESTED] = date_tested
 
         if not self.row_result_value_valid(modified_row, line_number):
-            return None
+            return False
 
         if not self.row_channel_target_values_valid(modified_row, line_number):
-            return None
+            return False
 
         if not self.row_channel_result_values_valid(modified_row, line_number):
-            return None
+            return False
 
         if not self.row_channel_cq_values_within_range(modified_row, line_number):
-            return None
+            return False
 
         if not self.row_positive_result_matches_channel_results(modified_row, line_number):
-            return None
+            return False
 
-        # ---- add a few additional, computed or derived fields ----
-        # add the centre name as source
-        modified_row[FIELD_SOURCE] = self.centre_config["name"]
+        return True
 
+    def create_sample(self, modified_row: ModifiedRow, line_number: int) -> Optional[Sample]:
+        """Creates the sample of a row which passed validation, adding the computed and derived fields.
+
+        Arguments:
+            modified_row {ModifiedRow} - modified filtered and formatted version of the row
+            line_number {int} - line number within the file
+
+        Returns:
+            Optional[Sample] - the sample, or None if the plate barcode cannot be extracted from the row
+        """
         # extract the barcode and well coordinate
         barcode_field = self.centre_config["barcode_field"]
 
-        modified_row[FIELD_PLATE_BARCODE] = None
+        plate_barcode: Optional[str] = None
+        coordinate: Optional[str] = None
         if modified_row.get(barcode_field) and (barcode_regex := self.centre_config["barcode_regex"]):
-            (
-                modified_row[FIELD_PLATE_BARCODE],
-                modified_row[FIELD_COORDINATE],
-            ) = self.extract_plate_barcode_and_coordinate(modified_row, line_number, barcode_field, barcode_regex)
+            plate_barcode, coordinate = self.extract_plate_barcode_and_coordinate(
+                modified_row, line_number, barcode_field, barcode_regex
+            )
 
-        if not modified_row.get(FIELD_PLATE_BARCODE):
+        if not plate_barcode:
             return None
 
-        modified_row[FIELD_LINE_NUMBER] = line_number
-        modified_row[FIELD_FILE_NAME] = self.file_name
-        modified_row[FIELD_FILE_NAME_DATE] = self.file_name_date()
-        modified_row[FIELD_CREATED_AT] = datetime.utcnow()
-        modified_row[FIELD_UPDATED_AT] = datetime.utcnow()
+        sample = Sample.from_row(modified_row, self.sample_file_details())
+        sample.plate_barcode = plate_barcode
+        sample.coordinate = coordinate
+        sample.line_number = line_number
 
         # filtered-positive calculations
-        modified_row[FIELD_FILTERED_POSITIVE] = self.filtered_positive_identifier.is_positive(modified_row)
-        modified_row[FIELD_FILTERED_POSITIVE_VERSION] = self.filtered_positive_identifier.version
-        modified_row[FIELD_FILTERED_POSITIVE_TIMESTAMP] = datetime.utcnow()
+        sample.filtered_positive = self.filtered_positive_identifier.is_positive(modified_row)
 
         # add lh sample uuid
-        modified_row[FIELD_LH_SAMPLE_UUID] = str(uuid.uuid4())
+        sample.lh_sample_uuid = str(uuid.uuid4())
 
-        # ---- store row signature to allow checking for duplicates in following rows ----
-        seen_rows.add(row_signature)
+        return sample
 
-        return modified_row
+    def sample_file_details(self) -> SampleFileDetails:
+        """The values shared by all the samples of the file, which are worked out once for the file.
+
+        Returns:
+            SampleFileDetails - the centre name as source, the file name and date, the time the file was parsed and
+            the version of the filtered positive rules
+        """
+        if self._sample_file_details is None:
+            self._sample_file_details = SampleFileDetails(
+                source=self.centre_config["name"],
+                file_name=self.file_name,
+                file_name_date=self.file_name_date(),
+                parsed_at=datetime.utcnow(),
+                filtered_positive_version=self.filtered_positive_identifier.version,
+            )
+
+        return self._sample_file_details
 
     def convert_and_validate_cq_values(self, row: ModifiedRow, line_number: int) -> bool:
         """Convert and validate each of the four channel fields.
@@ -1140,78 +1643,45 @@ class CentreFile:
         if (channel_cq_field_val := row.get(channel_cq_field)) is None:
             return True
         elif channel_cq_field_val:
-            try:
-                # pymongo requires Decimal128 format for numbers rather than normal Decimal
-                row[channel_cq_field] = Decimal128(channel_cq_field_val)
-            except Exception:
+            if (cq_value := self.convert_cq_value(cast(str, channel_cq_field_val))) is None:
                 self.logging_collection.add_error(
                     "TYPE 19",
                     f"{channel_cq_field} invalid, line: {line_number}, value: {channel_cq_field_val}",
                 )
                 return False
 
+            row[channel_cq_field] = cq_value
+
         return True
 
-    @staticmethod
-    def convert_datetime_string_to_datetime(
-        day: str, month: str, year: str, time: str, timezone_name: Optional[str] = None
-    ) -> datetime:
-        """Converts a datetime string (split in its components) into a python datetime
+    def convert_cq_value(self, value: str) -> Optional[Decimal128]:
+        """Convert a Cq value to a Decimal128. The same Cq values turn up in many rows and channels, so each distinct
+        value is only converted once for each chunk of rows of the file.
 
         Arguments:
-            day (str): [description]
-            month (str): Month as a zero-padded string
-            year (str): Year with century
-            time (str): hour, minute, and optionally seconds
-            timezone_name (Optional[str], optional): Time zone name. Defaults to None.
+            value (str): the Cq value of a channel
 
         Returns:
-            datetime: [description]
+            Optional[Decimal128]: the converted value, or None if it is not a number
         """
-        if len(time) == 5:
-            time = f"{time}:00"
-
-        datetime_string = f"{day} {month} {year} {time}"
-
-        date_time = datetime.strptime(datetime_string, "%d %m %Y %H:%M:%S")
-
-        # We are only checking for UTC at the moment, more time (excuse the pun) is needed to suppport timezones
-        #   more robustly
-        if timezone_name and timezone_name == "UTC":
-            date_time = date_time.replace(tzinfo=timezone.utc)
-
-        return date_time
+        try:
+            return self._cq_values[value]
+        except KeyError:
+            pass
 
-    def is_valid_date_format(self, row: ModifiedRow, line_number: int, date_field: str) -> Tuple[bool, Dict[str, str]]:
-        """The possible values for the date are:
-        - '' (empty string)
-        - YYYY-MM-DD HH:MM:SS Z e.g. 2020-11-22 04:36:38 UTC
-        - DD/MM/YYYY HH:MM e.g. 19/07/2020 21:41
+        # keep the memo to the size of a chunk, so that memory use stays flat for large files
+        if len(self._cq_values) >= self.config.FILE_PROCESSING_CHUNK_SIZE:
+            self._cq_values.clear()
 
-        Arguments:
-            row (ModifiedRow): modified filtered and formatted version of the row
-            line_number (int): line number within the file
+        try:
+            # pymongo requires Decimal128 format for numbers rather than normal Decimal
+            cq_value: Optional[Decimal128] = Decimal128(value)
+        except Exception:
+            cq_value = None
 
-        Returns:
-            Tuple[bool, Dict[str, str]: whether the date format is valid and a dictionary of the date time components
-        """
-        # the date could be an empty string
-        if not (date_field_val := row.get(date_field)):
-            return True, {}
-        else:
-            for pattern in (
-                r"^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})[ ]+(?P<time>[0-2]\d:[0-5]\d:[0-5]\d)([ ]+(?P<timezone_name>UTC)?)?$",  # noqa: E501
-                r"^(?P<day>\d{2})/(?P<month>\d{2})/(?P<year>\d{4})[ ]+(?P<time>[0-2]\d:[0-5]\d)$",
-            ):
-                if match := re.match(pattern, str(date_field_val)):
-                    return True, match.groupdict()
+        self._cq_values[value] = cq_value
 
-            # no patterns were matched to log an error
-            self.logging_collection.add_error(
-                "TYPE 27",
-                f"{date_field} has an unknown date format, line: {line_number}",
-            )
-            return False, {}
+        return cq_value
 
     def row_result_value_valid(self, row: ModifiedRow, line_number: int) -> bool:
         """Validation to check if the row's 'Result' value is one of the expected values.
@@ -1320,6 +1790,21 @@ class CentreFile:
         """
         return range_min <= cast(Decimal, num.to_decimal()) <= range_max
 
+    def is_cq_value_within_range(self, num: Decimal128) -> bool:
+        """Validation to check if a Cq value lies within the range of valid Cq values. A value which cannot be
+        compared, such as NaN, is not within range.
+
+        Arguments:
+            num {Decimal128} - the Cq value to be tested
+
+        Returns:
+            bool - whether the value lies within range
+        """
+        try:
+            return self.is_within_cq_range(MIN_CQ_VALUE, MAX_CQ_VALUE, num)
+        except InvalidOperation:
+            return False
+
     def is_row_channel_cq_in_range(self, row: ModifiedRow, line_number: int, fieldname: str) -> bool:
         """Is the channel cq within the specified range.
 
@@ -1331,8 +1816,8 @@ class CentreFile:
         Returns:
             bool - whether the cq value is valid
         """
-        if (channel_cq_val := row.get(fieldname)) is not None and not self.is_within_cq_range(
-            MIN_CQ_VALUE, MAX_CQ_VALUE, cast(Decimal128, channel_cq_val)
+        if (channel_cq_val := row.get(fieldname)) is not None and not self.is_cq_value_within_range(
+            cast(Decimal128, channel_cq_val)
         ):
             self.logging_collection.add_error(
                 "TYPE 20",
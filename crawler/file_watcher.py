@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+import time
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple
+
+from crawler.file_processing import REGEX_FIELD
+from crawler.helpers.general_helpers import get_sftp_connection
+from crawler.types import CentreConf, Config, RemoteFile
+
+logger = logging.getLogger(__name__)
+
+# the files of a centre, by file name
+Listing = Dict[str, RemoteFile]
+
+
+class FileArrivalWatcher:
+    """Watches the centres' files for new or changed files, so that a centre can be processed as soon as its files
+    arrive rather than on the next scheduled run.
+
+    Each poll lists the files of every centre matching the centre's file regex: on the SFTP server if the files are
+    downloaded from it, otherwise in the centre's download directory. A file is new or changed if its size or
+    modification time differ from those of the last listing processed. A centre is ready to process once one of its
+    new or changed files has been listed unchanged for at least FILE_WATCH_DEBOUNCE_SECONDS, so that a file which is
+    still being uploaded is not processed.
+
+    The first poll of a centre only records its files: they are left to a full run of all the centres.
+    """
+
+    def __init__(self, config: Config, sftp: bool, clock: Callable[[], float] = time.monotonic):
+        """Initialiser for a watcher which has not listed any files yet.
+
+        Arguments:
+            config {Config} -- application config
+            sftp {bool} -- whether to watch the files on the SFTP server rather than in the download directories
+            clock {Callable[[], float]} -- the clock used to debounce the files. Defaults to time.monotonic.
+        """
+        self.config = config
+        self.sftp = sftp
+        self.clock = clock
+
+        self._listings: Dict[str, Listing] = {}
+        self._processed: Dict[str, Listing] = {}
+        # the new or changed files of each centre and when each was first listed as it is now
+        self._pending: Dict[str, Dict[str, Tuple[RemoteFile, float]]] = {}
+
+    def poll(self) -> Set[str]:
+        """Lists the files of the centres and finds the centres with new or changed files ready to process.
+
+        Returns:
+            Set[str] -- the names of the centres ready to process
+        """
+        now = self.clock()
+        ready: Set[str] = set()
+
+        for centre_name, listing in self.list_files().items():
+            self._listings[centre_name] = listing
+
+            if (processed := self._processed.get(centre_name)) is None:
+                self._processed[centre_name] = listing
+                continue
+
+            pending = self._pending.setdefault(centre_name, {})
+            for file_name in list(pending):
+                if file_name not in listing:
+                    del pending[file_name]
+
+            for file_name, remote_file in listing.items():
+                if processed.get(file_name) == remote_file:
+                    pending.pop(file_name, None)
+                elif (first_listed := pending.get(file_name)) is None or first_listed[0] != remote_file:
+                    pending[file_name] = (remote_file, now)
+                elif now - first_listed[1] >= self.config.FILE_WATCH_DEBOUNCE_SECONDS:
+                    ready.add(centre_name)
+
+        return ready
+
+    def mark_processed(self, centre_names: Optional[Collection[str]] = None) -> None:
+        """Records the files of the last poll as processed, so that only the files which arrive or change afterwards
+        make the centres ready again.
+
+        Arguments:
+            centre_names {Optional[Collection[str]]} -- the names of the centres processed, or None for all of them
+        """
+        for centre_name, listing in self._listings.items():
+            if centre_names is None or centre_name in centre_names:
+                self._processed[centre_name] = listing
+                self._pending.pop(centre_name, None)
+
+    def list_files(self) -> Dict[str, Listing]:
+        """Lists the files of each centre which match the centre's file regex. A centre whose files cannot be listed
+        is left out.
+
+        Returns:
+            Dict[str, Listing] -- the files of each centre, by centre name
+        """
+        if self.sftp:
+            return list_sftp_files(self.config, self.config.CENTRES)
+
+        listings: Dict[str, Listing] = {}
+        for centre_config in self.config.CENTRES:
+            download_dir = f"{self.config.DIR_DOWNLOADED_DATA}{centre_config['prefix']}/"
+            if (listing := list_local_files(download_dir, centre_config)) is not None:
+                listings[centre_config["name"]] = listing
+
+        return listings
+
+
+def list_local_files(directory: str, centre_config: CentreConf) -> Optional[Listing]:
+    """Lists the files of a directory which match a centre's file regex.
+
+    Arguments:
+        directory {str} -- the directory, e.g. the centre's download directory
+        centre_config {CentreConf} -- the config of the centre
+
+    Returns:
+        Optional[Listing] -- the files, or None if the directory cannot be read
+    """
+    pattern = re.compile(centre_config[REGEX_FIELD])
+
+    try:
+        with os.scandir(directory) as entries:
+            listing: Listing = {}
+            for entry in entries:
+                if entry.is_file() and pattern.match(entry.name):
+                    stat = entry.stat()
+                    listing[entry.name] = RemoteFile(entry.name, stat.st_size, int(stat.st_mtime))
+
+            return listing
+    except OSError as e:
+        logger.debug(f"Failed listing {directory}: {e}")
+        return None
+
+
+def list_sftp_files(config: Config, centre_configs: List[CentreConf]) -> Dict[str, Listing]:
+    """Lists the files of each centre on the SFTP server which match the centre's file regex, over one connection.
+
+    Arguments:
+        config {Config} -- application config
+        centre_configs {List[CentreConf]} -- the configs of the centres
+
+    Returns:
+        Dict[str, Listing] -- the files of each centre whose directory could be listed, by centre name
+    """
+    listings: Dict[str, Listing] = {}
+
+    try:
+        with get_sftp_connection(config) as sftp:
+            for centre_config in centre_configs:
+                pattern = re.compile(centre_config[REGEX_FIELD])
+                try:
+                    listings[centre_config["name"]] = {
+                        attrs.filename: RemoteFile(attrs.filename, attrs.st_size, attrs.st_mtime)
+                        for attrs in sftp.listdir_attr(centre_config["sftp_root_read"])
+                        if pattern.match(attrs.filename)
+                    }
+                except OSError as e:
+                    logger.warning(f"Failed listing the SFTP files of {centre_config['name']}: {e}")
+    except Exception as e:
+        logger.error("Failed listing the centres' files on the SFTP server")
+        logger.exception(e)
+
+    return listings
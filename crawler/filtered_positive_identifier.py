@@ -1,7 +1,9 @@
 import decimal
+import math
 import re
 from abc import ABC
-from typing import Optional, Pattern, cast
+from fractions import Fraction
+from typing import TYPE_CHECKING, Dict, Final, List, Optional, Pattern, Sequence, cast
 
 from bson.decimal128 import Decimal128, create_decimal128_context
 
@@ -15,6 +17,9 @@ from crawler.constants import (
 )
 from crawler.types import SampleDoc
 
+if TYPE_CHECKING:
+    import numpy as np
+
 # record/reference all versions and definitions here
 FILTERED_POSITIVE_VERSION_0 = "v0"  # pre-filtered_positive definitions
 FILTERED_POSITIVE_VERSION_1 = "v1"  # initial implementation, as per GPL-669
@@ -74,6 +79,168 @@ class FilteredPositiveIdentifier(ABC):
         else:
             return True
 
+    def is_positive_batch(self, samples: Sequence[SampleDoc]) -> List[bool]:
+        """Determines whether each of a batch of samples is a filtered positive, with the same rules as is_positive.
+
+        The rules are applied to whole columns of the batch rather than sample by sample, see batch_results_positive
+        and batch_cq_values_positive.
+
+        Arguments:
+            samples {Sequence[SampleDoc]} -- information on the samples
+
+        Returns:
+            {List[bool]} -- whether each sample is a filtered positive, in the order of the samples
+        """
+        positive = self.batch_results_positive(samples)
+
+        if self.evaluate_ct_values:
+            positive = self.batch_cq_values_positive(samples, positive)
+
+        return cast(List[bool], positive.tolist())
+
+    def batch_results_positive(self, samples: Sequence[SampleDoc]) -> "np.ndarray":
+        """Checks the results of a batch of samples are positive and that the samples are not controls. The result
+        regex is only matched once for each distinct result.
+
+        Arguments:
+            samples {Sequence[SampleDoc]} -- information on the samples
+
+        Returns:
+            {np.ndarray} -- boolean mask of the samples with a positive result which are not controls
+        """
+        # numpy is only imported when a batch is identified, so that importing the crawler does not load it
+        import numpy as np
+
+        result_matches: Dict[str, bool] = {}
+        for result in {str(sample[FIELD_RESULT]) for sample in samples}:
+            result_matches[result] = self.result_regex.match(result) is not None
+
+        positive = np.fromiter(
+            (result_matches[str(sample[FIELD_RESULT])] for sample in samples), dtype=bool, count=len(samples)
+        )
+
+        if (control_regex := self.root_sample_id_control_regex) is not None:
+            for index in np.flatnonzero(positive).tolist():
+                if control_regex.match(str(samples[index][FIELD_ROOT_SAMPLE_ID])):
+                    positive[index] = False
+
+        return positive
+
+    def batch_cq_values_positive(self, samples: Sequence[SampleDoc], results_positive: "np.ndarray") -> "np.ndarray":
+        """Checks the Cq values of the samples of a batch with a positive result. A sample without any Cq values is
+        positive; otherwise one of its CH1 to CH3 Cq values must be within the limit. The channels are checked in order
+        and each channel is only checked for the samples still undecided, comparing the Decimal128 values of the
+        channel all at once with decimal128_values_within_limit.
+
+        Arguments:
+            samples {Sequence[SampleDoc]} -- information on the samples
+            results_positive {np.ndarray} -- boolean mask of the samples with a positive result which are not controls
+
+        Returns:
+            {np.ndarray} -- boolean mask of the filtered positive samples
+        """
+        import numpy as np
+
+        # only the samples with a positive result have their Cq values checked
+        candidates = np.flatnonzero(results_positive)
+        candidate_samples = [samples[index] for index in candidates.tolist()]
+        cq_columns = [
+            [sample.get(field) for sample in candidate_samples] for field in (FIELD_CH1_CQ, FIELD_CH2_CQ, FIELD_CH3_CQ)
+        ]
+
+        # a sample without any Cq values is positive
+        undecided = np.zeros(len(candidates), dtype=bool)
+        for column in cq_columns:
+            undecided |= np.fromiter((cq_value is not None for cq_value in column), dtype=bool, count=len(candidates))
+
+        candidates_positive = ~undecided
+
+        with decimal.localcontext(self.d128_context):
+            for column in cq_columns:
+                within_limit: List[int] = []
+                decimal128_indices: List[int] = []
+
+                for index in np.flatnonzero(undecided).tolist():
+                    # the same checks as is_positive, which skips a missing or empty value
+                    if (cq_value := column[index]) is None or not cq_value:
+                        continue
+
+                    if isinstance(cq_value, Decimal128):
+                        decimal128_indices.append(index)
+                    elif cast(Decimal128, cq_value).to_decimal() <= self.ct_value_limit:
+                        within_limit.append(index)
+
+                if decimal128_indices:
+                    values = [cast(Decimal128, column[index]) for index in decimal128_indices]
+                    indices = np.array(decimal128_indices, dtype=np.intp)
+                    within_limit += indices[decimal128_values_within_limit(values, self.ct_value_limit)].tolist()
+
+                candidates_positive[within_limit] = True
+                undecided[within_limit] = False
+
+        positive = np.zeros(len(samples), dtype=bool)
+        positive[candidates] = candidates_positive
+
+        return positive
+
+
+# the binary integer decimal encoding of a Decimal128 is two little-endian 64 bit words; the high word holds the sign,
+# the biased exponent and the top 49 bits of the coefficient
+DECIMAL128_SIGN_SHIFT: Final[int] = 63
+DECIMAL128_FORM_SHIFT: Final[int] = 61
+DECIMAL128_SPECIAL_FORM: Final[int] = 0b11  # infinities, NaNs and non-canonical coefficients
+DECIMAL128_EXPONENT_SHIFT: Final[int] = 49
+DECIMAL128_EXPONENT_MASK: Final[int] = 0x3FFF
+DECIMAL128_EXPONENT_BIAS: Final[int] = 6176
+DECIMAL128_COEFFICIENT_HIGH_MASK: Final[int] = (1 << 49) - 1
+# the coefficients decoded are held in the low word, so every one is within a maximum coefficient of at least this
+DECIMAL128_COEFFICIENT_LIMIT: Final[int] = 1 << 64
+
+
+def decimal128_values_within_limit(values: Sequence[Decimal128], limit: decimal.Decimal) -> "np.ndarray":
+    """Compares Decimal128 values with a limit all at once, with the same result as value.to_decimal() <= limit.
+
+    The values are decoded from their binary encoding: a positive value whose coefficient fits in 64 bits is compared by
+    its coefficient, against the largest coefficient within the limit for its exponent, which is worked out exactly once
+    for each exponent. Any other value, e.g. a negative value or NaN, is compared as a decimal.
+
+    Arguments:
+        values {Sequence[Decimal128]} -- the values
+        limit {decimal.Decimal} -- the limit
+
+    Returns:
+        {np.ndarray} -- boolean mask of the values which are less than or equal to the limit
+    """
+    import numpy as np
+
+    words = np.frombuffer(b"".join(value.bid for value in values), dtype="<u8").reshape(-1, 2)
+    coefficients, high_words = words[:, 0], words[:, 1]
+
+    # the shifts and masks are applied as unsigned 64 bit integers, the type of the words
+    decodable = (
+        ((high_words >> np.uint64(DECIMAL128_SIGN_SHIFT)) == 0)
+        & ((high_words >> np.uint64(DECIMAL128_FORM_SHIFT)) != np.uint64(DECIMAL128_SPECIAL_FORM))
+        & ((high_words & np.uint64(DECIMAL128_COEFFICIENT_HIGH_MASK)) == 0)
+    )
+    exponents = ((high_words >> np.uint64(DECIMAL128_EXPONENT_SHIFT)) & np.uint64(DECIMAL128_EXPONENT_MASK)).astype(
+        np.int64
+    )
+
+    within_limit = np.zeros(len(values), dtype=bool)
+    for biased_exponent in np.unique(exponents[decodable]).tolist():
+        rows = decodable & (exponents == biased_exponent)
+
+        max_coefficient = math.floor(Fraction(limit) / Fraction(10) ** (biased_exponent - DECIMAL128_EXPONENT_BIAS))
+        if max_coefficient >= DECIMAL128_COEFFICIENT_LIMIT:
+            within_limit[rows] = True
+        elif max_coefficient >= 0:
+            within_limit[rows] = coefficients[rows] <= np.uint64(max_coefficient)
+
+    for index in np.flatnonzero(~decodable).tolist():
+        within_limit[index] = values[index].to_decimal() <= limit
+
+    return within_limit
+
 
 def current_filtered_positive_identifier() -> FilteredPositiveIdentifier:
     """Returns the current filtered positive identifier.
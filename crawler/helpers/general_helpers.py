@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import logging
 import os
 import re
@@ -7,9 +9,8 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 from importlib import import_module
-from typing import Any, Dict, Optional, Tuple, cast
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, cast
 
-import pysftp
 from bson.decimal128 import Decimal128
 
 from crawler.constants import (
@@ -80,6 +81,9 @@ from crawler.constants import (
 )
 from crawler.types import Config, DartWellProp, ModifiedRowValue, SampleDoc, SourcePlateDoc
 
+if TYPE_CHECKING:
+    import pysftp
+
 logger = logging.getLogger(__name__)
 
 
@@ -105,6 +109,9 @@ def get_sftp_connection(config: Config, username: str = "", password: str = "")
     Returns:
         pysftp.Connection: a connection to the SFTP server as a context manager
     """
+    # pysftp is only imported when a connection is made, so that importing the crawler does not load paramiko
+    import pysftp
+
     # disable host key checking:
     #   https://bitbucket.org/dundeemt/pysftp/src/master/docs/cookbook.rst#rst-header-id5
     cnopts = pysftp.CnOpts()
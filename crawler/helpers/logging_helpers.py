@@ -1,3 +1,5 @@
+import threading
+
 from crawler.helpers.enums import ErrorLevel
 
 
@@ -325,6 +327,7 @@ class AggregateType27(AggregateTypeBase):
 # Class to handle logging of errors of the various types per file
 class LoggingCollection:
     def __init__(self):
+        self._lock = threading.Lock()
         self.aggregator_types = {
             "TYPE 1": AggregateType1(),
             "TYPE 2": AggregateType2(),
@@ -354,7 +357,9 @@ class LoggingCollection:
         }
 
     def add_error(self, aggregate_error_type, message):
-        self.aggregator_types[aggregate_error_type].add_error(message)
+        # errors are added by the threads writing the samples of a file to the MLWH and DART as well as the main thread
+        with self._lock:
+            self.aggregator_types[aggregate_error_type].add_error(message)
 
     def get_aggregate_messages(self):
         msgs = []
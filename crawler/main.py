@@ -1,8 +1,12 @@
 import logging
 import logging.config
 import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Collection, Dict, List, Optional
 
 import pymongo
+from pymongo import MongoClient
+from pymongo.database import Database
 
 from crawler.constants import (
     COLLECTION_CENTRES,
@@ -18,19 +22,33 @@ from crawler.constants import (
     FIELD_ROOT_SAMPLE_ID,
 )
 from crawler.db.mongo import (
+    MongoConnectionCounter,
     create_mongo_client,
     get_mongo_collection,
     get_mongo_db,
     populate_collection,
     samples_collection_accessor,
 )
+from crawler.db.mysql import close_mysql_connection_provider, get_mysql_connection_provider
 from crawler.file_processing import Centre
+from crawler.file_watcher import FileArrivalWatcher
 from crawler.helpers.general_helpers import get_config
+from crawler.sample_filter import save_sample_filter
+from crawler.types import CentreConf, Config
 
 logger = logging.getLogger(__name__)
 
+CENTRES_POOL_THREAD = "thread"
+CENTRES_POOL_PROCESS = "process"
 
-def run(sftp: bool, keep_files: bool, add_to_dart: bool, settings_module: str = "") -> None:
+
+def run(
+    sftp: bool,
+    keep_files: bool,
+    add_to_dart: bool,
+    settings_module: str = "",
+    centre_names: Optional[Collection[str]] = None,
+) -> None:
     try:
         start = time.time()
         config, settings_module = get_config(settings_module)
@@ -40,76 +58,373 @@ def run(sftp: bool, keep_files: bool, add_to_dart: bool, settings_module: str =
         logger.info("-" * 80)
         logger.info("START")
         logger.info(f"Using settings from {settings_module}")
+        if centre_names is not None:
+            logger.info(f"Processing centres {', '.join(sorted(centre_names))}")
 
-        centres = config.CENTRES
-
-        with create_mongo_client(config) as client:
-            db = get_mongo_db(config, client)
-
-            # get or create the centres collection
-            centres_collection = get_mongo_collection(db, COLLECTION_CENTRES)
-
-            logger.debug(f"Creating index '{FIELD_CENTRE_NAME}' on '{centres_collection.full_name}'")
-            centres_collection.create_index(FIELD_CENTRE_NAME, unique=True)
-            populate_collection(centres_collection, centres, FIELD_CENTRE_NAME)
-
-            # get or create the source plates collection
-            source_plates_collection = get_mongo_collection(db, COLLECTION_SOURCE_PLATES)
-
-            logger.debug(f"Creating index '{FIELD_BARCODE}' on '{source_plates_collection.full_name}'")
-            source_plates_collection.create_index(FIELD_BARCODE, unique=True)
-
-            logger.debug(f"Creating index '{FIELD_LH_SOURCE_PLATE_UUID}' on '{source_plates_collection.full_name}'")
-            source_plates_collection.create_index(FIELD_LH_SOURCE_PLATE_UUID, unique=True)
-
-            with samples_collection_accessor(db, COLLECTION_SAMPLES) as samples_collection:
-                # Index on plate barcode to make it easier to select based on plate barcode
-                logger.debug(f"Creating index '{FIELD_PLATE_BARCODE}' on '{samples_collection.full_name}'")
-                samples_collection.create_index(FIELD_PLATE_BARCODE)
-
-                # Index on result column to make it easier to select the positives
-                logger.debug(f"Creating index '{FIELD_RESULT}' on '{samples_collection.full_name}'")
-                samples_collection.create_index(FIELD_RESULT)
-
-                # Index on unique combination of columns
-                logger.debug(f"Creating compound index on '{samples_collection.full_name}'")
-                # create compound index on 'Root Sample ID', 'RNA ID', 'Result', 'Lab ID' - some
-                # data had the same plate tested at another time so ignore the data if it is exactly
-                # the same
-                samples_collection.create_index(
-                    [
-                        (FIELD_ROOT_SAMPLE_ID, pymongo.ASCENDING),
-                        (FIELD_RNA_ID, pymongo.ASCENDING),
-                        (FIELD_RESULT, pymongo.ASCENDING),
-                        (FIELD_LAB_ID, pymongo.ASCENDING),
-                    ],
-                    unique=True,
-                )
+        # one mongo client, and so one pool of connections, is shared by all the centres and files in the run
+        connection_counter = MongoConnectionCounter()
+        with create_mongo_client(config, [connection_counter]) as client:
+            bootstrap_mongo(config, get_mongo_db(config, client))
+
+            process_centres(config, settings_module, sftp, keep_files, add_to_dart, client, centre_names)
 
-                # Index on lh_source_plate_uuid column
-                # Added to make lighthouse API source completion event call query more efficient
-                logger.debug(f"Creating index '{FIELD_LH_SOURCE_PLATE_UUID}' on '{samples_collection.full_name}'")
-                samples_collection.create_index(FIELD_LH_SOURCE_PLATE_UUID)
-
-                centres_instances = [Centre(config, centre_config) for centre_config in centres]
-                for centre_instance in centres_instances:
-                    logger.info("*" * 80)
-                    logger.info(f"Processing {centre_instance.centre_config['name']}")
-
-                    try:
-                        if sftp:
-                            centre_instance.download_csv_files()
-
-                        centre_instance.process_files(add_to_dart)
-                    except Exception as e:
-                        logger.error("An exception occured")
-                        logger.error(f"Error in centre {centre_instance.centre_config['name']}")
-                        logger.exception(e)
-                    finally:
-                        if not keep_files and centre_instance.is_download_dir_walkable:
-                            centre_instance.clean_up()
+        # the samples inserted by the run are added to the samples filter for the next one
+        save_sample_filter()
 
+        logger.info(
+            f"Mongo connections opened: {connection_counter.connections_created} "
+            f"in {connection_counter.pools_created} pool(s)"
+        )
+        # the MLWH connections are pooled for the whole run, by the process
+        get_mysql_connection_provider(config).log_stats()
+        close_mysql_connection_provider()
         logger.info(f"Import complete in {round(time.time() - start, 2)}s")
         logger.info("=" * 80)
     except Exception as e:
         logger.exception(e)
+
+
+class CrawlerDaemon:
+    """Processes the centres' files cycle after cycle in one long-lived process, so that a cycle with no new files
+    costs little more than listing them.
+
+    The config, logging and mongo client are set up once, and the MLWH connection pools and the centres, with their
+    checksum indexes and SFTP manifests, are kept between cycles. The mongo indexes are created and the centres
+    collection populated by the first cycle. The settings are not reloaded, so the daemon must be restarted for a change
+    to take effect.
+    """
+
+    def __init__(self, sftp: bool, keep_files: bool, add_to_dart: bool, settings_module: str = ""):
+        """Initialiser for the daemon, which loads the config and connects to mongo.
+
+        Arguments:
+            sftp {bool} -- whether to download the centre's files from the SFTP server
+            keep_files {bool} -- whether to keep the downloaded files after processing
+            add_to_dart {bool} -- whether to add the samples to DART
+            settings_module {str} -- the settings module to load the config from
+        """
+        self.sftp = sftp
+        self.keep_files = keep_files
+        self.add_to_dart = add_to_dart
+
+        self.config, self.settings_module = get_config(settings_module)
+        logging.config.dictConfig(self.config.LOGGING)
+        logger.info(f"Starting the crawler daemon using settings from {self.settings_module}")
+
+        self.mongo_client = create_mongo_client(self.config)
+        self.centres: Dict[str, Centre] = {}
+        self.bootstrapped = False
+        self.cycles = 0
+
+    def run_cycle(self, centre_names: Optional[Collection[str]] = None) -> None:
+        """Downloads (optionally) and processes the files of the centres. Any exception is logged so that the next
+        cycle still runs.
+
+        Arguments:
+            centre_names {Optional[Collection[str]]} -- the names of the centres to process, or None for all of them
+        """
+        try:
+            start = time.perf_counter()
+
+            if not self.bootstrapped:
+                logger.info("Creating the mongo indexes and populating the centres")
+                bootstrap_mongo(self.config, get_mongo_db(self.config, self.mongo_client))
+                self.bootstrapped = True
+
+            process_centres(
+                self.config,
+                self.settings_module,
+                self.sftp,
+                self.keep_files,
+                self.add_to_dart,
+                self.mongo_client,
+                centre_names,
+                self.centres,
+            )
+            save_sample_filter()
+
+            self.cycles += 1
+            logger.info(f"Cycle {self.cycles} complete in {time.perf_counter() - start:.3f}s")
+        except Exception as e:
+            logger.exception(e)
+
+    def close(self) -> None:
+        """Closes the daemon's connections."""
+        get_mysql_connection_provider(self.config).log_stats()
+        close_mysql_connection_provider()
+        self.mongo_client.close()
+
+
+def run_daemon(sftp: bool, keep_files: bool, add_to_dart: bool, settings_module: str = "") -> None:
+    """Process the centres' files every DAEMON_CYCLE_MINUTES in one long-lived process, until interrupted. A cycle only
+    starts once the previous one has finished, so cycles which overrun do not queue up.
+
+    Arguments:
+        sftp {bool} -- whether to download the centre's files from the SFTP server
+        keep_files {bool} -- whether to keep the downloaded files after processing
+        add_to_dart {bool} -- whether to add the samples to DART
+        settings_module {str} -- the settings module to load the config from
+    """
+    daemon = CrawlerDaemon(sftp, keep_files, add_to_dart, settings_module)
+    try:
+        while True:
+            next_cycle = time.monotonic() + daemon.config.DAEMON_CYCLE_MINUTES * 60
+            daemon.run_cycle()
+            time.sleep(max(0.0, next_cycle - time.monotonic()))
+    finally:
+        daemon.close()
+
+
+def bootstrap_mongo(config: Config, db: Database) -> None:
+    """Create the indexes of the collections the crawler writes to, and add or update the centres in the centres
+    collection from the config.
+
+    Arguments:
+        config {Config} -- application config
+        db {Database} -- the mongo database
+    """
+    # get or create the centres collection
+    centres_collection = get_mongo_collection(db, COLLECTION_CENTRES)
+
+    logger.debug(f"Creating index '{FIELD_CENTRE_NAME}' on '{centres_collection.full_name}'")
+    centres_collection.create_index(FIELD_CENTRE_NAME, unique=True)
+    populate_collection(centres_collection, config.CENTRES, FIELD_CENTRE_NAME)
+
+    # get or create the source plates collection
+    source_plates_collection = get_mongo_collection(db, COLLECTION_SOURCE_PLATES)
+
+    logger.debug(f"Creating index '{FIELD_BARCODE}' on '{source_plates_collection.full_name}'")
+    source_plates_collection.create_index(FIELD_BARCODE, unique=True)
+
+    logger.debug(f"Creating index '{FIELD_LH_SOURCE_PLATE_UUID}' on '{source_plates_collection.full_name}'")
+    source_plates_collection.create_index(FIELD_LH_SOURCE_PLATE_UUID, unique=True)
+
+    with samples_collection_accessor(db, COLLECTION_SAMPLES) as samples_collection:
+        # Index on plate barcode to make it easier to select based on plate barcode
+        logger.debug(f"Creating index '{FIELD_PLATE_BARCODE}' on '{samples_collection.full_name}'")
+        samples_collection.create_index(FIELD_PLATE_BARCODE)
+
+        # Index on result column to make it easier to select the positives
+        logger.debug(f"Creating index '{FIELD_RESULT}' on '{samples_collection.full_name}'")
+        samples_collection.create_index(FIELD_RESULT)
+
+        # Index on unique combination of columns
+        logger.debug(f"Creating compound index on '{samples_collection.full_name}'")
+        # create compound index on 'Root Sample ID', 'RNA ID', 'Result', 'Lab ID' - some
+        # data had the same plate tested at another time so ignore the data if it is exactly
+        # the same
+        samples_collection.create_index(
+            [
+                (FIELD_ROOT_SAMPLE_ID, pymongo.ASCENDING),
+                (FIELD_RNA_ID, pymongo.ASCENDING),
+                (FIELD_RESULT, pymongo.ASCENDING),
+                (FIELD_LAB_ID, pymongo.ASCENDING),
+            ],
+            unique=True,
+        )
+
+        # Index on lh_source_plate_uuid column
+        # Added to make lighthouse API source completion event call query more efficient
+        logger.debug(f"Creating index '{FIELD_LH_SOURCE_PLATE_UUID}' on '{samples_collection.full_name}'")
+        samples_collection.create_index(FIELD_LH_SOURCE_PLATE_UUID)
+
+
+def process_centres(
+    config: Config,
+    settings_module: str,
+    sftp: bool,
+    keep_files: bool,
+    add_to_dart: bool,
+    mongo_client: Optional[MongoClient] = None,
+    centre_names: Optional[Collection[str]] = None,
+    centre_instances: Optional[Dict[str, Centre]] = None,
+) -> None:
+    """Process the centres in the config. When CENTRES_PROCESSING_WORKERS is more than 1 the centres are processed
+    concurrently in a pool of threads or processes (CENTRES_PROCESSING_POOL) so that the whole run takes roughly as long
+    as the slowest centre.
+
+    The centres share the mongo client when processed one after the other or in threads. Worker processes cannot share
+    a client so each one creates its own.
+
+    Arguments:
+        config {Config} -- application config
+        settings_module {str} -- the settings module used to load the config, to reload it in worker processes
+        sftp {bool} -- whether to download the centre's files from the SFTP server
+        keep_files {bool} -- whether to keep the downloaded files after processing
+        add_to_dart {bool} -- whether to add the samples to DART
+        mongo_client {Optional[MongoClient]} -- the mongo client shared by the run
+        centre_names {Optional[Collection[str]]} -- the names of the centres to process, or None for all of them
+        centre_instances {Optional[Dict[str, Centre]]} -- centres kept between runs by name, which are reused and to
+        which the centres created are added; not used by worker processes, which create their own centres
+    """
+
+    def get_centre(centre_config: CentreConf) -> Centre:
+        if centre_instances is None:
+            return Centre(config, centre_config, mongo_client)
+
+        if (centre := centre_instances.get(centre_config["name"])) is None:
+            centre = centre_instances[centre_config["name"]] = Centre(config, centre_config, mongo_client)
+
+        return centre
+
+    centre_configs: List[CentreConf] = [
+        centre_config
+        for centre_config in config.CENTRES
+        if centre_names is None or centre_config["name"] in centre_names
+    ]
+    max_workers = min(config.CENTRES_PROCESSING_WORKERS, len(centre_configs))
+
+    if max_workers <= 1:
+        for centre_config in centre_configs:
+            process_centre(get_centre(centre_config), sftp, keep_files, add_to_dart)
+
+        return None
+
+    logger.info(f"Processing {len(centre_configs)} centres with {max_workers} {config.CENTRES_PROCESSING_POOL} workers")
+
+    executor: Executor
+    futures: Dict[Future, str] = {}
+    if config.CENTRES_PROCESSING_POOL == CENTRES_POOL_THREAD:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="centre")
+        with executor:
+            for centre_config in centre_configs:
+                future = executor.submit(process_centre, get_centre(centre_config), sftp, keep_files, add_to_dart)
+                futures[future] = centre_config["name"]
+
+            wait_for_centres(futures)
+    elif config.CENTRES_PROCESSING_POOL == CENTRES_POOL_PROCESS:
+        # config modules cannot be pickled so each worker process loads the config from the settings module
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        with executor:
+            for centre_config in centre_configs:
+                future = executor.submit(
+                    process_centre_from_settings, settings_module, centre_config, sftp, keep_files, add_to_dart
+                )
+                futures[future] = centre_config["name"]
+
+            wait_for_centres(futures)
+    else:
+        raise ValueError(f"'{config.CENTRES_PROCESSING_POOL}' is not a known centres processing pool")
+
+
+def wait_for_centres(futures: Dict[Future, str]) -> None:
+    """Wait for the centres submitted to a pool to finish, logging any error raised by the pool itself.
+
+    Arguments:
+        futures {Dict[Future, str]} -- the submitted futures and the name of the centre each one is processing
+    """
+    for future in as_completed(futures):
+        # process_centre traps its own errors; anything raised here comes from the pool itself
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Error in centre {futures[future]} worker")
+            logger.exception(e)
+
+
+def process_centre_from_settings(
+    settings_module: str, centre_config: CentreConf, sftp: bool, keep_files: bool, add_to_dart: bool
+) -> None:
+    """Process a single centre in a worker process, loading the config from the settings module.
+
+    Arguments:
+        settings_module {str} -- the settings module to load the config from
+        centre_config {CentreConf} -- the config of the centre to process
+        sftp {bool} -- whether to download the centre's files from the SFTP server
+        keep_files {bool} -- whether to keep the downloaded files after processing
+        add_to_dart {bool} -- whether to add the samples to DART
+    """
+    config, _ = get_config(settings_module)
+    logging.config.dictConfig(config.LOGGING)
+
+    with create_mongo_client(config) as client:
+        process_centre(Centre(config, centre_config, client), sftp, keep_files, add_to_dart)
+
+    # merged with the filter saved by the other processes
+    save_sample_filter()
+
+
+def process_centre(centre_instance: Centre, sftp: bool, keep_files: bool, add_to_dart: bool) -> None:
+    """Download (optionally) and process the files of a centre. Any exception is logged so that one centre failing
+    does not stop the others from being processed.
+
+    Arguments:
+        centre_instance {Centre} -- the centre to process
+        sftp {bool} -- whether to download the centre's files from the SFTP server
+        keep_files {bool} -- whether to keep the downloaded files after processing
+        add_to_dart {bool} -- whether to add the samples to DART
+    """
+    logger.info("*" * 80)
+    logger.info(f"Processing {centre_instance.centre_config['name']}")
+
+    try:
+        if sftp:
+            centre_instance.download_csv_files()
+
+        centre_instance.process_files(add_to_dart)
+    except Exception as e:
+        logger.error("An exception occured")
+        logger.error(f"Error in centre {centre_instance.centre_config['name']}")
+        logger.exception(e)
+    finally:
+        if not keep_files and centre_instance.is_download_dir_walkable:
+            centre_instance.clean_up()
+
+
+def watch(sftp: bool, keep_files: bool, add_to_dart: bool, settings_module: str = "") -> None:
+    """Process the centres' files as they arrive, until interrupted.
+
+    The files of the centres are polled every FILE_WATCH_POLL_SECONDS and a centre is processed as soon as its new or
+    changed files are ready (see FileArrivalWatcher). All the centres are processed when watching starts and then every
+    FILE_WATCH_FULL_SWEEP_MINUTES, to pick up anything the polls missed. The centres are processed by a CrawlerDaemon,
+    and a cycle only starts once the previous one has finished, so cycles which overrun do not queue up.
+
+    Arguments:
+        sftp {bool} -- whether to watch and download the centre's files on the SFTP server
+        keep_files {bool} -- whether to keep the downloaded files after processing
+        add_to_dart {bool} -- whether to add the samples to DART
+        settings_module {str} -- the settings module to load the config from
+    """
+    daemon = CrawlerDaemon(sftp, keep_files, add_to_dart, settings_module)
+    watcher = FileArrivalWatcher(daemon.config, sftp)
+    next_full_sweep = time.monotonic()
+
+    try:
+        while True:
+            next_full_sweep = watch_cycle(watcher, daemon, next_full_sweep)
+            time.sleep(daemon.config.FILE_WATCH_POLL_SECONDS)
+    finally:
+        daemon.close()
+
+
+def watch_cycle(watcher: FileArrivalWatcher, daemon: CrawlerDaemon, next_full_sweep: float) -> float:
+    """Polls the centres' files once, then processes all the centres if a full sweep is due, otherwise the centres
+    with new files ready.
+
+    Arguments:
+        watcher {FileArrivalWatcher} -- the watcher of the centres' files
+        daemon {CrawlerDaemon} -- the daemon processing the centres
+        next_full_sweep {float} -- when the next full sweep is due, on the time.monotonic clock
+
+    Returns:
+        float -- when the next full sweep is due
+    """
+    try:
+        centre_names = watcher.poll()
+
+        if time.monotonic() >= next_full_sweep:
+            logger.info("Processing all the centres")
+            daemon.run_cycle()
+            watcher.mark_processed()
+
+            return time.monotonic() + daemon.config.FILE_WATCH_FULL_SWEEP_MINUTES * 60
+
+        if centre_names:
+            logger.info(f"New files ready for {', '.join(sorted(centre_names))}")
+            daemon.run_cycle(centre_names)
+            watcher.mark_processed(centre_names)
+    except Exception as e:
+        logger.error("There was an exception while watching the centres' files")
+        logger.exception(e)
+
+    return next_full_sweep
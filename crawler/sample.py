@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Final, Optional, Tuple
+
+from bson.decimal128 import Decimal128
+
+from crawler.constants import (
+    FIELD_CH1_CQ,
+    FIELD_CH1_RESULT,
+    FIELD_CH1_TARGET,
+    FIELD_CH2_CQ,
+    FIELD_CH2_RESULT,
+    FIELD_CH2_TARGET,
+    FIELD_CH3_CQ,
+    FIELD_CH3_RESULT,
+    FIELD_CH3_TARGET,
+    FIELD_CH4_CQ,
+    FIELD_CH4_RESULT,
+    FIELD_CH4_TARGET,
+    FIELD_COORDINATE,
+    FIELD_CREATED_AT,
+    FIELD_DATE_TESTED,
+    FIELD_FILE_NAME,
+    FIELD_FILE_NAME_DATE,
+    FIELD_FILTERED_POSITIVE,
+    FIELD_FILTERED_POSITIVE_TIMESTAMP,
+    FIELD_FILTERED_POSITIVE_VERSION,
+    FIELD_LAB_ID,
+    FIELD_LH_SAMPLE_UUID,
+    FIELD_LINE_NUMBER,
+    FIELD_PLATE_BARCODE,
+    FIELD_RESULT,
+    FIELD_RNA_ID,
+    FIELD_RNA_PCR_ID,
+    FIELD_ROOT_SAMPLE_ID,
+    FIELD_SOURCE,
+    FIELD_UPDATED_AT,
+    FIELD_VIRAL_PREP_ID,
+)
+from crawler.types import ModifiedRow, SampleDoc, SampleFileDetails
+
+# (attribute, field) pairs of the values of a sample which differ from row to row
+SAMPLE_ROW_FIELDS: Final[Tuple[Tuple[str, str], ...]] = (
+    ("root_sample_id", FIELD_ROOT_SAMPLE_ID),
+    ("viral_prep_id", FIELD_VIRAL_PREP_ID),
+    ("rna_id", FIELD_RNA_ID),
+    ("rna_pcr_id", FIELD_RNA_PCR_ID),
+    ("result", FIELD_RESULT),
+    ("date_tested", FIELD_DATE_TESTED),
+    ("lab_id", FIELD_LAB_ID),
+    ("ch1_target", FIELD_CH1_TARGET),
+    ("ch1_result", FIELD_CH1_RESULT),
+    ("ch1_cq", FIELD_CH1_CQ),
+    ("ch2_target", FIELD_CH2_TARGET),
+    ("ch2_result", FIELD_CH2_RESULT),
+    ("ch2_cq", FIELD_CH2_CQ),
+    ("ch3_target", FIELD_CH3_TARGET),
+    ("ch3_result", FIELD_CH3_RESULT),
+    ("ch3_cq", FIELD_CH3_CQ),
+    ("ch4_target", FIELD_CH4_TARGET),
+    ("ch4_result", FIELD_CH4_RESULT),
+    ("ch4_cq", FIELD_CH4_CQ),
+    ("plate_barcode", FIELD_PLATE_BARCODE),
+    ("coordinate", FIELD_COORDINATE),
+    ("line_number", FIELD_LINE_NUMBER),
+    ("filtered_positive", FIELD_FILTERED_POSITIVE),
+    ("lh_sample_uuid", FIELD_LH_SAMPLE_UUID),
+)
+
+
+class Sample:
+    """A parsed and validated row of a centre's file, held until it is written to the databases.
+
+    Only the values which differ from row to row are stored on the sample; the values which are the same for every
+    row of the file are shared through the file details. A field which was not in the row, such as the channel fields
+    of a file without them, is left unset and is not added to the sample's mongo document.
+    """
+
+    __slots__ = ("file_details",) + tuple(attribute for attribute, _ in SAMPLE_ROW_FIELDS)
+
+    file_details: SampleFileDetails
+
+    # the values of the row
+    root_sample_id: str
+    viral_prep_id: Optional[str]
+    rna_id: str
+    rna_pcr_id: Optional[str]
+    result: str
+    date_tested: Optional[datetime]
+    lab_id: str
+    ch1_target: Optional[str]
+    ch1_result: Optional[str]
+    ch1_cq: Optional[Decimal128]
+    ch2_target: Optional[str]
+    ch2_result: Optional[str]
+    ch2_cq: Optional[Decimal128]
+    ch3_target: Optional[str]
+    ch3_result: Optional[str]
+    ch3_cq: Optional[Decimal128]
+    ch4_target: Optional[str]
+    ch4_result: Optional[str]
+    ch4_cq: Optional[Decimal128]
+
+    # the values which are set on the sample after it is created from the row
+    plate_barcode: str
+    coordinate: Optional[str]
+    line_number: int
+    filtered_positive: bool
+    lh_sample_uuid: str
+
+    def __init__(self, file_details: SampleFileDetails):
+        """Initialiser for a sample of a file, with none of its row values set.
+
+        Arguments:
+            file_details {SampleFileDetails} -- the values shared by all the samples of the file
+        """
+        self.file_details = file_details
+
+    @classmethod
+    def from_row(cls, row: ModifiedRow, file_details: SampleFileDetails) -> "Sample":
+        """Creates a sample from the values of a parsed and validated row.
+
+        Arguments:
+            row {ModifiedRow} -- the row, with its values converted
+            file_details {SampleFileDetails} -- the values shared by all the samples of the file
+
+        Returns:
+            Sample -- the sample with the values of the row which have a sample field
+        """
+        sample = cls(file_details)
+        for attribute, field in SAMPLE_ROW_FIELDS:
+            if field in row:
+                setattr(sample, attribute, row[field])
+
+        return sample
+
+    def to_mongo_doc(self) -> SampleDoc:
+        """Converts the sample to the document inserted into the samples collection.
+
+        Returns:
+            SampleDoc -- the fields of the row which are set, and the fields shared by the samples of the file
+        """
+        doc: SampleDoc = {}
+        for attribute, field in SAMPLE_ROW_FIELDS:
+            try:
+                doc[field] = getattr(self, attribute)
+            except AttributeError:
+                pass
+
+        file_details = self.file_details
+        doc[FIELD_SOURCE] = file_details.source
+        doc[FIELD_FILE_NAME] = file_details.file_name
+        doc[FIELD_FILE_NAME_DATE] = file_details.file_name_date
+        doc[FIELD_CREATED_AT] = file_details.parsed_at
+        doc[FIELD_UPDATED_AT] = file_details.parsed_at
+        doc[FIELD_FILTERED_POSITIVE_VERSION] = file_details.filtered_positive_version
+        doc[FIELD_FILTERED_POSITIVE_TIMESTAMP] = file_details.parsed_at
+
+        return doc
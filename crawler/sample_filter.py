@@ -0,0 +1,399 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+from typing import TYPE_CHECKING, Final, Iterable, List, Optional, Sequence, cast
+
+from more_itertools import chunked
+from pymongo.collection import Collection
+
+from crawler.constants import SAMPLES_UNIQUE_FIELDS
+from crawler.types import Config, SampleDoc
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# the header of a saved filter: a magic string then the number of bits, hashes, the capacity and the keys added
+FILTER_MAGIC: Final[bytes] = b"CRAWLBF1"
+FILTER_HEADER: Final = struct.Struct("<8sQQQQ")
+# number of samples read from mongo and added to the filter at a time when rebuilding it
+REBUILD_BATCH_SIZE: Final[int] = 100_000
+# separates the values of the unique fields in the signature of a sample
+SIGNATURE_SEPARATOR: Final[str] = "\x1f"
+
+
+class BloomFilter:
+    """A Bloom filter of strings: a key which has been added is always found, and a key which has not been added is
+    found with a probability of about the error rate the filter was sized for, until more keys than its capacity have
+    been added.
+
+    The bits of a key are chosen by double hashing the two halves of its BLAKE2b digest, and keys are added and looked
+    up in batches with numpy.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, capacity: int, count: int = 0, bits: Optional[bytes] = None):
+        """Initialiser for a filter, empty unless its bits are given.
+
+        Arguments:
+            num_bits {int} -- the number of bits of the filter
+            num_hashes {int} -- the number of bits set for each key
+            capacity {int} -- the number of keys the filter was sized for
+            count {int} -- the number of keys added to the bits. Defaults to 0.
+            bits {Optional[bytes]} -- the bits of a saved filter. Defaults to None, for an empty filter.
+        """
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.capacity = capacity
+        self.count = count
+
+        # numpy is only imported when a filter is used, so that importing the crawler does not load it
+        import numpy as np
+
+        num_bytes = (num_bits + 7) // 8
+        if bits is None:
+            self.bits = np.zeros(num_bytes, dtype=np.uint8)
+        elif len(bits) == num_bytes:
+            self.bits = np.frombuffer(bits, dtype=np.uint8).copy()
+        else:
+            raise ValueError(f"Expected {num_bytes} bytes of bits, got {len(bits)}")
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """Creates an empty filter sized so that, once it holds capacity keys, a key which was not added is found with
+        a probability of error_rate.
+
+        Arguments:
+            capacity {int} -- the number of keys the filter is sized for
+            error_rate {float} -- the rate of false positives once the filter holds capacity keys
+
+        Returns:
+            BloomFilter -- the empty filter
+        """
+        capacity = max(capacity, 1)
+        num_bits = max(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        num_hashes = max(round(num_bits / capacity * math.log(2)), 1)
+
+        return cls(num_bits, num_hashes, capacity)
+
+    def bit_positions(self, keys: Sequence[str]) -> "np.ndarray":
+        """The bits of each key.
+
+        Arguments:
+            keys {Sequence[str]} -- the keys
+
+        Returns:
+            np.ndarray -- the positions of the num_hashes bits of each key, one row per key
+        """
+        import numpy as np
+
+        digests = b"".join(hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys)
+        halves = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+
+        # unsigned 64 bit arithmetic wraps around, which does not matter for choosing the bits
+        with np.errstate(over="ignore"):
+            hashes = halves[:, :1] + np.arange(self.num_hashes, dtype=np.uint64) * halves[:, 1:]
+
+        return cast("np.ndarray", hashes % np.uint64(self.num_bits))
+
+    def add(self, keys: Sequence[str]) -> None:
+        """Adds keys to the filter.
+
+        Arguments:
+            keys {Sequence[str]} -- the keys
+        """
+        if not keys:
+            return
+
+        import numpy as np
+
+        positions = self.bit_positions(keys).ravel()
+        masks = np.left_shift(np.uint64(1), positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+        self.count += len(keys)
+
+    def contains(self, keys: Sequence[str]) -> "np.ndarray":
+        """Looks up keys in the filter.
+
+        Arguments:
+            keys {Sequence[str]} -- the keys
+
+        Returns:
+            np.ndarray -- boolean mask of the keys which were probably added; a key which is not found was never added
+        """
+        import numpy as np
+
+        if not keys:
+            return np.zeros(0, dtype=bool)
+
+        positions = self.bit_positions(keys)
+        found = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+
+        return cast("np.ndarray", found.all(axis=1))
+
+    def merge(self, other: "BloomFilter") -> bool:
+        """Adds the keys of another filter of the same size to this one, e.g. those added by another process.
+
+        Arguments:
+            other {BloomFilter} -- the other filter
+
+        Returns:
+            bool -- True if the filters were the same size and have been merged; otherwise False
+        """
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            return False
+
+        import numpy as np
+
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        # the keys added to both filters are not known, so the count is estimated from the bits now set
+        self.count = max(self.count, other.count, self.estimated_count())
+
+        return True
+
+    def estimated_count(self) -> int:
+        """Estimates the number of distinct keys added to the filter from the number of its bits which are set, as
+        -num_bits / num_hashes * ln(1 - set bits / num_bits).
+
+        Returns:
+            int -- the estimated number of keys added
+        """
+        import numpy as np
+
+        # a filter with every bit set is counted as if one bit was still clear, so that the estimate is finite
+        set_bits = min(int(np.unpackbits(self.bits).sum()), self.num_bits - 1)
+
+        return round(-self.num_bits / self.num_hashes * math.log(1 - set_bits / self.num_bits))
+
+    def to_bytes(self) -> bytes:
+        """The filter as saved to a file.
+
+        Returns:
+            bytes -- the header of the filter followed by its bits
+        """
+        return FILTER_HEADER.pack(FILTER_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count) + bytes(
+            self.bits
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Loads a filter saved by to_bytes.
+
+        Arguments:
+            data {bytes} -- the saved filter
+
+        Raises:
+            ValueError: if the data is not a saved filter
+
+        Returns:
+            BloomFilter -- the filter
+        """
+        if len(data) < FILTER_HEADER.size:
+            raise ValueError("Too short to be a saved filter")
+
+        magic, num_bits, num_hashes, capacity, count = FILTER_HEADER.unpack_from(data)
+        if magic != FILTER_MAGIC:
+            raise ValueError("Not a saved filter")
+
+        return cls(num_bits, num_hashes, capacity, count, data[FILTER_HEADER.size :])  # noqa: E203
+
+
+def sample_signature(sample: SampleDoc) -> str:
+    """The signature of a sample: the values of the fields of the unique index on the samples collection.
+
+    Arguments:
+        sample {SampleDoc} -- the sample, as inserted into or read from the samples collection
+
+    Returns:
+        str -- the signature
+    """
+    return SIGNATURE_SEPARATOR.join(str(sample.get(field)) for field in SAMPLES_UNIQUE_FIELDS)
+
+
+class SampleFilter:
+    """A Bloom filter of the signatures of the samples in the samples collection, used to find the samples of a file
+    which are probably in mongo already before inserting them, without a query for the samples which are certainly new.
+
+    The filter is saved to SAMPLES_FILTER_FILE, and rebuilt from the samples collection when the file is missing or
+    unreadable, or once more samples than its capacity have been added. Samples are added as they are inserted. A sample
+    inserted by anything else is not in the filter until it is rebuilt, so it is still found as a duplicate by the
+    unique index on the samples collection.
+    """
+
+    def __init__(self, config: Config):
+        """Initialiser for the filter, which is loaded the first time it is used.
+
+        Arguments:
+            config {Config} -- application config specifying the file and size of the filter
+        """
+        self.config = config
+        self.path = config.SAMPLES_FILTER_FILE
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._bloom_filter: Optional[BloomFilter] = None
+        self._added_since_save = 0
+
+    def load(self, samples_collection: Collection) -> BloomFilter:
+        """The filter, which is loaded from its file or rebuilt from the samples collection the first time.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection, to rebuild the filter from if needed
+
+        Returns:
+            BloomFilter -- the filter
+        """
+        with self._lock:
+            if self._bloom_filter is None:
+                bloom_filter = self.read()
+                if bloom_filter is None or bloom_filter.count > bloom_filter.capacity:
+                    bloom_filter = self.build(samples_collection)
+                    self._added_since_save = bloom_filter.count
+
+                self._bloom_filter = bloom_filter
+
+            return self._bloom_filter
+
+    def read(self) -> Optional[BloomFilter]:
+        """Reads the filter saved to its file.
+
+        Returns:
+            Optional[BloomFilter] -- the filter, or None if the file is missing or not a saved filter
+        """
+        try:
+            with open(self.path, "rb") as filter_file:
+                return BloomFilter.from_bytes(filter_file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed reading the samples filter {self.path}: {e}")
+            return None
+
+    def build(self, samples_collection: Collection) -> BloomFilter:
+        """Builds a filter of the samples in the samples collection, sized for at least twice as many samples.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection
+
+        Returns:
+            BloomFilter -- the filter
+        """
+        num_samples = samples_collection.estimated_document_count()
+        logger.info(f"Building the samples filter {self.path} from {num_samples} samples")
+
+        bloom_filter = BloomFilter.for_capacity(
+            max(self.config.SAMPLES_FILTER_CAPACITY, 2 * num_samples), self.config.SAMPLES_FILTER_ERROR_RATE
+        )
+        samples = samples_collection.find(
+            {}, projection={**{field: True for field in SAMPLES_UNIQUE_FIELDS}, "_id": False}, batch_size=10_000
+        )
+        for batch in chunked(samples, REBUILD_BATCH_SIZE):
+            bloom_filter.add([sample_signature(sample) for sample in batch])
+
+        return bloom_filter
+
+    def might_contain(self, samples_collection: Collection, samples: Sequence[SampleDoc]) -> List[bool]:
+        """Looks up samples in the filter.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection, to rebuild the filter from if needed
+            samples {Sequence[SampleDoc]} -- the samples
+
+        Returns:
+            List[bool] -- whether each sample is probably in the samples collection; a sample which is not is new
+        """
+        bloom_filter = self.load(samples_collection)
+        signatures = [sample_signature(sample) for sample in samples]
+
+        with self._lock:
+            return cast(List[bool], bloom_filter.contains(signatures).tolist())
+
+    def add(self, samples_collection: Collection, samples: Iterable[SampleDoc]) -> None:
+        """Adds samples inserted into the samples collection to the filter.
+
+        Arguments:
+            samples_collection {Collection} -- the samples collection, to rebuild the filter from if needed
+            samples {Iterable[SampleDoc]} -- the samples
+        """
+        bloom_filter = self.load(samples_collection)
+        signatures = [sample_signature(sample) for sample in samples]
+
+        with self._lock:
+            bloom_filter.add(signatures)
+            self._added_since_save += len(signatures)
+
+    def save(self) -> None:
+        """Saves the filter if samples have been added since it was loaded or saved. The filter saved by another
+        process since is merged in, and the file is written to a temporary file which is renamed, so that it is never
+        left partly written.
+        """
+        with self._lock:
+            if self._bloom_filter is None or self._added_since_save == 0:
+                return
+
+            if (saved_filter := self.read()) is not None:
+                self._bloom_filter.merge(saved_filter)
+
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                if directory := os.path.dirname(self.path):
+                    os.makedirs(directory, exist_ok=True)
+
+                with open(temporary_path, "wb") as filter_file:
+                    filter_file.write(self._bloom_filter.to_bytes())
+
+                os.replace(temporary_path, self.path)
+                self._added_since_save = 0
+            except OSError as e:
+                logger.error(f"Failed saving the samples filter to {self.path}")
+                logger.exception(e)
+
+
+_sample_filter: Optional[SampleFilter] = None
+_sample_filter_lock = threading.Lock()
+
+
+def get_sample_filter(config: Config) -> Optional[SampleFilter]:
+    """The samples filter of the process, which is created the first time it is used. A filter created with another
+    config is saved and replaced, and a process forked from one with a filter creates its own.
+
+    Arguments:
+        config {Config} -- application config specifying the file and size of the filter
+
+    Returns:
+        Optional[SampleFilter] -- the filter, or None if SAMPLES_FILTER_FILE is empty
+    """
+    global _sample_filter
+
+    if not config.SAMPLES_FILTER_FILE:
+        return None
+
+    with _sample_filter_lock:
+        sample_filter = _sample_filter
+        if sample_filter is None or sample_filter.pid != os.getpid() or sample_filter.config is not config:
+            if sample_filter is not None and sample_filter.pid == os.getpid():
+                sample_filter.save()
+
+            sample_filter = _sample_filter = SampleFilter(config)
+
+    return sample_filter
+
+
+def save_sample_filter() -> None:
+    """Saves the samples filter of the process, if there is one."""
+    with _sample_filter_lock:
+        sample_filter = _sample_filter
+
+    if sample_filter is not None and sample_filter.pid == os.getpid():
+        sample_filter.save()
+
+
+def close_sample_filter() -> None:
+    """Forgets the samples filter of the process without saving it, so that the next use loads it again."""
+    global _sample_filter
+
+    with _sample_filter_lock:
+        _sample_filter = None
@@ -0,0 +1,152 @@
+import logging
+import queue
+import threading
+from types import TracebackType
+from typing import Callable, List, Optional, Tuple, Type
+
+from crawler.stage_timer import STAGE_DART_INSERT, STAGE_MLWH_INSERT
+from crawler.types import SampleDoc
+
+logger = logging.getLogger(__name__)
+
+# put on a queue to tell the worker reading it that there are no more batches
+END_OF_BATCHES = None
+
+# a batch of samples and the number of the chunk of the file it came from, if the writes are recorded
+Batch = Tuple[List[SampleDoc], Optional[int]]
+
+
+class SampleWritePipeline:
+    """Writes the batches of samples inserted into mongo to the MLWH and then, if the MLWH insert succeeded, to DART.
+
+    With a queue size of more than 0 each database is written by its own worker thread, so that a batch is written to
+    the MLWH and DART while the next batch is parsed and inserted into mongo. The queues in front of the workers are
+    bounded so that submitting a batch blocks, rather than holding more batches in memory, when the writes fall behind.
+    The batches are written to each database in the order they are submitted. With a queue size of 0 each batch is
+    written before submit returns.
+
+    The write functions are expected to trap and record their own errors; anything they raise is logged and the batch
+    is treated as failed, so it is not written to DART.
+
+    A batch submitted with the number of its chunk is passed to record_written once it has been written to each
+    database, so that a file can be resumed from the chunks already written.
+    """
+
+    def __init__(
+        self,
+        write_mlwh: Callable[[List[SampleDoc]], bool],
+        write_dart: Optional[Callable[[List[SampleDoc]], bool]],
+        queue_size: int,
+        record_written: Optional[Callable[[int, str], None]] = None,
+    ):
+        """Initialiser for the pipeline, which starts its worker threads when entered.
+
+        Arguments:
+            write_mlwh {Callable[[List[SampleDoc]], bool]} -- writes a batch to the MLWH, returning whether it succeeded
+            write_dart {Optional[Callable[[List[SampleDoc]], bool]]} -- writes a batch to DART, returning whether it
+            succeeded, or None to not write the samples to DART
+            queue_size {int} -- the number of batches which can wait for each worker, or 0 to write without workers
+            record_written {Optional[Callable[[int, str], None]]} -- records the stage (STAGE_MLWH_INSERT or
+            STAGE_DART_INSERT) of a chunk written successfully. Defaults to None, to not record the writes.
+        """
+        self.write_mlwh = write_mlwh
+        self.write_dart = write_dart
+        self.queue_size = queue_size
+        self.record_written = record_written
+
+        self._mlwh_queue: "queue.Queue[Optional[Batch]]" = queue.Queue(maxsize=queue_size)
+        self._dart_queue: "queue.Queue[Optional[Batch]]" = queue.Queue(maxsize=queue_size)
+        self._workers: List[threading.Thread] = []
+
+    def __enter__(self) -> "SampleWritePipeline":
+        if self.queue_size > 0:
+            self._workers.append(threading.Thread(target=self._mlwh_worker, name="mlwh-writer", daemon=True))
+            if self.write_dart is not None:
+                self._workers.append(threading.Thread(target=self._dart_worker, name="dart-writer", daemon=True))
+
+            for worker in self._workers:
+                worker.start()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        # the batches submitted are already in mongo so they are written to the MLWH and DART even if the caller failed
+        self.close()
+
+    def submit(self, docs: List[SampleDoc], chunk: Optional[int] = None) -> None:
+        """Writes a batch of samples inserted into mongo to the MLWH and DART, blocking while the queue is full.
+
+        Arguments:
+            docs {List[SampleDoc]} -- the mongo documents of the samples, including their mongo ids
+            chunk {Optional[int]} -- the number of the chunk of the file the samples came from, to record the writes
+            of. Defaults to None.
+        """
+        if not self._workers:
+            if self._write_mlwh((docs, chunk)):
+                self._write_dart((docs, chunk))
+        else:
+            self._mlwh_queue.put((docs, chunk))
+
+    def close(self) -> None:
+        """Waits for the batches submitted to be written and stops the worker threads."""
+        if self._workers:
+            self._mlwh_queue.put(END_OF_BATCHES)
+            for worker in self._workers:
+                worker.join()
+
+            self._workers = []
+
+    def _mlwh_worker(self) -> None:
+        while (batch := self._mlwh_queue.get()) is not END_OF_BATCHES:
+            # DART is only written once the MLWH insert of the same samples has succeeded
+            if self._write_mlwh(batch) and self.write_dart is not None:
+                self._dart_queue.put(batch)
+
+        if self.write_dart is not None:
+            self._dart_queue.put(END_OF_BATCHES)
+
+    def _dart_worker(self) -> None:
+        while (batch := self._dart_queue.get()) is not END_OF_BATCHES:
+            self._write_dart(batch)
+
+    def _write_mlwh(self, batch: Batch) -> bool:
+        docs, chunk = batch
+        try:
+            written = self.write_mlwh(docs)
+        except Exception as e:
+            logger.error("Failed writing a batch of samples to the MLWH")
+            logger.exception(e)
+            return False
+
+        if written:
+            self._record_written(chunk, STAGE_MLWH_INSERT)
+
+        return written
+
+    def _write_dart(self, batch: Batch) -> None:
+        if self.write_dart is None:
+            return
+
+        docs, chunk = batch
+        try:
+            if self.write_dart(docs):
+                self._record_written(chunk, STAGE_DART_INSERT)
+        except Exception as e:
+            logger.error("Failed writing a batch of samples to DART")
+            logger.exception(e)
+
+    def _record_written(self, chunk: Optional[int], stage: str) -> None:
+        if chunk is None or self.record_written is None:
+            return
+
+        try:
+            self.record_written(chunk, stage)
+        except Exception as e:
+            # the samples were written, so at worst the chunk is written again if the file is resumed
+            logger.error(f"Failed recording the {stage} of chunk {chunk}")
+            logger.exception(e)
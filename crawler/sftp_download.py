@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+import os
+import posixpath
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Final, List, Optional
+
+from crawler.helpers.general_helpers import get_sftp_connection
+from crawler.types import Config, FileTransfer, RemoteFile
+
+if TYPE_CHECKING:
+    import pysftp
+
+logger = logging.getLogger(__name__)
+
+# suffix of the temporary file a remote file is downloaded to before being renamed; the centres' file regexes do not
+# match it so a partially downloaded file is never picked up for processing
+PARTIAL_DOWNLOAD_SUFFIX: Final[str] = ".part"
+
+
+def download_files(
+    config: Config, remote_dir: str, local_dir: str, remote_files: List[RemoteFile], max_workers: int
+) -> List[FileTransfer]:
+    """Downloads files from a directory on the SFTP server with up to max_workers concurrent transfers. Each worker
+    opens one SFTP connection and reuses it for all the files it downloads.
+
+    Every file is downloaded to a temporary file which is renamed once complete, so the local directory only ever
+    contains whole files. A file which fails to download is logged and skipped; it is not retried.
+
+    Arguments:
+        config {Config} -- application config
+        remote_dir {str} -- the directory on the SFTP server to download the files from
+        local_dir {str} -- the local directory to download the files to
+        remote_files {List[RemoteFile]} -- the files to download
+        max_workers {int} -- the maximum number of concurrent transfers, and so of SFTP connections
+
+    Returns:
+        List[FileTransfer] -- the size and duration of the transfer of each file downloaded
+    """
+    if not remote_files:
+        return []
+
+    files_to_download: "queue.Queue[RemoteFile]" = queue.Queue()
+    for remote_file in remote_files:
+        files_to_download.put(remote_file)
+
+    transfers: List[FileTransfer] = []
+    transfers_lock = threading.Lock()
+
+    def download_worker() -> None:
+        try:
+            with get_sftp_connection(config) as sftp:
+                while True:
+                    try:
+                        remote_file = files_to_download.get_nowait()
+                    except queue.Empty:
+                        return
+
+                    if (transfer := download_file(sftp, remote_dir, local_dir, remote_file)) is not None:
+                        with transfers_lock:
+                            transfers.append(transfer)
+        except Exception as e:
+            logger.error(f"Failed connecting to the SFTP server to download files from {remote_dir}")
+            logger.exception(e)
+
+    start = time.perf_counter()
+    num_workers = min(max_workers, len(remote_files))
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="sftp") as executor:
+        for _ in range(num_workers):
+            executor.submit(download_worker)
+
+    log_transfers(transfers, time.perf_counter() - start)
+
+    if (num_failed := len(remote_files) - len(transfers)) > 0:
+        logger.error(f"{num_failed} file(s) could not be downloaded from {remote_dir}")
+
+    return transfers
+
+
+def download_file(
+    sftp: pysftp.Connection, remote_dir: str, local_dir: str, remote_file: RemoteFile
+) -> Optional[FileTransfer]:
+    """Downloads a single file to a temporary file, which is renamed to the file name once the transfer is complete.
+
+    Arguments:
+        sftp {pysftp.Connection} -- the connection to the SFTP server
+        remote_dir {str} -- the directory on the SFTP server to download the file from
+        local_dir {str} -- the local directory to download the file to
+        remote_file {RemoteFile} -- the file to download
+
+    Returns:
+        Optional[FileTransfer] -- the size and duration of the transfer, or None if it failed
+    """
+    local_path = os.path.join(local_dir, remote_file.file_name)
+    partial_path = f"{local_path}{PARTIAL_DOWNLOAD_SUFFIX}"
+
+    start = time.perf_counter()
+    try:
+        sftp.get(posixpath.join(remote_dir, remote_file.file_name), partial_path, preserve_mtime=True)
+        os.replace(partial_path, local_path)
+    except Exception as e:
+        logger.error(f"Failed downloading {remote_file.file_name} from {remote_dir}")
+        logger.exception(e)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+        return None
+
+    transfer = FileTransfer(remote_file, time.perf_counter() - start)
+    logger.debug(f"Downloaded {remote_file.file_name} ({remote_file.size} bytes) in {transfer.seconds:.3f}s")
+
+    return transfer
+
+
+def log_transfers(transfers: List[FileTransfer], seconds: float) -> None:
+    """Logs the throughput and per-file latency of a set of downloads.
+
+    Arguments:
+        transfers {List[FileTransfer]} -- the downloads
+        seconds {float} -- the time taken by all the downloads
+    """
+    if not transfers:
+        return
+
+    total_bytes = sum(transfer.remote_file.size for transfer in transfers)
+    latencies = sorted(transfer.seconds for transfer in transfers)
+
+    logger.info(
+        f"Downloaded {len(transfers)} file(s), {total_bytes} bytes in {seconds:.2f}s "
+        f"({total_bytes / max(seconds, 1e-6):.0f} bytes/sec); per file latency: "
+        f"mean {sum(latencies) / len(latencies):.3f}s, max {latencies[-1]:.3f}s"
+    )
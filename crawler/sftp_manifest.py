@@ -0,0 +1,56 @@
+import logging
+from typing import Final, Set
+
+from crawler.sqlite_store import SqliteStore
+from crawler.types import RemoteFile
+
+logger = logging.getLogger(__name__)
+
+SFTP_MANIFEST_FILE: Final[str] = "sftp_manifest.sqlite3"
+
+SQL_CREATE_REMOTE_FILES_TABLE = """\
+CREATE TABLE IF NOT EXISTS remote_files (
+    file_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    PRIMARY KEY (file_name)
+)
+"""
+SQL_UPSERT_REMOTE_FILE = "INSERT OR REPLACE INTO remote_files VALUES (?, ?, ?)"
+SQL_SELECT_REMOTE_FILES = "SELECT file_name, size, mtime FROM remote_files"
+SQL_DELETE_REMOTE_FILES = "DELETE FROM remote_files"
+
+
+class SftpManifest(SqliteStore):
+    """A manifest of the files of a centre on the SFTP server which have been processed, recorded by name, size and
+    modification time as listed on the server.
+
+    The manifest is a SQLite database stored in the centre's backups folder, next to the checksum index. It lets an
+    incremental sync skip the files that were already processed before transferring them; a file whose size or
+    modification time has changed since it was processed is transferred again.
+    """
+
+    FILE_NAME = SFTP_MANIFEST_FILE
+    SCHEMA = (SQL_CREATE_REMOTE_FILES_TABLE,)
+
+    def processed_files(self) -> Set[RemoteFile]:
+        """The remote files recorded as processed.
+
+        Returns:
+            Set[RemoteFile] -- the name, size and modification time of each file as they were when processed
+        """
+        return {RemoteFile(*row) for row in self.fetch_all(SQL_SELECT_REMOTE_FILES)}
+
+    def add(self, remote_file: RemoteFile) -> None:
+        """Record a remote file as processed, replacing the record of an earlier version of the file.
+
+        Arguments:
+            remote_file {RemoteFile} -- the name, size and modification time of the file on the server
+        """
+        self.execute(SQL_UPSERT_REMOTE_FILE, remote_file)
+
+    def clear(self) -> None:
+        """Forget every recorded file, so that the next incremental sync transfers all the files again."""
+        self.execute(SQL_DELETE_REMOTE_FILES)
+
+        logger.debug(f"Cleared SFTP manifest {self.database_path}")
@@ -72,6 +72,66 @@ lh_sample_uuid=VALUES(lh_sample_uuid),
 lh_source_plate_uuid=VALUES(lh_source_plate_uuid);
 """
 
+# columns of lighthouse_sample written by SQL_MLWH_MULTIPLE_INSERT, and by loading samples through a staging table
+MLWH_SAMPLE_COLUMNS = (
+    "mongodb_id",
+    "root_sample_id",
+    "rna_id",
+    "plate_barcode",
+    "coordinate",
+    "result",
+    "date_tested",
+    "source",
+    "lab_id",
+    "ch1_target",
+    "ch1_result",
+    "ch1_cq",
+    "ch2_target",
+    "ch2_result",
+    "ch2_cq",
+    "ch3_target",
+    "ch3_result",
+    "ch3_cq",
+    "ch4_target",
+    "ch4_result",
+    "ch4_cq",
+    "filtered_positive",
+    "filtered_positive_version",
+    "filtered_positive_timestamp",
+    "lh_sample_uuid",
+    "lh_source_plate_uuid",
+    "created_at",
+    "updated_at",
+)
+
+# SQL queries to load many samples into the MLWH with LOAD DATA through a temporary staging table, then upsert them
+# with the same rules as SQL_MLWH_MULTIPLE_INSERT
+SQL_MLWH_CREATE_SAMPLES_STAGING_TABLE = f"""\
+CREATE TEMPORARY TABLE lighthouse_sample_staging
+SELECT {", ".join(MLWH_SAMPLE_COLUMNS)} FROM lighthouse_sample LIMIT 0
+"""
+
+SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE = f"""\
+LOAD DATA LOCAL INFILE %s INTO TABLE lighthouse_sample_staging CHARACTER SET utf8mb4
+({", ".join(MLWH_SAMPLE_COLUMNS)})
+"""
+
+SQL_MLWH_UPSERT_SAMPLES_FROM_STAGING_TABLE = f"""\
+INSERT INTO lighthouse_sample ({", ".join(MLWH_SAMPLE_COLUMNS)})
+SELECT {", ".join(MLWH_SAMPLE_COLUMNS)} FROM lighthouse_sample_staging
+ON DUPLICATE KEY UPDATE
+plate_barcode=VALUES(plate_barcode),
+coordinate=VALUES(coordinate),
+date_tested=VALUES(date_tested),
+source=VALUES(source),
+lab_id=VALUES(lab_id),
+updated_at=VALUES(updated_at),
+lh_sample_uuid=VALUES(lh_sample_uuid),
+lh_source_plate_uuid=VALUES(lh_source_plate_uuid);
+"""
+
+SQL_MLWH_DROP_SAMPLES_STAGING_TABLE = "DROP TEMPORARY TABLE IF EXISTS lighthouse_sample_staging"
+
 SQL_MLWH_MULTIPLE_FILTERED_POSITIVE_UPDATE = """\
 UPDATE lighthouse_sample
 SET
@@ -111,6 +171,10 @@ SQL_DART_GET_PLATE_BARCODES = """\
 SELECT DISTINCT [Labware LIMS BARCODE] FROM dbo.view_plate_maps WHERE [Labware state] = ?
 """
 
+SQL_DART_GET_PLATE_STATES = """\
+SELECT DISTINCT [Labware LIMS BARCODE], [Labware state] FROM dbo.view_plate_maps WHERE [Labware LIMS BARCODE] IN (%s)
+"""
+
 SQL_DART_SET_WELL_PROPERTY = "{CALL dbo.plDART_PlateUpdateWell (?,?,?,?)}"
 
 SQL_DART_ADD_PLATE = "{CALL dbo.plDART_PlateCreate (?,?,?)}"
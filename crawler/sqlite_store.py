@@ -0,0 +1,88 @@
+import logging
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from typing import Any, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteStore:
+    """A SQLite database stored in a centre's backups folder, such as the checksum index or the SFTP manifest.
+
+    Each read or write opens its own connection, which is closed once it is done, so that a store can be shared by the
+    threads processing a centre. The tables of the store are created when a connection is opened, if they do not exist.
+    """
+
+    # the name of the database file in the backups folder
+    FILE_NAME: str = ""
+    # the statements which create the tables of the store
+    SCHEMA: Tuple[str, ...] = ()
+
+    def __init__(self, backups_folder: str):
+        """Initialiser for the store of a centre.
+
+        Arguments:
+            backups_folder {str} -- the centre's backups folder
+        """
+        self.backups_folder = backups_folder
+        self.database_path = os.path.join(backups_folder, self.FILE_NAME)
+
+    def connect(self) -> sqlite3.Connection:
+        """Connect to the database, creating its tables if they do not exist.
+
+        Returns:
+            sqlite3.Connection -- a connection to the database
+        """
+        connection = sqlite3.connect(self.database_path)
+        try:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+        except BaseException:
+            connection.close()
+            raise
+
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """A connection to the database, whose writes are committed together when the block exits without an error and
+        rolled back otherwise. The connection is closed either way.
+
+        Yields:
+            sqlite3.Connection -- a connection to the database
+        """
+        try:
+            with closing(self.connect()) as connection:
+                with connection:
+                    yield connection
+        except sqlite3.Error:
+            logger.error(f"Failed writing to {self.database_path}")
+            raise
+
+    def fetch_all(self, sql: str, parameters: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Run a query and fetch the rows it returns.
+
+        Arguments:
+            sql {str} -- the query
+            parameters {Sequence[Any]} -- the values of the placeholders in the query. Defaults to ().
+
+        Returns:
+            List[Tuple[Any, ...]] -- the rows returned
+        """
+        try:
+            with closing(self.connect()) as connection:
+                return connection.execute(sql, parameters).fetchall()
+        except sqlite3.Error:
+            logger.error(f"Failed reading from {self.database_path}")
+            raise
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> None:
+        """Run a statement in its own transaction.
+
+        Arguments:
+            sql {str} -- the statement
+            parameters {Sequence[Any]} -- the values of the placeholders in the statement. Defaults to ().
+        """
+        with self.transaction() as connection:
+            connection.execute(sql, parameters)
@@ -0,0 +1,219 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Final, Iterable, Iterator, List, Sized, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# the stages of processing a file, in the order they run
+STAGE_STATE_CHECK: Final[str] = "state_check"
+STAGE_PARSE: Final[str] = "parse_and_validate"
+STAGE_SOURCE_PLATES: Final[str] = "source_plate_assignment"
+STAGE_MONGO_INSERT: Final[str] = "mongo_insert"
+STAGE_MLWH_INSERT: Final[str] = "mlwh_upsert"
+STAGE_DART_INSERT: Final[str] = "dart_write"
+STAGE_BACKUP: Final[str] = "backup"
+
+STAGES: Final[Tuple[str, ...]] = (
+    STAGE_STATE_CHECK,
+    STAGE_PARSE,
+    STAGE_SOURCE_PLATES,
+    STAGE_MONGO_INSERT,
+    STAGE_MLWH_INSERT,
+    STAGE_DART_INSERT,
+    STAGE_BACKUP,
+)
+
+PROMETHEUS_METRIC_PREFIX: Final[str] = "crawler"
+
+SizedT = TypeVar("SizedT", bound=Sized)
+
+
+class StageTiming:
+    """The wall time spent in a stage and the number of rows it handled, accumulated over each time the stage ran."""
+
+    __slots__ = ("seconds", "rows")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class StageTimer:
+    """Records the wall time and row counts of the stages of processing a file, or of all the files of a centre.
+
+    The timings are stored on the file's import record and exported as Prometheus metrics for the centre, so that
+    slow stages can be found without a profiler.
+    """
+
+    def __init__(self) -> None:
+        """Initialiser for a timer with no stages recorded."""
+        self.stages: Dict[str, StageTiming] = {}
+
+    def stage_timing(self, stage: str) -> StageTiming:
+        """The timing of a stage, which is created the first time the stage is recorded.
+
+        Arguments:
+            stage {str} -- the name of the stage
+
+        Returns:
+            StageTiming -- the accumulated timing of the stage
+        """
+        if (stage_timing := self.stages.get(stage)) is None:
+            stage_timing = self.stages[stage] = StageTiming()
+
+        return stage_timing
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[StageTiming]:
+        """Adds the wall time of the block to a stage, even if the block raises. The rows handled by the block can be
+        added to the yielded timing.
+
+        Arguments:
+            stage {str} -- the name of the stage
+
+        Yields:
+            StageTiming -- the accumulated timing of the stage
+        """
+        stage_timing = self.stage_timing(stage)
+        start = time.perf_counter()
+        try:
+            yield stage_timing
+        finally:
+            stage_timing.seconds += time.perf_counter() - start
+
+    def time_iteration(self, stage: str, chunks: Iterable[SizedT]) -> Iterator[SizedT]:
+        """Adds the wall time taken to produce each chunk of an iterable to a stage, and the size of each chunk to its
+        rows. The time spent by the caller handling each chunk is not included.
+
+        Arguments:
+            stage {str} -- the name of the stage
+            chunks {Iterable[SizedT]} -- the chunks, e.g. the chunks of samples parsed from a file
+
+        Yields:
+            SizedT -- each chunk
+        """
+        iterator = iter(chunks)
+        while True:
+            with self.time(stage) as stage_timing:
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+
+                stage_timing.rows += len(chunk)
+
+            yield chunk
+
+    def add(self, other: "StageTimer") -> None:
+        """Adds the timings of another timer to this one, e.g. those of a file to the timings of its centre.
+
+        Arguments:
+            other {StageTimer} -- the timer to add
+        """
+        for stage, other_timing in other.stages.items():
+            stage_timing = self.stage_timing(stage)
+            stage_timing.seconds += other_timing.seconds
+            stage_timing.rows += other_timing.rows
+
+    def to_doc(self) -> Dict[str, Dict[str, float]]:
+        """The timings as stored on an import record, in the order the stages run.
+
+        Returns:
+            Dict[str, Dict[str, float]] -- the seconds and rows of each stage recorded, by stage name
+        """
+        return {
+            stage: {"seconds": round(stage_timing.seconds, 6), "rows": stage_timing.rows}
+            for stage, stage_timing in sorted(self.stages.items(), key=stage_order)
+        }
+
+    def summary(self) -> str:
+        """Describes the timings, for logging.
+
+        Returns:
+            str -- the seconds and rows of each stage recorded
+        """
+        return ", ".join(
+            f"{stage} {stage_timing.seconds:.3f}s ({stage_timing.rows} rows)"
+            for stage, stage_timing in sorted(self.stages.items(), key=stage_order)
+        )
+
+
+def stage_order(stage_item: Tuple[str, StageTiming]) -> Tuple[int, str]:
+    stage = stage_item[0]
+
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+
+def prometheus_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_metrics(centre_name: str, stage_timer: StageTimer, files_processed: int) -> str:
+    """Formats the stage timings of a centre as metrics in the Prometheus text exposition format.
+
+    Arguments:
+        centre_name {str} -- the name of the centre
+        stage_timer {StageTimer} -- the stage timings of the files processed for the centre
+        files_processed {int} -- the number of files processed for the centre
+
+    Returns:
+        str -- the metrics
+    """
+    centre_label = f'centre="{prometheus_label_value(centre_name)}"'
+    prefix = PROMETHEUS_METRIC_PREFIX
+
+    lines: List[str] = [
+        f"# HELP {prefix}_stage_duration_seconds Wall time spent in each stage of processing the files of a centre.",
+        f"# TYPE {prefix}_stage_duration_seconds gauge",
+    ]
+    stages = sorted(stage_timer.stages.items(), key=stage_order)
+    for stage, stage_timing in stages:
+        lines.append(f'{prefix}_stage_duration_seconds{{{centre_label},stage="{stage}"}} {stage_timing.seconds:.6f}')
+
+    lines += [
+        f"# HELP {prefix}_stage_rows Rows handled by each stage of processing the files of a centre.",
+        f"# TYPE {prefix}_stage_rows gauge",
+    ]
+    for stage, stage_timing in stages:
+        lines.append(f'{prefix}_stage_rows{{{centre_label},stage="{stage}"}} {stage_timing.rows}')
+
+    lines += [
+        f"# HELP {prefix}_files_processed Files of a centre processed in the last run.",
+        f"# TYPE {prefix}_files_processed gauge",
+        f"{prefix}_files_processed{{{centre_label}}} {files_processed}",
+        f"# HELP {prefix}_last_run_timestamp_seconds When the files of a centre were last processed.",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds{{{centre_label}}} {time.time():.0f}",
+    ]
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(
+    directory: str, file_prefix: str, centre_name: str, stage_timer: StageTimer, files_processed: int
+) -> None:
+    """Writes the stage timings of a centre to a file read by the textfile collector of the Prometheus node exporter.
+
+    The metrics are written to a temporary file which is renamed, so the collector never reads a partly written file.
+
+    Arguments:
+        directory {str} -- the directory read by the textfile collector
+        file_prefix {str} -- the centre's prefix, used to name the metrics file of the centre
+        centre_name {str} -- the name of the centre
+        stage_timer {StageTimer} -- the stage timings of the files processed for the centre
+        files_processed {int} -- the number of files processed for the centre
+    """
+    path = os.path.join(directory, f"{PROMETHEUS_METRIC_PREFIX}_{file_prefix}.prom")
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary_path, "w") as metrics_file:
+            metrics_file.write(prometheus_metrics(centre_name, stage_timer, files_processed))
+
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.error(f"Failed writing the Prometheus metrics of {centre_name} to {path}")
+        logger.exception(e)
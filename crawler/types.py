@@ -1,6 +1,6 @@
 from datetime import datetime
 from types import ModuleType
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from bson.decimal128 import Decimal128
 
@@ -16,6 +16,39 @@ SourcePlateDoc = Dict[str, Union[str, datetime]]  # mongo document that represen
 DartWellProp = Dict[str, str]  # well properties of a DART well 'object'
 
 
+class ColumnPlan(NamedTuple):
+    """How the columns of a CSV file map to the fields of a sample, worked out once from the file's headers."""
+
+    accepted_fields: Tuple[str, ...]  # accepted fields present in the file, copied across as they are
+    channel_fields: Tuple[Tuple[str, str], ...]  # (CSV header, channel field) pairs, in matching order
+    unexpected_headers: List[str]  # headers which are not recognised
+
+
+class SampleFileDetails(NamedTuple):
+    """The values shared by all the samples parsed from a file."""
+
+    source: str  # name of the centre
+    file_name: str
+    file_name_date: Optional[datetime]
+    parsed_at: datetime  # when the file was parsed, used as the creation time of its samples
+    filtered_positive_version: str
+
+
+class RemoteFile(NamedTuple):
+    """A file on the SFTP server, as listed by the server."""
+
+    file_name: str
+    size: int
+    mtime: int  # modification time, in seconds since the epoch
+
+
+class FileTransfer(NamedTuple):
+    """A file downloaded from the SFTP server and how long the download took."""
+
+    remote_file: RemoteFile
+    seconds: float
+
+
 class Config(ModuleType):
     """ModuleType class for the app config."""
 
@@ -25,6 +58,18 @@ class Config(ModuleType):
     # General
     ADD_LAB_ID: bool
     DIR_DOWNLOADED_DATA: str
+    CENTRES_PROCESSING_WORKERS: int
+    CENTRES_PROCESSING_POOL: str
+    FILE_PROCESSING_CHUNK_SIZE: int
+    SAMPLE_WRITE_QUEUE_SIZE: int
+    DAEMON_CYCLE_MINUTES: int
+    FILE_WATCH_POLL_SECONDS: int
+    FILE_WATCH_DEBOUNCE_SECONDS: int
+    FILE_WATCH_FULL_SWEEP_MINUTES: int
+    PROMETHEUS_TEXTFILE_DIR: str
+    SAMPLES_FILTER_FILE: str
+    SAMPLES_FILTER_CAPACITY: int
+    SAMPLES_FILTER_ERROR_RATE: float
 
     # Mongo
     MONGO_URI: str
@@ -33,6 +78,7 @@ class Config(ModuleType):
     MONGO_USERNAME: str
     MONGO_PASSWORD: str
     MONGO_DB: str
+    MONGO_MAX_POOL_SIZE: int
 
     # MLWH
     MLWH_DB_HOST: str
@@ -42,6 +88,8 @@ class Config(ModuleType):
     MLWH_DB_RW_USER: str
     MLWH_DB_RW_PASSWORD: str
     MLWH_DB_DBNAME: str
+    MLWH_LOAD_DATA_MIN_ROWS: int
+    MLWH_POOL_SIZE: int
     EVENTS_WH_DB: str
 
     # DART
@@ -53,6 +101,8 @@ class Config(ModuleType):
     DART_DB_DRIVER: str
 
     # SFTP
+    SFTP_INCREMENTAL_SYNC: bool
+    SFTP_DOWNLOAD_WORKERS: int
     SFTP_HOST: str
     SFTP_PORT: int
     SFTP_READ_USERNAME: str
@@ -1,20 +1,30 @@
 from logging import Handler
 
-from slack import WebClient
-from slack.errors import SlackApiError
-
 
 class SlackHandler(Handler):
     def __init__(self, token, channel_id):
         Handler.__init__(self)
-        self.client = WebClient(token)
+        self.token = token
         self.channel_id = channel_id
+        self._client = None
+
+    @property
+    def client(self):
+        # the Slack client is created on the first message, so that configuring logging does not import it
+        if self._client is None:
+            from slack import WebClient
+
+            self._client = WebClient(self.token)
+
+        return self._client
 
     def emit(self, record):
         log_entry = self.format(record)
         self.send_message(log_entry)
 
     def send_message(self, sent_str):
+        from slack.errors import SlackApiError
+
         try:
             self.client.chat_postMessage(
                 channel=self.channel_id,
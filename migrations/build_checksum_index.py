@@ -0,0 +1,30 @@
+import time
+from datetime import datetime
+
+from crawler.checksum_index import ChecksumIndex
+from crawler.file_processing import ERRORS_DIR, SUCCESSES_DIR
+from crawler.helpers.general_helpers import get_config
+
+
+def run(settings_module: str = "") -> None:
+    """(Re)builds the checksum index of each centre from the files in its backups folder.
+
+    Arguments:
+        settings_module {str} -- the settings module to load. Defaults to "".
+    """
+    config, settings_module = get_config(settings_module)
+
+    print("-" * 80)
+    print("STARTING CHECKSUM INDEX BUILD")
+    print(f"Time start: {datetime.now()}")
+    start = time.time()
+
+    for centre_config in config.CENTRES:
+        checksum_index = ChecksumIndex(centre_config["backups_folder"], (ERRORS_DIR, SUCCESSES_DIR))
+        num_indexed = checksum_index.rebuild()
+
+        print(f"Indexed {num_indexed} backup files for {centre_config['name']} in {checksum_index.database_path}")
+
+    print(f"Time taken: {round(time.time() - start, 2)}s")
+    print(f"Time finished: {datetime.now()}")
+    print("=" * 80)
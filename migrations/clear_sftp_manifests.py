@@ -0,0 +1,29 @@
+import time
+from datetime import datetime
+
+from crawler.helpers.general_helpers import get_config
+from crawler.sftp_manifest import SftpManifest
+
+
+def run(settings_module: str = "") -> None:
+    """Clears the SFTP manifest of each centre, so that the next incremental sync downloads every file again.
+
+    Arguments:
+        settings_module {str} -- the settings module to load. Defaults to "".
+    """
+    config, settings_module = get_config(settings_module)
+
+    print("-" * 80)
+    print("STARTING SFTP MANIFEST CLEAR")
+    print(f"Time start: {datetime.now()}")
+    start = time.time()
+
+    for centre_config in config.CENTRES:
+        sftp_manifest = SftpManifest(centre_config["backups_folder"])
+        sftp_manifest.clear()
+
+        print(f"Cleared the SFTP manifest of {centre_config['name']} in {sftp_manifest.database_path}")
+
+    print(f"Time taken: {round(time.time() - start, 2)}s")
+    print(f"Time finished: {datetime.now()}")
+    print("=" * 80)
@@ -22,7 +22,7 @@ from crawler.constants import (
     MONGO_DATETIME_FORMAT,
 )
 from crawler.db.mongo import create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection, run_mysql_executemany_query
+from crawler.db.mysql import get_mysql_connection, run_mysql_executemany_query
 from crawler.helpers.general_helpers import map_mongo_sample_to_mysql
 from crawler.sql_queries import SQL_MLWH_MULTIPLE_INSERT
 from crawler.types import Config, SampleDoc, SourcePlateDoc
@@ -134,7 +134,7 @@ def migrate_all_dbs(config: Config, s_start_datetime: str = "", s_end_datetime:
         if (num_sql_docs := len(mongo_docs_for_sql)) > 0:
             logger.info(f"Updating MLWH database for {num_sql_docs} sample documents")
             # create connection to the MLWH database
-            with create_mysql_connection(config, False) as mlwh_conn:
+            with get_mysql_connection(config, False) as mlwh_conn:
                 # 5. update the MLWH (should be an idempotent operation)
                 run_mysql_executemany_query(mlwh_conn, SQL_MLWH_MULTIPLE_INSERT, mongo_docs_for_sql)
 
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from crawler.constants import COLLECTION_SAMPLES, FIELD_CREATED_AT, MONGO_DATETIME_FORMAT
 from crawler.db.mongo import create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection, run_mysql_executemany_query
+from crawler.db.mysql import get_mysql_connection, run_mysql_executemany_query
 from crawler.helpers.general_helpers import map_mongo_sample_to_mysql
 from crawler.sql_queries import SQL_MLWH_MULTIPLE_INSERT
 from crawler.types import Config
@@ -54,7 +54,7 @@ def update_mlwh_with_legacy_samples(config: Config, s_start_datetime: str = "",
         if number_docs_found > 0:
             print(f"Updating MLWH database for {len(mongo_docs_for_sql)} sample documents")
             # create connection to the MLWH database
-            with create_mysql_connection(config, False) as mlwh_conn:
+            with get_mysql_connection(config, False) as mlwh_conn:
 
                 # execute sql query to insert/update timestamps into MLWH
                 run_mysql_executemany_query(mlwh_conn, SQL_MLWH_MULTIPLE_INSERT, mongo_docs_for_sql)
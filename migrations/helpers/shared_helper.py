@@ -5,7 +5,6 @@ from datetime import datetime
 from typing import List, Optional, Set, Tuple
 
 import pandas as pd
-import sqlalchemy
 from pandas import DataFrame
 
 from crawler.constants import (
@@ -16,6 +15,7 @@ from crawler.constants import (
     MONGO_DATETIME_FORMAT,
     PLATE_EVENT_DESTINATION_CREATED,
 )
+from crawler.db.mysql import get_mysql_connection_provider
 from crawler.types import Config, SampleDoc
 
 logger = logging.getLogger(__name__)
@@ -92,13 +92,8 @@ def get_cherrypicked_samples(
             root_sample_ids[x : (x + chunk_size)] for x in range(0, len(root_sample_ids), chunk_size)  # noqa:E203
         ]
 
-        sql_engine = sqlalchemy.create_engine(
-            (
-                f"mysql+pymysql://{config.MLWH_DB_RO_USER}:{config.MLWH_DB_RO_PASSWORD}"
-                f"@{config.MLWH_DB_HOST}:{config.MLWH_DB_PORT}"
-            ),
-            pool_recycle=3600,
-        )
+        # the engine, and its pool of connections, is shared by the queries of the process
+        sql_engine = get_mysql_connection_provider(config).engine()
         db_connection = sql_engine.connect()
 
         ml_wh_db = config.MLWH_DB_DBNAME
@@ -7,7 +7,6 @@ from more_itertools import groupby_transform
 from crawler.constants import (
     COLLECTION_SAMPLES,
     DART_STATE_PENDING,
-    FIELD_COORDINATE,
     FIELD_FILTERED_POSITIVE,
     FIELD_FILTERED_POSITIVE_TIMESTAMP,
     FIELD_FILTERED_POSITIVE_VERSION,
@@ -18,15 +17,16 @@ from crawler.constants import (
     FIELD_SOURCE,
     POSITIVE_RESULT_VALUE,
 )
-from crawler.db.dart import add_dart_plate_if_doesnt_exist, create_dart_sql_server_conn, set_dart_well_properties
+from crawler.db.dart import (
+    add_dart_plate_if_doesnt_exist,
+    add_dart_plate_well_properties_if_positive,
+    create_dart_sql_server_conn,
+    get_dart_plate_states,
+)
 from crawler.db.mongo import create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection, run_mysql_executemany_query
+from crawler.db.mysql import get_mysql_connection, run_mysql_executemany_query
 from crawler.filtered_positive_identifier import FilteredPositiveIdentifier
-from crawler.helpers.general_helpers import (
-    get_dart_well_index,
-    map_mongo_doc_to_dart_well_props,
-    map_mongo_to_sql_common,
-)
+from crawler.helpers.general_helpers import map_mongo_to_sql_common
 from crawler.sql_queries import SQL_DART_GET_PLATE_BARCODES, SQL_MLWH_MULTIPLE_FILTERED_POSITIVE_UPDATE
 from crawler.types import Config, SampleDoc
 from migrations.helpers.shared_helper import extract_required_cp_info, get_cherrypicked_samples
@@ -131,8 +131,8 @@ def update_filtered_positive_fields(
 
     version = filtered_positive_identifier.version
 
-    for sample in samples:
-        sample[FIELD_FILTERED_POSITIVE] = filtered_positive_identifier.is_positive(sample)
+    for sample, filtered_positive in zip(samples, filtered_positive_identifier.is_positive_batch(samples)):
+        sample[FIELD_FILTERED_POSITIVE] = filtered_positive
         sample[FIELD_FILTERED_POSITIVE_VERSION] = version
         sample[FIELD_FILTERED_POSITIVE_TIMESTAMP] = update_timestamp
 
@@ -209,7 +209,7 @@ def update_mlwh_filtered_positive_fields(config: Config, samples: List[SampleDoc
     Returns:
         bool -- whether the updates completed successfully
     """
-    mysql_conn = create_mysql_connection(config, False)
+    mysql_conn = get_mysql_connection(config, False)
 
     if mysql_conn is not None and mysql_conn.is_connected():
         mlwh_samples = [map_mongo_to_sql_common(sample) for sample in samples]
@@ -240,28 +240,20 @@ def update_dart_fields(config: Config, samples: List[SampleDoc]) -> bool:
 
         cursor = sql_server_connection.cursor()
 
+        # fetch the states of all the plates up front so only the missing plates cost a round trip each
+        plate_states = get_dart_plate_states(cursor, (str(sample[FIELD_PLATE_BARCODE]) for sample in samples))
+
         for plate_barcode, samples_in_plate in groupby_transform(
-            samples, lambda x: x[FIELD_PLATE_BARCODE], reducefunc=lambda x: list(x)
+            samples, lambda x: str(x[FIELD_PLATE_BARCODE]), None, lambda x: list(x)
         ):
             try:
-                labware_class = labclass_by_centre_name[samples_in_plate[0][FIELD_SOURCE]]
+                labware_class = labclass_by_centre_name[str(samples_in_plate[0][FIELD_SOURCE])]
                 plate_state = add_dart_plate_if_doesnt_exist(
-                    cursor, plate_barcode, labware_class  # type:ignore
+                    cursor, plate_barcode, labware_class, plate_states.get(plate_barcode)
                 )
+                plate_states[plate_barcode] = plate_state
                 if plate_state == DART_STATE_PENDING:
-                    for sample in samples_in_plate:
-                        if sample[FIELD_RESULT] == POSITIVE_RESULT_VALUE:
-                            well_index = get_dart_well_index(sample.get(FIELD_COORDINATE, None))
-                            if well_index is not None:
-                                well_props = map_mongo_doc_to_dart_well_props(sample)
-                                set_dart_well_properties(
-                                    cursor, plate_barcode, well_props, well_index  # type:ignore
-                                )
-                            else:
-                                raise ValueError(
-                                    "Unable to determine DART well index for sample "
-                                    f"{sample[FIELD_ROOT_SAMPLE_ID]} in plate {plate_barcode}"
-                                )
+                    add_dart_plate_well_properties_if_positive(cursor, samples_in_plate, plate_barcode)
                 cursor.commit()
                 dart_updated_successfully &= True
             except Exception as e:
@@ -3,7 +3,6 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, cast
 
 import pandas as pd
-import sqlalchemy
 from pandas import DataFrame
 
 from crawler.constants import (
@@ -17,7 +16,11 @@ from crawler.constants import (
     MLWH_MONGODB_ID,
 )
 from crawler.db.mongo import create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection, run_mysql_execute_formatted_query
+from crawler.db.mysql import (
+    get_mysql_connection,
+    get_mysql_connection_provider,
+    run_mysql_execute_formatted_query,
+)
 from crawler.filtered_positive_identifier import (
     FILTERED_POSITIVE_VERSION_0,
     FILTERED_POSITIVE_VERSION_1,
@@ -88,13 +91,8 @@ def get_cherrypicked_samples_by_date(
             root_sample_ids[x : (x + chunk_size)] for x in range(0, len(root_sample_ids), chunk_size)  # noqa: E203
         ]
 
-        sql_engine = sqlalchemy.create_engine(
-            (
-                f"mysql+pymysql://{config.MLWH_DB_RO_USER}:{config.MLWH_DB_RO_PASSWORD}"
-                f"@{config.MLWH_DB_HOST}:{config.MLWH_DB_PORT}"
-            ),
-            pool_recycle=3600,
-        )
+        # the engine, and its pool of connections, is shared by the queries of the process
+        sql_engine = get_mysql_connection_provider(config).engine()
         db_connection = sql_engine.connect()
 
         ml_wh_db = config.MLWH_DB_DBNAME
@@ -239,7 +237,7 @@ def update_mlwh_filtered_positive_fields_batched(
     Returns:
         bool -- whether the updates completed successfully
     """
-    mysql_conn = create_mysql_connection(config, False)
+    mysql_conn = get_mysql_connection(config, False)
     completed_successfully = False
     try:
         if mysql_conn is not None and mysql_conn.is_connected():
@@ -3,13 +3,6 @@ import logging.config
 import sys
 
 from crawler.helpers.general_helpers import get_config
-from migrations import (
-    sample_timestamps,
-    update_dart,
-    update_filtered_positives,
-    update_legacy_filtered_positives,
-    update_mlwh_with_legacy_samples,
-)
 
 config, settings_module = get_config("")
 
@@ -28,6 +21,8 @@ logging.config.dictConfig(config.LOGGING)
 # python run_migration.py update_mlwh_with_legacy_samples 200115_1200 200216_0900
 # python run_migration.py update_mlwh_and_dart_with_legacy_samples 200115_1200 200216_0900
 # python run_migration.py update_filtered_positives
+# python run_migration.py build_checksum_index
+# python run_migration.py clear_sftp_manifests
 ##
 
 print("Migration names:")
@@ -36,9 +31,14 @@ print("* update_mlwh_with_legacy_samples")
 print("* update_mlwh_and_dart_with_legacy_samples")
 print("* update_filtered_positives")
 print("* update_legacy_filtered_positives")
+print("* build_checksum_index")
+print("* clear_sftp_manifests")
 
 
+# each migration imports its module when it runs, so that only the dependencies of the migration selected are loaded
 def migration_sample_timestamps():
+    from migrations import sample_timestamps
+
     print("Running sample_timestamps migration")
     sample_timestamps.run()
 
@@ -53,6 +53,8 @@ def migration_update_mlwh_with_legacy_samples():
 
     s_start_datetime = sys.argv[2]
     s_end_datetime = sys.argv[3]
+    from migrations import update_mlwh_with_legacy_samples
+
     print("Running update_mlwh_with_legacy_samples migration")
     update_mlwh_with_legacy_samples.run(config, s_start_datetime=s_start_datetime, s_end_datetime=s_end_datetime)
 
@@ -67,11 +69,15 @@ def migration_update_mlwh_and_dart_with_legacy_samples():
 
     s_start_datetime = sys.argv[2]
     s_end_datetime = sys.argv[3]
+    from migrations import update_dart
+
     print("Running update_dart migration")
     update_dart.run(config, s_start_datetime=s_start_datetime, s_end_datetime=s_end_datetime)
 
 
 def migration_update_filtered_positives():
+    from migrations import update_filtered_positives
+
     print("Running update_filtered_positives migration")
     omit_dart = sys.argv[2] == "omit_dart" if 2 < len(sys.argv) else False
     update_filtered_positives.run(omit_dart=omit_dart)
@@ -87,10 +93,26 @@ def migration_update_legacy_filtered_positives():
 
     s_start_datetime = sys.argv[2]
     s_end_datetime = sys.argv[3]
+    from migrations import update_legacy_filtered_positives
+
     print("Running update_legacy_filtered_positives migration")
     update_legacy_filtered_positives.run(s_start_datetime=s_start_datetime, s_end_datetime=s_end_datetime)
 
 
+def migration_build_checksum_index():
+    from migrations import build_checksum_index
+
+    print("Running build_checksum_index migration")
+    build_checksum_index.run()
+
+
+def migration_clear_sftp_manifests():
+    from migrations import clear_sftp_manifests
+
+    print("Running clear_sftp_manifests migration")
+    clear_sftp_manifests.run()
+
+
 def migration_by_name(migration_name):
     switcher = {
         "sample_timestamps": migration_sample_timestamps,
@@ -98,6 +120,8 @@ def migration_by_name(migration_name):
         "update_mlwh_and_dart_with_legacy_samples": migration_update_mlwh_and_dart_with_legacy_samples,
         "update_filtered_positives": migration_update_filtered_positives,
         "update_legacy_filtered_positives": migration_update_legacy_filtered_positives,
+        "build_checksum_index": migration_build_checksum_index,
+        "clear_sftp_manifests": migration_clear_sftp_manifests,
     }
     # Get the function from switcher dictionary
     func = switcher.get(migration_name, lambda: print("Invalid migration name, aborting"))
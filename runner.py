@@ -6,6 +6,7 @@ import logging.config
 import schedule  # type: ignore
 
 from crawler import main
+from crawler.helpers.general_helpers import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,18 @@ if __name__ == "__main__":
         action="store_false",
         help="start scheduled execution, defaults to running once",
     )
+    parser.add_argument(
+        "--daemon",
+        dest="daemon",
+        action="store_true",
+        help="run every DAEMON_CYCLE_MINUTES in one long-lived process which sets up its connections and indexes once",
+    )
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="process each centre as soon as new files arrive, with a full run every FILE_WATCH_FULL_SWEEP_MINUTES",
+    )
     parser.add_argument(
         "--sftp",
         dest="sftp",
@@ -38,13 +51,29 @@ if __name__ == "__main__":
     )
 
     parser.set_defaults(once=True)
+    parser.set_defaults(daemon=False)
+    parser.set_defaults(watch=False)
     parser.set_defaults(sftp=False)
     parser.set_defaults(keep_files=False)
     parser.set_defaults(add_to_dart=False)
 
     args = parser.parse_args()
 
-    if args.once:
+    if args.watch:
+        config, _ = get_config()
+        print(
+            f"Watching for new files every {config.FILE_WATCH_POLL_SECONDS} seconds, processing them once unchanged "
+            f"for {config.FILE_WATCH_DEBOUNCE_SECONDS} seconds, with a full run every "
+            f"{config.FILE_WATCH_FULL_SWEEP_MINUTES} minutes"
+        )
+
+        main.watch(args.sftp, args.keep_files, args.add_to_dart)
+    elif args.daemon:
+        config, _ = get_config()
+        print(f"Running as a daemon every {config.DAEMON_CYCLE_MINUTES} minutes")
+
+        main.run_daemon(args.sftp, args.keep_files, args.add_to_dart)
+    elif args.once:
         main.run(args.sftp, args.keep_files, args.add_to_dart)
     else:
         print("Scheduled to run every 15 minutes")
@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.import_time import ImportTiming, compare, import_times, parse_import_times, run, summarise_import_times
+
+IMPORTTIME_STDERR = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 | _io
+import time:        80 |         80 |     numpy._core
+import time:       300 |        380 |   numpy
+import time:        50 |        430 | crawler.stage_timer
+"""
+
+
+def test_parse_import_times():
+    assert parse_import_times(IMPORTTIME_STDERR) == [
+        ImportTiming("_io", 120, 120, 0),
+        ImportTiming("numpy._core", 80, 80, 2),
+        ImportTiming("numpy", 300, 380, 1),
+        ImportTiming("crawler.stage_timer", 50, 430, 0),
+    ]
+
+
+def test_summarise_import_times():
+    summary = summarise_import_times(parse_import_times(IMPORTTIME_STDERR), {"_io"}, 1)
+
+    assert summary == {"milliseconds": 0.4, "modules": 3, "packages": {"numpy": 0.4}}
+
+
+def test_import_times_raises_when_the_import_fails():
+    with pytest.raises(RuntimeError):
+        import_times("import a_module_which_does_not_exist")
+
+
+def test_run():
+    benchmark_run = run(["crawler.stage_timer"], 2)
+
+    assert [result["module"] for result in benchmark_run["results"]] == ["crawler.stage_timer"]
+    assert benchmark_run["results"][0]["milliseconds"] > 0
+    assert "crawler" in benchmark_run["results"][0]["packages"]
+
+
+def test_compare():
+    baseline = {"commit": "abc123", "results": [{"module": "crawler.main", "milliseconds": 800.0}]}
+    current = {
+        "commit": "def456",
+        "results": [
+            {"module": "crawler.main", "milliseconds": 400.0},
+            {"module": "run_migration", "milliseconds": 90.0},
+        ],
+    }
+
+    assert compare(baseline, current) == ["crawler.main: 800.0 -> 400.0 ms (-50.0%) against abc123"]
+
+
+@pytest.mark.parametrize("module", ["crawler.main", "crawler.file_processing"])
+def test_importing_the_crawler_does_not_load_the_drivers(module):
+    imported = {import_timing.module for import_timing in import_times(f"import {module}")}
+
+    assert not imported & {"numpy", "pandas", "sqlalchemy", "mysql.connector", "pyodbc", "pysftp", "slack"}
@@ -0,0 +1,58 @@
+import csv
+
+from benchmarks.csv_generator import INVALID_DATE_TESTED, centre_csv_headers, generate_centre_csv
+from benchmarks.ingestion import compare, run
+from crawler.constants import FIELD_CH1_CQ, FIELD_CH4_TARGET, FIELD_DATE_TESTED, FIELD_ROOT_SAMPLE_ID
+
+
+def test_centre_csv_headers():
+    assert FIELD_CH1_CQ not in centre_csv_headers(0)
+    assert FIELD_CH4_TARGET not in centre_csv_headers(3)
+    assert FIELD_CH4_TARGET in centre_csv_headers(4)
+
+
+def test_generate_centre_csv(tmp_path):
+    file_path = tmp_path.joinpath("generated.csv")
+    generate_centre_csv(file_path, 1000, duplicate_rate=0.1, bad_date_rate=0.1, blank_row_rate=0.1, with_bom=True)
+
+    assert file_path.read_bytes()[:3] == b"\xef\xbb\xbf"
+
+    with open(file_path, newline="", encoding="utf-8-sig") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    assert len(rows) == 1000
+    root_sample_ids = [row[FIELD_ROOT_SAMPLE_ID] for row in rows if row[FIELD_ROOT_SAMPLE_ID]]
+    assert len(root_sample_ids) < len(rows)
+    assert len(set(root_sample_ids)) < len(root_sample_ids)
+    assert any(row[FIELD_DATE_TESTED] == INVALID_DATE_TESTED for row in rows)
+
+
+def test_generate_centre_csv_is_repeatable(tmp_path):
+    generate_centre_csv(tmp_path.joinpath("first.csv"), 100, seed=1)
+    generate_centre_csv(tmp_path.joinpath("second.csv"), 100, seed=1)
+
+    assert tmp_path.joinpath("first.csv").read_text() == tmp_path.joinpath("second.csv").read_text()
+
+
+def test_run(config):
+    download_dir = config.DIR_DOWNLOADED_DATA
+
+    benchmark_run = run(config, [100, 200], 50)
+
+    assert config.DIR_DOWNLOADED_DATA == download_dir
+    assert [result["num_rows"] for result in benchmark_run["results"]] == [100, 200]
+    for result in benchmark_run["results"]:
+        # only the injected duplicates, bad dates and blank rows fail validation
+        assert 0 < result["valid_rows"] <= result["num_rows"]
+        assert result["rows_per_second"] > 0
+        assert result["peak_memory_mb"] > 0
+
+
+def test_compare():
+    baseline = {"commit": "abc123", "results": [{"num_rows": 10, "rows_per_second": 100}]}
+    current = {
+        "commit": "def456",
+        "results": [{"num_rows": 10, "rows_per_second": 150}, {"num_rows": 20, "rows_per_second": 150}],
+    }
+
+    assert compare(baseline, current) == ["10 rows: 100 -> 150 rows/sec (+50.0%) against abc123"]
@@ -16,9 +16,10 @@ from crawler.constants import (
     MLWH_TABLE_NAME,
 )
 from crawler.db.mongo import create_mongo_client, get_mongo_collection, get_mongo_db
-from crawler.db.mysql import create_mysql_connection
+from crawler.db.mysql import close_mysql_connection_provider, create_mysql_connection
 from crawler.file_processing import Centre, CentreFile
 from crawler.helpers.general_helpers import get_config
+from crawler.sample_filter import close_sample_filter
 from tests.data.testing_objects import (
     EVENT_WH_DATA,
     FILTERED_POSITIVE_TESTING_SAMPLES,
@@ -40,6 +41,20 @@ def config():
     return CONFIG
 
 
+@pytest.fixture(autouse=True)
+def mysql_connection_provider():
+    # the MySQL connection pools are shared by the process, so they are closed after each test to keep them independent
+    yield
+    close_mysql_connection_provider()
+
+
+@pytest.fixture(autouse=True)
+def sample_filter():
+    # the samples filter is kept by the process, so it is forgotten after each test to keep them independent
+    yield
+    close_sample_filter()
+
+
 @pytest.fixture
 def centre(config):
     yield Centre(config, config.CENTRES[0])
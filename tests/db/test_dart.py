@@ -8,13 +8,16 @@ from crawler.db.dart import (
     add_dart_plate_if_doesnt_exist,
     create_dart_sql_server_conn,
     get_dart_plate_state,
+    get_dart_plate_states,
     set_dart_plate_state_pending,
+    set_dart_plate_well_properties,
     set_dart_well_properties,
 )
 from crawler.exceptions import DartStateError
 from crawler.sql_queries import (
     SQL_DART_ADD_PLATE,
     SQL_DART_GET_PLATE_PROPERTY,
+    SQL_DART_GET_PLATE_STATES,
     SQL_DART_SET_PLATE_PROPERTY,
     SQL_DART_SET_WELL_PROPERTY,
 )
@@ -64,11 +67,58 @@ def test_set_dart_well_properties(config):
         test_well_props = {"prop1": "value1", "test prop": "test value"}
         test_well_index = 12
         set_dart_well_properties(mock_conn.cursor(), test_plate_barcode, test_well_props, test_well_index)
-        for prop_name, prop_value in test_well_props.items():
-            mock_conn.cursor().execute.assert_any_call(
-                SQL_DART_SET_WELL_PROPERTY,
-                (test_plate_barcode, prop_name, prop_value, test_well_index),
-            )
+        mock_conn.cursor().executemany.assert_called_once_with(
+            SQL_DART_SET_WELL_PROPERTY,
+            [
+                (test_plate_barcode, prop_name, prop_value, test_well_index)
+                for prop_name, prop_value in test_well_props.items()
+            ],
+        )
+
+
+def test_set_dart_plate_well_properties(config):
+    with patch("pyodbc.connect") as mock_conn:
+        test_plate_barcode = "AB123"
+        test_wells_props = [({"prop1": "value1"}, 1), ({"prop1": "value2", "test prop": "test value"}, 12)]
+        mock_conn.cursor().fast_executemany = False
+        fast_executemany_calls = []
+        mock_conn.cursor().executemany.side_effect = lambda *args: fast_executemany_calls.append(
+            mock_conn.cursor().fast_executemany
+        )
+
+        set_dart_plate_well_properties(mock_conn.cursor(), test_plate_barcode, test_wells_props)
+
+        # all the properties of all the wells are set in a single round trip
+        mock_conn.cursor().execute.assert_not_called()
+        mock_conn.cursor().executemany.assert_called_once_with(
+            SQL_DART_SET_WELL_PROPERTY,
+            [
+                (test_plate_barcode, "prop1", "value1", 1),
+                (test_plate_barcode, "prop1", "value2", 12),
+                (test_plate_barcode, "test prop", "test value", 12),
+            ],
+        )
+        # fast_executemany is only used for these properties, and restored for the caller's later queries
+        assert fast_executemany_calls == [True]
+        assert mock_conn.cursor().fast_executemany is False
+
+
+def test_set_dart_plate_well_properties_restores_fast_executemany_on_error(config):
+    with patch("pyodbc.connect") as mock_conn:
+        mock_conn.cursor().fast_executemany = False
+        mock_conn.cursor().executemany.side_effect = Exception("Boom!")
+
+        with pytest.raises(Exception):
+            set_dart_plate_well_properties(mock_conn.cursor(), "AB123", [({"prop1": "value1"}, 1)])
+
+        assert mock_conn.cursor().fast_executemany is False
+
+
+def test_set_dart_plate_well_properties_no_wells(config):
+    with patch("pyodbc.connect") as mock_conn:
+        set_dart_plate_well_properties(mock_conn.cursor(), "AB123", [])
+
+        mock_conn.cursor().executemany.assert_not_called()
 
 
 def test_add_dart_plate_if_doesnt_exist_throws_without_state_property(config):
@@ -101,3 +151,58 @@ def test_add_dart_plate_if_doesnt_exist_throws_without_state_property(config):
         with patch("crawler.db.dart.get_dart_plate_state", return_value=DART_STATE_NO_PROP):
             with pytest.raises(DartStateError):
                 add_dart_plate_if_doesnt_exist(mock_conn.cursor(), test_plate_barcode, test_labclass)
+
+
+def test_add_dart_plate_if_doesnt_exist_uses_fetched_state(config):
+    with patch("pyodbc.connect") as mock_conn:
+        test_plate_barcode = "AB123"
+        test_labclass = "test class"
+
+        # does not look up the state of a plate when it is already known
+        with patch("crawler.db.dart.get_dart_plate_state") as mock_get_state:
+            result = add_dart_plate_if_doesnt_exist(
+                mock_conn.cursor(), test_plate_barcode, test_labclass, DART_STATE_PENDING
+            )
+            mock_get_state.assert_not_called()
+            assert result == DART_STATE_PENDING
+
+            with patch("crawler.db.dart.set_dart_plate_state_pending", return_value=True):
+                result = add_dart_plate_if_doesnt_exist(
+                    mock_conn.cursor(), test_plate_barcode, test_labclass, DART_STATE_NO_PLATE
+                )
+                mock_get_state.assert_not_called()
+                mock_conn.cursor().execute.assert_called_with(
+                    SQL_DART_ADD_PLATE, (test_plate_barcode, test_labclass, 96)
+                )
+                assert result == DART_STATE_PENDING
+
+
+def test_get_dart_plate_states(config):
+    with patch("pyodbc.connect") as mock_conn:
+        mock_conn.cursor().execute().fetchall.return_value = [("AB123", DART_STATE_PENDING), ("AB456", None)]
+        mock_conn.cursor().execute.reset_mock()
+
+        result = get_dart_plate_states(mock_conn.cursor(), ["AB123", "AB456", "AB789", "AB123"])
+
+        assert result == {
+            "AB123": DART_STATE_PENDING,
+            "AB456": DART_STATE_NO_PROP,
+            "AB789": DART_STATE_NO_PLATE,
+        }
+        # fetches the states of all the plates in one query
+        mock_conn.cursor().execute.assert_called_once()
+        sql_query, *params = mock_conn.cursor().execute.call_args[0]
+        assert sql_query == SQL_DART_GET_PLATE_STATES % "?, ?, ?"
+        assert sorted(params) == ["AB123", "AB456", "AB789"]
+
+
+def test_get_dart_plate_states_in_batches(config):
+    with patch("pyodbc.connect") as mock_conn:
+        mock_conn.cursor().execute().fetchall.return_value = []
+        mock_conn.cursor().execute.reset_mock()
+
+        with patch("crawler.db.dart.DART_PLATE_STATES_BATCH_SIZE", 2):
+            result = get_dart_plate_states(mock_conn.cursor(), ["AB1", "AB2", "AB3"])
+
+        assert result == {"AB1": DART_STATE_NO_PLATE, "AB2": DART_STATE_NO_PLATE, "AB3": DART_STATE_NO_PLATE}
+        assert mock_conn.cursor().execute.call_count == 2
@@ -4,7 +4,13 @@ from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
 
-from crawler.db.mongo import create_import_record, create_mongo_client, get_mongo_collection, get_mongo_db
+from crawler.db.mongo import (
+    MongoConnectionCounter,
+    create_import_record,
+    create_mongo_client,
+    get_mongo_collection,
+    get_mongo_db,
+)
 from crawler.helpers.logging_helpers import LoggingCollection
 
 
@@ -12,6 +18,24 @@ def test_create_mongo_client(config):
     assert type(create_mongo_client(config)) == MongoClient
 
 
+def test_create_mongo_client_sets_pool_size(config):
+    client = create_mongo_client(config)
+
+    assert client.options.pool_options.max_pool_size == config.MONGO_MAX_POOL_SIZE
+
+
+def test_mongo_connection_counter():
+    connection_counter = MongoConnectionCounter()
+
+    connection_counter.pool_created(None)
+    connection_counter.connection_created(None)
+    connection_counter.connection_created(None)
+    connection_counter.connection_closed(None)
+
+    assert connection_counter.pools_created == 1
+    assert connection_counter.connections_created == 2
+
+
 def test_get_mongo_db(mongo_client):
     config, mongo_client = mongo_client
 
@@ -39,7 +63,12 @@ def test_create_import_record(freezer, mongo_database):
     for centre in config.CENTRES:
         now = datetime.utcnow()
         result = create_import_record(
-            import_collection, centre, len(docs), "test", error_collection.get_messages_for_import()
+            import_collection,
+            centre,
+            len(docs),
+            "test",
+            error_collection.get_messages_for_import(),
+            {"mongo_insert": {"seconds": 0.5, "rows": 3}},
         )
         import_doc = import_collection.find_one({"_id": result.inserted_id})
 
@@ -48,3 +77,4 @@ def test_create_import_record(freezer, mongo_database):
         assert import_doc["csv_file_used"] == "test"
         assert import_doc["number_of_records"] == len(docs)
         assert import_doc["errors"] == error_collection.get_messages_for_import()
+        assert import_doc["stage_timings"] == {"mongo_insert": {"seconds": 0.5, "rows": 3}}
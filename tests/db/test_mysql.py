@@ -1,3 +1,7 @@
+import threading
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List
 from unittest.mock import MagicMock, patch
 
 import mysql.connector as mysql
@@ -6,12 +10,37 @@ from mysql.connector.connection_cext import CMySQLConnection
 from sqlalchemy.engine.base import Engine
 
 from crawler.db.mysql import (
+    DEFAULT_MAX_ALLOWED_PACKET,
+    MySQLConnectionPool,
     create_mysql_connection,
     create_mysql_connection_engine,
+    get_max_allowed_packet,
+    get_mysql_connection,
+    get_mysql_connection_provider,
+    mysql_load_data_value,
+    rows_per_query,
     run_mysql_execute_formatted_query,
     run_mysql_executemany_query,
+    run_mysql_load_data_upsert,
 )
-from crawler.sql_queries import SQL_MLWH_MULTIPLE_FILTERED_POSITIVE_UPDATE_BATCH, SQL_MLWH_MULTIPLE_INSERT
+from crawler.sql_queries import (
+    MLWH_SAMPLE_COLUMNS,
+    SQL_MLWH_CREATE_SAMPLES_STAGING_TABLE,
+    SQL_MLWH_DROP_SAMPLES_STAGING_TABLE,
+    SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE,
+    SQL_MLWH_MULTIPLE_FILTERED_POSITIVE_UPDATE_BATCH,
+    SQL_MLWH_MULTIPLE_INSERT,
+    SQL_MLWH_UPSERT_SAMPLES_FROM_STAGING_TABLE,
+)
+
+
+@pytest.fixture
+def conn():
+    # a connection which is never opened, with the methods the queries call mocked
+    conn = CMySQLConnection()
+    with patch.object(conn, "cursor"), patch.object(conn, "commit"), patch.object(conn, "rollback"):
+        with patch.object(conn, "close"):
+            yield conn
 
 
 def test_create_mysql_connection_none(config):
@@ -25,14 +54,7 @@ def test_create_mysql_connection_exception(config):
         assert create_mysql_connection(config) is None
 
 
-def test_run_mysql_executemany_query_success(config):
-    conn = CMySQLConnection()
-
-    conn.cursor = MagicMock()
-    conn.commit = MagicMock()
-    conn.rollback = MagicMock()
-    conn.close = MagicMock()
-
+def test_run_mysql_executemany_query_success(config, conn):
     cursor = conn.cursor.return_value
     cursor.executemany = MagicMock()
     cursor.close = MagicMock()
@@ -47,14 +69,7 @@ def test_run_mysql_executemany_query_success(config):
     assert conn.close.called is True
 
 
-def test_run_mysql_executemany_query_execute_error(config):
-    conn = CMySQLConnection()
-
-    conn.cursor = MagicMock()
-    conn.commit = MagicMock()
-    conn.rollback = MagicMock()
-    conn.close = MagicMock()
-
+def test_run_mysql_executemany_query_execute_error(config, conn):
     cursor = conn.cursor.return_value
     cursor.executemany = MagicMock(side_effect=Exception("Boom!"))
     cursor.close = MagicMock()
@@ -72,14 +87,112 @@ def test_run_mysql_executemany_query_execute_error(config):
         assert conn.close.called is True
 
 
-def test_run_mysql_execute_formatted_query_success(config):
-    conn = CMySQLConnection()
+def test_run_mysql_executemany_query_batches_fit_max_allowed_packet(config, conn):
+    cursor = conn.cursor.return_value
+    cursor.fetchone.return_value = (len(SQL_MLWH_MULTIPLE_INSERT) + 2000,)
+    cursor.rowcount = 1
+
+    values = [{"root_sample_id": f"sample_{index:04}", "result": "Positive"} for index in range(100)]
+    run_mysql_executemany_query(mysql_conn=conn, sql_query=SQL_MLWH_MULTIPLE_INSERT, values=values)
+
+    batches = [call.args[1] for call in cursor.executemany.call_args_list]
+    assert len(batches) > 1
+    assert [row for batch in batches for row in batch] == values
+    assert conn.commit.call_count == len(batches)
+    assert conn.close.called is True
+
+
+def test_get_max_allowed_packet():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (67108864,)
+
+    assert get_max_allowed_packet(cursor) == 67108864
+    cursor.execute.assert_called_once_with("SELECT @@max_allowed_packet")
+
+
+@pytest.mark.parametrize("fetchone", [{"return_value": None}, {"side_effect": mysql.Error()}])
+def test_get_max_allowed_packet_falls_back_to_default(fetchone):
+    cursor = MagicMock()
+    cursor.fetchone = MagicMock(**fetchone)
+
+    assert get_max_allowed_packet(cursor) == DEFAULT_MAX_ALLOWED_PACKET
+
+
+def test_rows_per_query():
+    values = [{"root_sample_id": "a" * 98}] * 10
+
+    # each row is 102 bytes in the query, and 75% of the packet is filled
+    assert rows_per_query(1000 + len("INSERT"), "INSERT", values) == 7
+    assert rows_per_query(4 * 1024 * 1024, "INSERT", values) > 10000
+
+    # at least one row is written with each query
+    assert rows_per_query(10, "INSERT", values) == 1
+    assert rows_per_query(1000, "INSERT", []) == 1
+
+
+def test_mysql_load_data_value():
+    assert mysql_load_data_value(None) == "\\N"
+    assert mysql_load_data_value(True) == "1"
+    assert mysql_load_data_value(False) == "0"
+    assert mysql_load_data_value(5) == "5"
+    assert mysql_load_data_value(Decimal("21.28726211")) == "21.28726211"
+    assert mysql_load_data_value(datetime(2020, 5, 3, 23, 38, 1)) == "2020-05-03 23:38:01.000000"
+    assert mysql_load_data_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+
+def test_run_mysql_load_data_upsert(config, conn):
+    cursor = conn.cursor.return_value
+    loaded_files = []
+
+    def execute(sql_query, params=None):
+        if sql_query == SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE:
+            with open(params[0], encoding="utf-8") as load_file:
+                loaded_files.append(load_file.read())
+
+    cursor.execute = MagicMock(side_effect=execute)
+
+    values: List[Dict[str, Any]] = [{column: None for column in MLWH_SAMPLE_COLUMNS} for _ in range(2)]
+    values[0]["root_sample_id"] = "sample\t1"
+    values[1]["root_sample_id"] = "sample_2"
+
+    run_mysql_load_data_upsert(conn, values)
+
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        SQL_MLWH_CREATE_SAMPLES_STAGING_TABLE,
+        SQL_MLWH_LOAD_SAMPLES_INTO_STAGING_TABLE,
+        SQL_MLWH_UPSERT_SAMPLES_FROM_STAGING_TABLE,
+        SQL_MLWH_DROP_SAMPLES_STAGING_TABLE,
+    ]
+    root_sample_id_index = MLWH_SAMPLE_COLUMNS.index("root_sample_id")
+    rows = [line.split("\t") for line in loaded_files[0].splitlines()]
+    assert [row[root_sample_id_index] for row in rows] == ["sample\\t1", "sample_2"]
+    assert all(len(row) == len(MLWH_SAMPLE_COLUMNS) for row in rows)
+
+    # the file is removed once loaded
+    load_file_path = cursor.execute.call_args_list[1].args[1][0]
+    with pytest.raises(FileNotFoundError):
+        open(load_file_path)
+
+    assert conn.commit.called is True
+    assert cursor.close.called is True
+    assert conn.close.called is True
 
-    conn.cursor = MagicMock()
-    conn.commit = MagicMock()
-    conn.rollback = MagicMock()
-    conn.close = MagicMock()
 
+def test_run_mysql_load_data_upsert_execute_error(config, conn):
+    cursor = conn.cursor.return_value
+    cursor.execute = MagicMock(side_effect=Exception("Boom!"))
+
+    with pytest.raises(Exception):
+        run_mysql_load_data_upsert(conn, [{column: None for column in MLWH_SAMPLE_COLUMNS}])
+
+    assert conn.commit.called is False
+    # the staging table is still dropped, whether or not it was created
+    cursor.execute.assert_called_with(SQL_MLWH_DROP_SAMPLES_STAGING_TABLE)
+    assert cursor.close.called is True
+    assert conn.close.called is True
+
+
+def test_run_mysql_execute_formatted_query_success(config, conn):
     cursor = conn.cursor.return_value
     cursor.execute = MagicMock()
     cursor.close = MagicMock()
@@ -98,14 +211,7 @@ def test_run_mysql_execute_formatted_query_success(config):
     assert cursor.close.called is True
 
 
-def test_run_mysql_execute_formatted_query_execute_error(config):
-    conn = CMySQLConnection()
-
-    conn.cursor = MagicMock()
-    conn.commit = MagicMock()
-    conn.rollback = MagicMock()
-    conn.close = MagicMock()
-
+def test_run_mysql_execute_formatted_query_execute_error(config, conn):
     cursor = conn.cursor.return_value
     cursor.execute = MagicMock(side_effect=Exception("Boom!"))
     cursor.close = MagicMock()
@@ -135,3 +241,112 @@ def test_create_mysql_connection_engine_result_can_initiate_connection(config):
     connection = sql_engine.connect()
 
     assert connection.closed is False
+
+
+def mock_connection(connected=True):
+    connection = MagicMock()
+    connection.is_connected.return_value = connected
+    return connection
+
+
+def test_connection_pool_reuses_returned_connections():
+    connection = mock_connection()
+    pool = MySQLConnectionPool("test", MagicMock(return_value=connection), 2)
+
+    with pool.get_connection() as borrowed:
+        borrowed.commit()
+    pooled = pool.get_connection()
+    pooled.close()
+    pooled.close()
+
+    # the connection is reset when returned, rather than closed, and reused
+    assert connection.commit.called is True
+    assert connection.cmd_reset_connection.call_count == 2
+    assert connection.close.called is False
+    assert pool.stats() == {
+        "pool_size": 2,
+        "open": 1,
+        "idle": 1,
+        "in_use": 0,
+        "connections_created": 1,
+        "checkouts": 2,
+        "waits": 0,
+        "wait_seconds": 0.0,
+    }
+
+
+def test_connection_pool_waits_for_a_connection_when_full():
+    pool = MySQLConnectionPool("test", MagicMock(side_effect=lambda: mock_connection()), 1)
+    first = pool.get_connection()
+    borrowed = threading.Event()
+
+    def borrow():
+        pool.get_connection().close()
+        borrowed.set()
+
+    borrower = threading.Thread(target=borrow)
+    borrower.start()
+    assert not borrowed.wait(timeout=0.2)
+
+    first.close()
+    assert borrowed.wait(timeout=10)
+    borrower.join()
+
+    assert pool.stats()["waits"] == 1
+    assert pool.stats()["connections_created"] == 1
+
+
+def test_connection_pool_does_not_borrow_failed_connections():
+    unconnected = mock_connection(connected=False)
+    pool = MySQLConnectionPool("test", MagicMock(side_effect=[None, unconnected]), 1)
+
+    assert pool.get_connection() is None
+    assert pool.get_connection() is unconnected
+    assert pool.stats()["in_use"] == 0
+
+
+def test_connection_pool_replaces_broken_connections():
+    reset_fails = mock_connection()
+    reset_fails.cmd_reset_connection.side_effect = mysql.Error()
+    disconnected = mock_connection()
+    replacement = mock_connection()
+    pool = MySQLConnectionPool("test", MagicMock(side_effect=[reset_fails, disconnected, replacement]), 1)
+
+    # a connection which cannot be reset is closed rather than returned to the pool
+    pool.get_connection().close()
+    assert reset_fails.close.called is True
+
+    # an idle connection closed by the server is replaced
+    pool.get_connection().close()
+    disconnected.is_connected.return_value = False
+    pool.get_connection().close()
+
+    assert disconnected.close.called is True
+    assert replacement.cmd_reset_connection.called is True
+    assert pool.stats()["connections_created"] == 3
+
+
+def test_get_mysql_connection_provider_is_shared(config):
+    provider = get_mysql_connection_provider(config)
+
+    assert get_mysql_connection_provider(config) is provider
+    assert get_mysql_connection_provider(MagicMock()) is not provider
+
+
+def test_get_mysql_connection_uses_the_pools_of_the_process(config, monkeypatch):
+    monkeypatch.setattr(config, "MLWH_LOAD_DATA_MIN_ROWS", 1000)
+
+    with patch(
+        "crawler.db.mysql.create_mysql_connection", side_effect=lambda *args, **kwargs: mock_connection()
+    ) as connect:
+        get_mysql_connection(config, False).close()
+        get_mysql_connection(config, False).close()
+        get_mysql_connection(config).close()
+
+    assert connect.call_count == 2
+    connect.assert_any_call(config, False, allow_local_infile=True)
+    connect.assert_any_call(config, True, allow_local_infile=False)
+
+    stats = get_mysql_connection_provider(config).stats()
+    assert stats["mlwh_rw"]["checkouts"] == 2
+    assert stats["mlwh_ro"]["checkouts"] == 1
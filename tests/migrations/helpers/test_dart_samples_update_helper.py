@@ -40,7 +40,7 @@ def mock_mongo_client():
 
 @pytest.fixture
 def mock_mysql_connection():
-    with patch("migrations.helpers.dart_samples_update_helper.create_mysql_connection") as mock_conn:
+    with patch("migrations.helpers.dart_samples_update_helper.get_mysql_connection") as mock_conn:
         yield mock_conn
 
 
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, PropertyMock, patch
 import pytest
 
 from crawler.constants import (
+    DART_STATE_NO_PLATE,
     DART_STATE_PENDING,
     FIELD_COORDINATE,
     FIELD_FILTERED_POSITIVE,
@@ -206,7 +207,7 @@ def test_update_filtered_positive_fields_assigns_expected_filtered_positive_fiel
     timestamp = datetime.now()
     version = "v2.3"
     mock_positive_identifier = MagicMock()
-    mock_positive_identifier.is_positive.return_value = True
+    mock_positive_identifier.is_positive_batch.return_value = [True, True]
     mock_positive_identifier.version = version
 
     update_filtered_positive_fields(mock_positive_identifier, samples, version, timestamp)
@@ -265,7 +266,7 @@ def test_update_mongo_filtered_positive_fields_updates_expected_samples(
 
 
 def test_update_mlwh_filtered_positive_fields_return_false_with_no_connection(config):
-    with patch("migrations.helpers.update_filtered_positives_helper.create_mysql_connection") as mock_connection:
+    with patch("migrations.helpers.update_filtered_positives_helper.get_mysql_connection") as mock_connection:
         mock_connection().is_connected.return_value = False
         result = update_mlwh_filtered_positive_fields(config, [])
         assert result is False
@@ -421,9 +422,7 @@ def test_update_dart_fields_non_pending_plate_does_not_update_wells(config, mock
         "migrations.helpers.update_filtered_positives_helper.add_dart_plate_if_doesnt_exist",
         return_value="not pending",
     ):
-        with patch(
-            "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties"
-        ) as mock_update_well_props:
+        with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_update_well_props:
             samples = [{FIELD_PLATE_BARCODE: "123", FIELD_SOURCE: config.CENTRES[0]["name"]}]
             result = update_dart_fields(config, samples)
 
@@ -438,12 +437,10 @@ def test_update_dart_fields_returns_false_unable_to_determine_well_index(config,
         return_value=DART_STATE_PENDING,
     ):
         with patch(
-            "migrations.helpers.update_filtered_positives_helper.get_dart_well_index",
+            "crawler.db.dart.get_dart_well_index",
             return_value=None,
         ):
-            with patch(
-                "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties"
-            ) as mock_update_well_props:
+            with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_update_well_props:
                 samples = [{FIELD_PLATE_BARCODE: "123", FIELD_SOURCE: config.CENTRES[0]["name"]}]
                 result = update_dart_fields(config, samples)
 
@@ -458,16 +455,14 @@ def test_update_dart_fields_returns_false_error_mapping_to_well_props(config, mo
         return_value=DART_STATE_PENDING,
     ):
         with patch(
-            "migrations.helpers.update_filtered_positives_helper.get_dart_well_index",
+            "crawler.db.dart.get_dart_well_index",
             return_value=None,
         ):
             with patch(
-                "migrations.helpers.update_filtered_positives_helper.map_mongo_doc_to_dart_well_props",  # noqa: E501
+                "crawler.db.dart.map_mongo_doc_to_dart_well_props",
                 side_effect=Exception("Boom!"),
             ):
-                with patch(
-                    "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties"
-                ) as mock_update_well_props:
+                with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_update_well_props:
                     samples = [{FIELD_PLATE_BARCODE: "123", FIELD_SOURCE: config.CENTRES[0]["name"]}]
                     result = update_dart_fields(config, samples)
 
@@ -482,14 +477,12 @@ def test_update_dart_fields_returns_false_error_adding_well_properties(config, m
         return_value=DART_STATE_PENDING,
     ):
         with patch(
-            "migrations.helpers.update_filtered_positives_helper.get_dart_well_index",
+            "crawler.db.dart.get_dart_well_index",
             return_value=12,
         ):
-            with patch(
-                "migrations.helpers.update_filtered_positives_helper.map_mongo_doc_to_dart_well_props"  # noqa: E501
-            ):
+            with patch("crawler.db.dart.map_mongo_doc_to_dart_well_props"):
                 with patch(
-                    "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties",
+                    "crawler.db.dart.set_dart_plate_well_properties",
                     side_effect=NotImplementedError("Boom!"),
                 ):
                     samples = [{FIELD_PLATE_BARCODE: "123", FIELD_SOURCE: config.CENTRES[0]["name"]}]
@@ -502,17 +495,13 @@ def test_update_dart_fields_returns_false_error_adding_well_properties(config, m
 def test_update_dart_fields_returns_true_multiple_new_plates(config, mock_dart_conn):
     with patch("migrations.helpers.update_filtered_positives_helper.add_dart_plate_if_doesnt_exist") as mock_add_plate:
         mock_add_plate.return_value = DART_STATE_PENDING
-        with patch("migrations.helpers.update_filtered_positives_helper.get_dart_well_index") as mock_get_well_index:
+        with patch("crawler.db.dart.get_dart_well_index") as mock_get_well_index:
             test_well_index = 12
             mock_get_well_index.return_value = test_well_index
-            with patch(
-                "migrations.helpers.update_filtered_positives_helper.map_mongo_doc_to_dart_well_props"  # noqa: E501
-            ) as mock_map:
+            with patch("crawler.db.dart.map_mongo_doc_to_dart_well_props") as mock_map:
                 test_well_props = {"prop1": "value1", "test prop": "test value"}
                 mock_map.return_value = test_well_props
-                with patch(
-                    "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties"
-                ) as mock_set_well_props:
+                with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_set_well_props:
                     test_centre_name = config.CENTRES[0]["name"]
                     test_labware_class = config.CENTRES[0]["biomek_labware_class"]
                     samples = [
@@ -548,14 +537,14 @@ def test_update_dart_fields_returns_true_multiple_new_plates(config, mock_dart_c
                             mock_dart_conn().cursor(),
                             sample[FIELD_PLATE_BARCODE],
                             test_labware_class,
+                            DART_STATE_NO_PLATE,
                         )
                         mock_get_well_index.assert_any_call(sample[FIELD_COORDINATE])
                         mock_map.assert_any_call(sample)
                         mock_set_well_props.assert_any_call(
                             mock_dart_conn().cursor(),
                             sample[FIELD_PLATE_BARCODE],
-                            test_well_props,
-                            test_well_index,
+                            [(test_well_props, test_well_index)],
                         )
                     assert mock_dart_conn().cursor().commit.call_count == num_samples
                     assert result is True
@@ -564,17 +553,13 @@ def test_update_dart_fields_returns_true_multiple_new_plates(config, mock_dart_c
 def test_update_dart_fields_returns_true_single_new_plate_multiple_wells(config, mock_dart_conn):
     with patch("migrations.helpers.update_filtered_positives_helper.add_dart_plate_if_doesnt_exist") as mock_add_plate:
         mock_add_plate.return_value = DART_STATE_PENDING
-        with patch("migrations.helpers.update_filtered_positives_helper.get_dart_well_index") as mock_get_well_index:
+        with patch("crawler.db.dart.get_dart_well_index") as mock_get_well_index:
             test_well_index = 12
             mock_get_well_index.return_value = test_well_index
-            with patch(
-                "migrations.helpers.update_filtered_positives_helper.map_mongo_doc_to_dart_well_props"  # noqa: E501
-            ) as mock_map:
+            with patch("crawler.db.dart.map_mongo_doc_to_dart_well_props") as mock_map:
                 test_well_props = {"prop1": "value1", "test prop": "test value"}
                 mock_map.return_value = test_well_props
-                with patch(
-                    "migrations.helpers.update_filtered_positives_helper.set_dart_well_properties"
-                ) as mock_set_well_props:
+                with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_set_well_props:
                     test_plate_barcode = "123"
                     test_centre_name = config.CENTRES[0]["name"]
                     test_labware_class = config.CENTRES[0]["biomek_labware_class"]
@@ -608,22 +593,22 @@ def test_update_dart_fields_returns_true_single_new_plate_multiple_wells(config,
                     result = update_dart_fields(config, samples)
 
                     mock_add_plate.assert_called_once_with(
-                        mock_dart_conn().cursor(), test_plate_barcode, test_labware_class
+                        mock_dart_conn().cursor(), test_plate_barcode, test_labware_class, DART_STATE_NO_PLATE
                     )
 
                     pos_samples = samples[:-1]
                     num_pos_samples = len(pos_samples)
                     assert mock_get_well_index.call_count == num_pos_samples
                     assert mock_map.call_count == num_pos_samples
-                    assert mock_set_well_props.call_count == num_pos_samples
                     for sample in pos_samples:
                         mock_get_well_index.assert_any_call(sample[FIELD_COORDINATE])
                         mock_map.assert_any_call(sample)
-                        mock_set_well_props.assert_any_call(
-                            mock_dart_conn().cursor(),
-                            sample[FIELD_PLATE_BARCODE],
-                            test_well_props,
-                            test_well_index,
-                        )
+
+                    # sets the properties of all the positive wells of the plate at once
+                    mock_set_well_props.assert_called_once_with(
+                        mock_dart_conn().cursor(),
+                        test_plate_barcode,
+                        [(test_well_props, test_well_index)] * num_pos_samples,
+                    )
                     assert mock_dart_conn().cursor().commit.call_count == 1
                     assert result is True
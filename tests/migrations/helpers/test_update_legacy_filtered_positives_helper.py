@@ -67,7 +67,7 @@ def test_filtered_positive_fields_set_returns_false_with_no_fields_set(
 
 def test_get_cherrypicked_samples_by_date_raises_with_error_creating_engine(config):
     with patch(
-        "migrations.helpers.update_legacy_filtered_positives_helper.sqlalchemy.create_engine",
+        "sqlalchemy.create_engine",
         side_effect=ValueError("Boom!"),
     ):
         with pytest.raises(ValueError):
@@ -75,9 +75,7 @@ def test_get_cherrypicked_samples_by_date_raises_with_error_creating_engine(conf
 
 
 def test_get_cherrypicked_samples_by_date_raises_with_error_connecting(config):
-    with patch(
-        "migrations.helpers.update_legacy_filtered_positives_helper.sqlalchemy.create_engine"
-    ) as mock_sql_engine:
+    with patch("sqlalchemy.create_engine") as mock_sql_engine:
         mock_sql_engine().connect.side_effect = ValueError("Boom!")
 
         with pytest.raises(ValueError):
@@ -168,7 +166,7 @@ def test_split_mongo_samples_by_version(mongo_samples_without_filtered_positive_
 
 
 def update_mlwh_filtered_positive_fields_batched_batched_return_false_with_no_connection(config):
-    with patch("migrations.helpers.update_legacy_filtered_positives_helper.create_mysql_connection") as mock_connection:
+    with patch("migrations.helpers.update_legacy_filtered_positives_helper.get_mysql_connection") as mock_connection:
         version = "v2"
         update_timestamp = datetime.now()
 
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from crawler.checksum_index import CHECKSUM_INDEX_FILE, SQL_CREATE_CHECKSUMS_TABLE, SQL_INSERT_CHECKSUM, ChecksumIndex
+
+ERRORS = "errors"
+SUCCESSES = "successes"
+
+
+def create_backup_file(backups_folder, outcome, file_name, checksum):
+    backup_file_name = f"200601_1414_{file_name}_{checksum}"
+    with open(os.path.join(backups_folder, outcome, backup_file_name), "w") as file:
+        file.write("Your text goes here")
+
+    return backup_file_name
+
+
+def test_index_is_built_from_backup_directories(tmpdir):
+    tmpdir.mkdir(ERRORS)
+    tmpdir.mkdir(SUCCESSES)
+    create_backup_file(tmpdir, SUCCESSES, "AP_sanger_report_200503_2338.csv", "abc123")
+    create_backup_file(tmpdir, ERRORS, "AP_sanger_report_200503_2339.csv", "def456")
+
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == ["AP_sanger_report_200503_2338.csv"]
+    assert checksum_index.find_file_names(ERRORS, "def456") == ["AP_sanger_report_200503_2339.csv"]
+    assert checksum_index.find_file_names(ERRORS, "abc123") == []
+    assert os.path.exists(os.path.join(tmpdir, CHECKSUM_INDEX_FILE))
+
+
+def test_index_ignores_files_not_named_as_backups(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    tmpdir.join(SUCCESSES, "not_a_backup").write("Your text goes here")
+
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+
+    assert checksum_index.rebuild() == 0
+
+
+def test_add_to_index(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == []
+
+    checksum_index.add(SUCCESSES, "abc123", "file.csv", "200601_1414_file.csv_abc123")
+    # adding the same backup again does not duplicate it
+    checksum_index.add(SUCCESSES, "abc123", "file.csv", "200601_1414_file.csv_abc123")
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == ["file.csv"]
+
+
+def test_rebuild_index(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+    checksum_index.add(SUCCESSES, "abc123", "file.csv", "200601_1414_file.csv_abc123")
+
+    # a backup copied by hand is only found after rebuilding the index
+    create_backup_file(tmpdir, SUCCESSES, "other_file.csv", "def456")
+    assert checksum_index.find_file_names(SUCCESSES, "def456") == []
+
+    assert checksum_index.rebuild() == 1
+
+    assert checksum_index.find_file_names(SUCCESSES, "def456") == ["other_file.csv"]
+    # the backup which is not in the backups folder is removed from the index
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == []
+
+
+def test_interrupted_build_is_started_again(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    create_backup_file(tmpdir, SUCCESSES, "file.csv", "abc123")
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+
+    with patch("crawler.checksum_index.os.listdir", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            checksum_index.find_file_names(SUCCESSES, "abc123")
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == ["file.csv"]
+
+
+def test_index_without_a_completed_build_is_rebuilt(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    create_backup_file(tmpdir, SUCCESSES, "file.csv", "abc123")
+    # a partial index, which was never recorded as built
+    with sqlite3.connect(os.path.join(tmpdir, CHECKSUM_INDEX_FILE)) as connection:
+        connection.execute(SQL_CREATE_CHECKSUMS_TABLE)
+        connection.execute(
+            SQL_INSERT_CHECKSUM, (SUCCESSES, "def456", "other_file.csv", "200601_1414_other_file.csv_def456")
+        )
+    connection.close()
+
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == ["file.csv"]
+    assert checksum_index.find_file_names(SUCCESSES, "def456") == []
+
+
+def test_index_is_only_built_once(tmpdir):
+    tmpdir.mkdir(SUCCESSES)
+    checksum_index = ChecksumIndex(str(tmpdir), (ERRORS, SUCCESSES))
+    checksum_index.find_file_names(SUCCESSES, "abc123")
+
+    # a backup copied by hand is not indexed, as the index has been built
+    create_backup_file(tmpdir, SUCCESSES, "file.csv", "abc123")
+
+    assert checksum_index.find_file_names(SUCCESSES, "abc123") == []
@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from crawler.date_tested_parser import (
+    DATE_FORMAT_DAY_FIRST,
+    DATE_FORMAT_YEAR_FIRST,
+    DATE_PATTERN_DAY_FIRST,
+    DATE_PATTERN_YEAR_FIRST,
+    DateTestedParser,
+    datetime_from_components,
+    parse_day_first_date,
+    parse_year_first_date,
+)
+
+
+def test_parse():
+    parser = DateTestedParser()
+    date_time = datetime(year=2020, month=11, day=22, hour=4, minute=36, second=38, tzinfo=timezone.utc)
+
+    # "Normal" datetime, seen most of the time, with timezone
+    assert parser.parse(date_time.strftime("%Y-%m-%d %H:%M:%S %Z")) == (True, date_time)
+
+    # "Normal" datetime, seen most of the time, without timezone
+    assert parser.parse(date_time.strftime("%Y-%m-%d %H:%M:%S")) == (True, date_time.replace(tzinfo=None))
+
+    # other format
+    assert parser.parse(date_time.strftime("%d/%m/%Y %H:%M")) == (True, date_time.replace(second=0, tzinfo=None))
+
+    # wrong format
+    assert parser.parse(date_time.strftime("%d %m %Y %H:%M")) == (False, None)
+
+    # empty date
+    assert parser.parse("") == (True, None)
+    assert parser.parse(None) == (True, None)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2020-11-22 04:36:38",
+        "2020-11-22 04:36:38 UTC",
+        "2020-11-22   04:36:38",
+        "2020-11-22 04:36:38   UTC",
+        "2020-11-22 04:36:38 ",
+        "2020-11-22 04:36:38 GMT",
+        "2020-11-22 04:36",
+        "2020-11-22T04:36:38",
+        "2020-1-22 04:36:38",
+        "2020-11-22 34:36:38",
+        "2020-11-22 04:66:38",
+        "20a0-11-22 04:36:38",
+        "19/07/2020 21:41",
+        "19/07/2020   21:41",
+        "19/07/2020 21:41:00",
+        "19-07-2020 21:41",
+        "9/07/2020 21:41",
+        "19/07/2020 31:41",
+        "19/07/2020 21:71",
+        "1９/07/2020 21:41",
+    ],
+)
+def test_parse_matches_patterns(value):
+    expected = None
+    for pattern in (DATE_PATTERN_YEAR_FIRST, DATE_PATTERN_DAY_FIRST):
+        if match := pattern.match(value):
+            expected = datetime_from_components(**match.groupdict())
+
+    assert DateTestedParser().parse(value) == (expected is not None, expected)
+
+
+@pytest.mark.parametrize(
+    "value", ["2020-02-30 04:36:38", "2020-13-22 04:36:38", "30/02/2020 21:41", "19/07/2020 24:41"]
+)
+def test_parse_impossible_date(value):
+    # the value is in a valid format but is not a date
+    with pytest.raises(ValueError):
+        DateTestedParser().parse(value)
+
+
+def test_parse_memoizes_dates():
+    parser = DateTestedParser()
+
+    with patch.object(parser, "_parse_new_value", wraps=parser._parse_new_value) as parse_new_value:
+        for _ in range(3):
+            assert parser.parse("2020-11-22 04:36:38 UTC")[0] is True
+            assert parser.parse("22-11-2020")[0] is False
+
+    assert parse_new_value.call_count == 2
+
+
+def test_no_format_is_detected_before_parsing():
+    parser = DateTestedParser()
+
+    assert parser.detected_format is None
+    assert parser.formats_used() == "none"
+
+
+def test_parse_detects_format():
+    parser = DateTestedParser()
+
+    parser.parse("19/07/2020 21:41")
+    parser.parse("19/07/2020 21:41")
+    parser.parse("20/07/2020 09:12")
+
+    assert parser.detected_format == DATE_FORMAT_DAY_FIRST
+
+    # a date in another format is still parsed, but does not change the format of the file
+    parser.parse("2020-11-22 04:36:38")
+
+    assert parser.detected_format == DATE_FORMAT_DAY_FIRST
+    assert parser.formats_used() == (
+        f"{DATE_FORMAT_DAY_FIRST} (2 distinct dates), {DATE_FORMAT_YEAR_FIRST} (1 distinct dates)"
+    )
+
+
+def test_parse_year_first_date():
+    assert parse_year_first_date("2020-11-22 04:36:38 UTC") == datetime(2020, 11, 22, 4, 36, 38, tzinfo=timezone.utc)
+    assert parse_year_first_date("2020-11-22 04:36:38") == datetime(2020, 11, 22, 4, 36, 38)
+    assert parse_year_first_date("19/07/2020 21:41") is None
+
+
+def test_parse_day_first_date():
+    assert parse_day_first_date("19/07/2020 21:41") == datetime(2020, 7, 19, 21, 41)
+    assert parse_day_first_date("2020-11-22 04:36:38") is None
+
+
+def test_datetime_from_components():
+    date_dict = {
+        "year": "2020",
+        "month": "11",
+        "day": "22",
+    }
+    time_dict = {"hour": "4", "minute": "36", "second": "38"}
+    time_with_seconds = f"{int(time_dict['hour']):02}:{time_dict['minute']}:{time_dict['second']}"
+    time_without_seconds = f"{int(time_dict['hour']):02}:{time_dict['minute']}"
+
+    date_time = datetime(
+        **{key: int(value) for key, value in date_dict.items()},  # type: ignore
+        **{key: int(value) for key, value in time_dict.items()},  # type: ignore
+    )
+    #  date and time with seconds with UTC timezone
+    assert datetime_from_components(**date_dict, time=time_with_seconds, timezone_name="UTC") == date_time.replace(
+        tzinfo=timezone.utc
+    )
+
+    #  date and time with seconds with GMT timezone
+    assert datetime_from_components(**date_dict, time=time_with_seconds, timezone_name="GMT") == date_time
+
+    #  date and time with seconds with no timezone
+    assert datetime_from_components(**date_dict, time=time_with_seconds) == date_time
+
+    #  date and time with no seconds with UTC timezone
+    assert datetime_from_components(**date_dict, time=time_without_seconds, timezone_name="UTC") == date_time.replace(
+        second=0, tzinfo=timezone.utc
+    )
+
+    #  date and time with no seconds with no timezone
+    assert datetime_from_components(**date_dict, time=time_without_seconds) == date_time.replace(second=0)
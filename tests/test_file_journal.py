@@ -0,0 +1,47 @@
+import os
+
+from bson.objectid import ObjectId
+
+from crawler.file_journal import FILE_JOURNAL_FILE, FileJournal
+from crawler.stage_timer import STAGE_MLWH_INSERT, STAGE_MONGO_INSERT
+
+
+def test_journal_is_created_empty(tmpdir):
+    file_journal = FileJournal(str(tmpdir))
+
+    assert file_journal.committed_stages("abc123", 100) == {}
+    assert os.path.exists(os.path.join(tmpdir, FILE_JOURNAL_FILE))
+
+
+def test_commit_to_journal(tmpdir):
+    file_journal = FileJournal(str(tmpdir))
+    mongo_id = ObjectId()
+
+    file_journal.commit("abc123", 100, 0, STAGE_MONGO_INSERT, {"inserted_ids": [mongo_id]})
+    file_journal.commit("abc123", 100, 0, STAGE_MLWH_INSERT)
+    file_journal.commit("abc123", 100, 1, STAGE_MONGO_INSERT, {"inserted_ids": []})
+    file_journal.commit("def456", 100, 0, STAGE_MONGO_INSERT, {"inserted_ids": []})
+
+    assert FileJournal(str(tmpdir)).committed_stages("abc123", 100) == {
+        0: {STAGE_MONGO_INSERT: {"inserted_ids": [mongo_id]}, STAGE_MLWH_INSERT: None},
+        1: {STAGE_MONGO_INSERT: {"inserted_ids": []}},
+    }
+
+
+def test_committed_stages_of_a_different_chunk_size(tmpdir):
+    file_journal = FileJournal(str(tmpdir))
+
+    file_journal.commit("abc123", 100, 0, STAGE_MLWH_INSERT)
+
+    assert file_journal.committed_stages("abc123", 50) == {}
+
+
+def test_discard_from_journal(tmpdir):
+    file_journal = FileJournal(str(tmpdir))
+    file_journal.commit("abc123", 100, 0, STAGE_MLWH_INSERT)
+    file_journal.commit("def456", 100, 0, STAGE_MLWH_INSERT)
+
+    file_journal.discard("abc123")
+
+    assert file_journal.committed_stages("abc123", 100) == {}
+    assert file_journal.committed_stages("def456", 100) == {0: {STAGE_MLWH_INSERT: None}}
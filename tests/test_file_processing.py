@@ -1,20 +1,23 @@
 import os
 import uuid
 from csv import DictReader
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from io import StringIO
-from typing import List
+from typing import Dict, List
 from unittest.mock import MagicMock, patch
 
+import pytest
 from bson.decimal128 import Decimal128
 from bson.objectid import ObjectId
 from mysql.connector.connection_cext import CMySQLConnection
+from pymongo.errors import BulkWriteError
 
 from crawler.constants import (
     COLLECTION_IMPORTS,
     COLLECTION_SAMPLES,
     COLLECTION_SOURCE_PLATES,
+    DART_STATE_NO_PLATE,
     DART_STATE_PENDING,
     FIELD_BARCODE,
     FIELD_CH1_CQ,
@@ -41,6 +44,7 @@ from crawler.constants import (
     FIELD_LH_SAMPLE_UUID,
     FIELD_LH_SOURCE_PLATE_UUID,
     FIELD_LINE_NUMBER,
+    FIELD_MONGODB_ID,
     FIELD_PLATE_BARCODE,
     FIELD_RESULT,
     FIELD_RNA_ID,
@@ -79,8 +83,19 @@ from crawler.constants import (
     POSITIVE_RESULT_VALUE,
 )
 from crawler.db.mongo import get_mongo_collection
+from crawler.file_journal import FileJournal
 from crawler.file_processing import ERRORS_DIR, SUCCESSES_DIR, Centre, CentreFile
-from crawler.types import Config, ModifiedRow
+from crawler.helpers.enums import CentreFileState
+from crawler.sample import Sample
+from crawler.sample_writer import SampleWritePipeline
+from crawler.stage_timer import (
+    STAGE_DART_INSERT,
+    STAGE_MLWH_INSERT,
+    STAGE_MONGO_INSERT,
+    STAGE_SOURCE_PLATES,
+    STAGE_STATE_CHECK,
+)
+from crawler.types import Config, FileTransfer, ModifiedRow, RemoteFile
 
 # ----- tests helpers -----
 
@@ -103,6 +118,150 @@ def test_get_download_dir(config):
         assert centre.get_download_dir() == f"{config.DIR_DOWNLOADED_DATA}{centre_config['prefix']}/"
 
 
+def test_centre_files_share_mongo_client(config):
+    mongo_client = MagicMock()
+    centre = Centre(config, config.CENTRES[0], mongo_client)
+
+    with patch("crawler.file_processing.get_mongo_db") as mock_get_mongo_db:
+        CentreFile("a_file.csv", centre).get_db()
+        CentreFile("another_file.csv", centre).get_db()
+
+        assert [call.args for call in mock_get_mongo_db.call_args_list] == [(config, mongo_client)] * 2
+
+
+def test_centre_creates_mongo_client_once(config):
+    centre = Centre(config, config.CENTRES[0])
+
+    with patch("crawler.file_processing.create_mongo_client") as mock_create_mongo_client:
+        CentreFile("a_file.csv", centre).get_db()
+        CentreFile("another_file.csv", centre).get_db()
+
+        mock_create_mongo_client.assert_called_once_with(config)
+
+
+def remote_file_attrs(file_name, size, mtime):
+    attrs = MagicMock(st_size=size, st_mtime=mtime)
+    attrs.filename = file_name
+    return attrs
+
+
+def test_download_csv_files_incremental_sync(config, tmpdir):
+    with patch.dict(config.CENTRES[0], {"backups_folder": tmpdir.realpath()}):
+        with patch.object(config, "SFTP_INCREMENTAL_SYNC", True):
+            centre = Centre(config, config.CENTRES[0])
+            centre.sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000))
+            centre.sftp_manifest.add(RemoteFile("AP_sanger_report_200511_1037.csv", 100, 1000))
+
+            with patch("crawler.file_processing.get_sftp_connection") as mock_sftp_connection:
+                mock_sftp = mock_sftp_connection().__enter__()
+                mock_sftp.listdir_attr.return_value = [
+                    # already processed
+                    remote_file_attrs("AP_sanger_report_200503_2338.csv", 100, 1000),
+                    # changed since processed
+                    remote_file_attrs("AP_sanger_report_200511_1037.csv", 120, 2000),
+                    # new
+                    remote_file_attrs("AP_sanger_report_200518_2132.csv", 100, 3000),
+                    # not a centre file
+                    remote_file_attrs("notes.txt", 10, 3000),
+                ]
+
+                with patch("crawler.file_processing.download_files") as mock_download_files:
+                    new_or_changed_files = [
+                        RemoteFile("AP_sanger_report_200511_1037.csv", 120, 2000),
+                        RemoteFile("AP_sanger_report_200518_2132.csv", 100, 3000),
+                    ]
+                    mock_download_files.return_value = [
+                        FileTransfer(remote_file, 0.1) for remote_file in new_or_changed_files
+                    ]
+
+                    centre.download_csv_files()
+
+                    mock_download_files.assert_called_once_with(
+                        config,
+                        config.CENTRES[0]["sftp_root_read"],
+                        centre.get_download_dir(),
+                        new_or_changed_files,
+                        config.SFTP_DOWNLOAD_WORKERS,
+                    )
+                    mock_sftp.get_d.assert_not_called()
+
+                    assert centre.downloaded_files == {
+                        remote_file.file_name: remote_file for remote_file in new_or_changed_files
+                    }
+
+
+def test_download_csv_files_without_incremental_sync(config, tmpdir):
+    with patch.dict(config.CENTRES[0], {"backups_folder": tmpdir.realpath()}):
+        with patch.object(config, "SFTP_INCREMENTAL_SYNC", False):
+            centre = Centre(config, config.CENTRES[0])
+
+            with patch("crawler.file_processing.get_sftp_connection") as mock_sftp_connection:
+                mock_sftp = mock_sftp_connection().__enter__()
+
+                centre.download_csv_files()
+
+                mock_sftp.get_d.assert_called_once_with(config.CENTRES[0]["sftp_root_read"], centre.get_download_dir())
+                mock_sftp.get.assert_not_called()
+
+
+def test_process_files_records_downloaded_files_in_sftp_manifest(config, tmpdir):
+    with patch.dict(config.CENTRES[0], {"backups_folder": tmpdir.realpath()}):
+        centre = Centre(config, config.CENTRES[0])
+        file_states = {
+            "AP_sanger_report_200503_2338.csv": CentreFileState.FILE_NOT_PROCESSED_YET,
+            "AP_sanger_report_200511_1037.csv": CentreFileState.FILE_PROCESSED_WITH_SUCCESS,
+            "AP_sanger_report_200518_2132.csv": CentreFileState.FILE_IN_BLACKLIST,
+            "AP_sanger_report_200518_2133.csv": CentreFileState.FILE_NOT_PROCESSED_YET,
+        }
+        # the last file was not downloaded from the SFTP server, e.g. it was kept from a previous run
+        centre.downloaded_files = {file_name: RemoteFile(file_name, 100, 1000) for file_name in list(file_states)[:3]}
+
+        def centre_file(file_name, _):
+            mock_centre_file = MagicMock()
+            mock_centre_file.file_state = file_states[file_name]
+            return mock_centre_file
+
+        with patch.object(centre, "get_files_in_download_dir", return_value=list(file_states)):
+            with patch("crawler.file_processing.CentreFile", side_effect=centre_file):
+                centre.process_files(False)
+
+        # files on the blacklist are not recorded, they are downloaded again in case they are taken off it
+        assert centre.sftp_manifest.processed_files() == {
+            RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000),
+            RemoteFile("AP_sanger_report_200511_1037.csv", 100, 1000),
+        }
+
+
+def test_process_files_writes_stage_timings_to_prometheus_textfile(config, tmpdir):
+    metrics_dir = tmpdir.join("metrics")
+    with patch.dict(config.CENTRES[0], {"backups_folder": tmpdir.realpath()}):
+        with patch.object(config, "PROMETHEUS_TEXTFILE_DIR", str(metrics_dir)):
+            centre = Centre(config, config.CENTRES[0])
+            file_names = ["AP_sanger_report_200503_2338.csv", "AP_sanger_report_200511_1037.csv"]
+
+            def process_samples(centre_file):
+                with centre_file.stage_timer.time(STAGE_MONGO_INSERT) as stage_timing:
+                    stage_timing.rows += 10
+
+            with patch.object(centre, "get_files_in_download_dir", return_value=file_names):
+                with patch.object(CentreFile, "set_state_for_file", autospec=True) as mock_set_state:
+                    mock_set_state.side_effect = lambda centre_file: setattr(
+                        centre_file, "file_state", CentreFileState.FILE_NOT_PROCESSED_YET
+                    )
+                    with patch.object(CentreFile, "process_samples", autospec=True) as mock_process_samples:
+                        mock_process_samples.side_effect = lambda centre_file, _: process_samples(centre_file)
+
+                        centre.process_files(False)
+
+    # the timings of the files are added up for the centre
+    assert centre.stage_timer.stages[STAGE_MONGO_INSERT].rows == 20
+    assert STAGE_STATE_CHECK in centre.stage_timer.stages
+
+    centre_config = config.CENTRES[0]
+    metrics = metrics_dir.join(f"crawler_{centre_config['prefix']}.prom").read().splitlines()
+    assert f'crawler_files_processed{{centre="{centre_config["name"]}"}} 2' in metrics
+
+
 def test_process_files(mongo_database, config, testing_files_for_process, testing_centres, pyodbc_conn):
     _, mongo_database = mongo_database
 
@@ -175,6 +334,23 @@ def test_process_files_one_wrong_format(mongo_database, config, testing_files_fo
         assert "CRITICAL: File is unexpected type and cannot be processed. (TYPE 10)" in i["errors"]
 
 
+def test_process_files_in_chunks(mongo_database, config, testing_files_for_process, testing_centres, pyodbc_conn):
+    _, mongo_database = mongo_database
+
+    centre_config = config.CENTRES[0]
+    centre_config["sftp_root_read"] = "tmp/files"
+    with patch.object(config, "FILE_PROCESSING_CHUNK_SIZE", 1):
+        centre = Centre(config, centre_config)
+        centre.process_files(False)
+
+    samples_collection = get_mongo_collection(mongo_database, COLLECTION_SAMPLES)
+    source_plates_collection = get_mongo_collection(mongo_database, COLLECTION_SOURCE_PLATES)
+
+    # the samples are all recorded and the plate is only created once, even though its samples are in different chunks
+    assert samples_collection.count_documents({"RNA ID": "AP123_B09", "source": "Alderley"}) == 1
+    assert source_plates_collection.count_documents({"barcode": "AP123"}) == 1
+
+
 # ----- tests for class CentreFile -----
 
 # tests for checksums
@@ -382,6 +558,24 @@ def test_parse_and_format_file_rows(config, freezer):
             assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
 
 
+def test_process_csv_yields_chunks(config, tmpdir):
+    centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some file")
+
+    csv_file = tmpdir.join("some_file.csv")
+    csv_file.write(
+        "Root Sample ID,RNA ID,Result,Date Tested,Lab ID\n"
+        "1,RNA_0043_H09,Positive,,AP\n"
+        "2,RNA_0043_H10,Negative,,AP\n"
+        "3,RNA_0043_H11,Positive,,AP\n"
+    )
+
+    with patch.object(centre_file, "filepath", return_value=csv_file.realpath()):
+        chunks = list(centre_file.process_csv(2))
+
+    assert [[sample.root_sample_id for sample in chunk] for chunk in chunks] == [["1", "2"], ["3"]]
+    assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
+
+
 def test_parse_and_format_file_rows_with_invalid_rna_id(config):
     centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some file")
     with StringIO() as fake_csv:
@@ -433,64 +627,20 @@ def test_filtered_row_with_extra_unrecognised_columns(config):
         assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
 
 
-def test_extract_channel_fields(centre_file: CentreFile) -> None:
-    with StringIO() as csv_weird_channels:
-        csv_weird_channels.write(
-            f"{FIELD_ROOT_SAMPLE_ID},{FIELD_RNA_ID},{FIELD_RESULT},{FIELD_DATE_TESTED},{FIELD_LAB_ID},"
-            "CH 1 - Target,CH 1 - Result,CH 1 - Cq,CH2_Target,CH2_Result,CH2_Cq,CH3-Target,CH3-Result,CH3-Cq,\n"
-        )
-        csv_weird_channels.write(
-            "1,RNA_0043,Positive,today,AP,ORF1ab,Positive,21.433,ORF2ab,Negative,22.433,ORF3ab,Positive,23.433,\n"
-        )
-        csv_weird_channels.seek(0)
-
-        csv_to_test_reader = DictReader(csv_weird_channels)
-
-        modified_row: ModifiedRow = {
-            FIELD_ROOT_SAMPLE_ID: "1",
-            FIELD_RNA_ID: "RNA_0043",
-            FIELD_RESULT: "Positive",
-            FIELD_DATE_TESTED: "today",
-            FIELD_LAB_ID: "AP",
-        }
+def test_column_plan(centre_file: CentreFile) -> None:
+    headers = (FIELD_ROOT_SAMPLE_ID, FIELD_RNA_ID, FIELD_RESULT, "CH 1 - Target", "ch1_cq", "Extra")
 
-        expected_modified_row = {
-            FIELD_ROOT_SAMPLE_ID: "1",
-            FIELD_RNA_ID: "RNA_0043",
-            FIELD_RESULT: "Positive",
-            FIELD_DATE_TESTED: "today",
-            FIELD_LAB_ID: "AP",
-            FIELD_CH1_TARGET: "ORF1ab",
-            FIELD_CH1_RESULT: "Positive",
-            FIELD_CH1_CQ: "21.433",
-            FIELD_CH2_TARGET: "ORF2ab",
-            FIELD_CH2_RESULT: "Negative",
-            FIELD_CH2_CQ: "22.433",
-            FIELD_CH3_TARGET: "ORF3ab",
-            FIELD_CH3_RESULT: "Positive",
-            FIELD_CH3_CQ: "23.433",
-        }
+    plan = centre_file.column_plan(headers)
 
-        seen_headers = [FIELD_ROOT_SAMPLE_ID, FIELD_RNA_ID, FIELD_RESULT, FIELD_DATE_TESTED, FIELD_LAB_ID]
-
-        expected_seen_headers = seen_headers + [
-            "CH 1 - Target",
-            "CH 1 - Result",
-            "CH 1 - Cq",
-            "CH2_Target",
-            "CH2_Result",
-            "CH2_Cq",
-            "CH3-Target",
-            "CH3-Result",
-            "CH3-Cq",
-        ]
+    assert set(plan.accepted_fields) == {FIELD_ROOT_SAMPLE_ID, FIELD_RNA_ID, FIELD_RESULT}
+    assert plan.channel_fields == (("CH 1 - Target", FIELD_CH1_TARGET), ("ch1_cq", FIELD_CH1_CQ))
+    assert plan.unexpected_headers == ["Extra"]
 
-        seen_headers_to_test, modified_row_to_test = centre_file.extract_channel_fields(
-            seen_headers, next(csv_to_test_reader), modified_row
-        )
+    # the plan is only worked out once for the same headers
+    with patch.object(centre_file, "match_channel_headers") as mock_match_channel_headers:
+        assert centre_file.column_plan(headers) is plan
 
-        assert seen_headers_to_test == expected_seen_headers
-        assert modified_row_to_test == expected_modified_row
+        mock_match_channel_headers.assert_not_called()
 
 
 def test_filtered_row_with_blank_lab_id(config):
@@ -931,6 +1081,112 @@ def test_where_positive_result_does_not_align_with_ct_channel_results(config):
         assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 1
 
 
+def parse_with_validation(config, csv_content):
+    centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some_file.csv")
+    add_error = MagicMock(wraps=centre_file.logging_collection.add_error)
+
+    with patch.object(centre_file.logging_collection, "add_error", add_error):
+        with patch("crawler.file_processing.uuid.uuid4", return_value=uuid.UUID(int=0)):
+            with StringIO(csv_content) as fake_csv:
+                augmented_data = centre_file.parse_and_format_file_rows(DictReader(fake_csv))
+
+    # the errors are aggregated by type, so only their order within each type matters
+    errors_by_type: Dict[str, List[str]] = {}
+    for error_type, message in (error_call.args for error_call in add_error.call_args_list):
+        errors_by_type.setdefault(error_type, []).append(message)
+
+    return augmented_data, errors_by_type
+
+
+def validation_test_csv():
+    with StringIO() as fake_csv:
+        fake_csv.write(
+            "Root Sample ID,RNA ID,Result,Lab ID,Date Tested,"
+            "CH1-Target,CH1-Result,CH1-Cq,CH2-Target,CH2-Result,CH2-Cq\n"
+        )
+        # valid rows, with and without channel values and dates
+        fake_csv.write("1,RNA_0043_A01,Positive,Val,2020-04-16 14:30:40 UTC,ORF1ab,Positive,24.98,N gene,Negative,\n")
+        fake_csv.write("2,RNA_0043_A02,Negative,Val,19/07/2020 21:41,,,,,,\n")
+        fake_csv.write("3,RNA_0043_A03,Void,Val,,S gene,Void,100,MS2,Negative,0.0\n")
+        # duplicate of a valid row, which is reported as a duplicate even though it is also invalid
+        fake_csv.write("1,RNA_0043_A01,Positive,Val,not a date,ORF1ab,Positive,24.98,N gene,Negative,\n")
+        # rows failing each of the rules
+        fake_csv.write("4,RNA_0043_A04,Positive,Val,2020-04-16 14:30:40,ORF1ab,Positive,abc,N gene,Positive,\n")
+        fake_csv.write("5,RNA_0043_A05,Positive,Val,2020-04-16,ORF1ab,Positive,24.98,,,\n")
+        fake_csv.write("6,RNA_0043_A06,Unknown,Val,,,,,,,\n")
+        fake_csv.write("7,RNA_0043_A07,Negative,Val,,ORF1ab,Negative,12,Gene X,Negative,13\n")
+        fake_csv.write("8,RNA_0043_A08,Negative,Val,,ORF1ab,Maybe,12,,,\n")
+        fake_csv.write("9,RNA_0043_A09,Negative,Val,,ORF1ab,Negative,12,N gene,Negative,100.01\n")
+        fake_csv.write("10,RNA_0043_A10,Positive,Val,,ORF1ab,Negative,12,N gene,Void,14\n")
+        # rows failing several rules, which only report the first
+        fake_csv.write("11,RNA_0043_A11,Unknown,Val,bad date,Gene X,Maybe,-1,,,xyz\n")
+        fake_csv.write("12,RNA_0043_A12,Unknown,Val,,Gene X,Maybe,-1,,,\n")
+        fake_csv.write("16,RNA_0043_A16,Positive,Val,,ORF1ab,Negative,-1,,,\n")
+        # an invalid row followed by a valid row with the same key fields, which is not a duplicate
+        fake_csv.write("13,RNA_0043_A13,Negative,Val,,Gene X,,,,,\n")
+        fake_csv.write("13,RNA_0043_A13,Negative,Val,,ORF1ab,,,,,\n")
+        fake_csv.write("13,RNA_0043_A13,Negative,Val,,ORF1ab,,,,,\n")
+        # rows which are skipped before validation
+        fake_csv.write(",,,,,,,,,,\n")
+        fake_csv.write("14,RNA_0043_A14,,Val,,,,,,,\n")
+        fake_csv.write("15,RNA_0043,Negative,Val,,ORF1ab,Negative,12,,,\n")
+
+        return fake_csv.getvalue()
+
+
+def test_validation_reports_the_first_error_of_each_row(config, freezer):
+    augmented_data, errors = parse_with_validation(config, validation_test_csv())
+
+    assert [row[FIELD_ROOT_SAMPLE_ID] for row in augmented_data] == ["1", "2", "3", "13"]
+    assert augmented_data[0][FIELD_CH1_CQ] == Decimal128("24.98")
+    assert augmented_data[0][FIELD_DATE_TESTED] == datetime(2020, 4, 16, 14, 30, 40, tzinfo=timezone.utc)
+
+    assert errors["TYPE 5"] == [
+        "Duplicated, line: 5, root_sample_id: 1",
+        "Duplicated, line: 18, root_sample_id: 13",
+    ]
+    assert errors["TYPE 16"] == [
+        "Result invalid, line: 8, result: Unknown",
+        "Result invalid, line: 14, result: Unknown",
+    ]
+    assert errors["TYPE 17"] == [
+        "CH2-Target invalid, line: 9, result: Gene X",
+        "CH1-Target invalid, line: 16, result: Gene X",
+    ]
+    assert errors["TYPE 18"] == ["CH1-Result invalid, line: 10, result: Maybe"]
+    assert errors["TYPE 19"] == ["CH1-Cq invalid, line: 6, value: abc", "CH2-Cq invalid, line: 13, value: xyz"]
+    assert errors["TYPE 20"] == [
+        "CH2-Cq not in range (0.0, 100.0), line: 11, result: 100.01",
+        "CH1-Cq not in range (0.0, 100.0), line: 15, result: -1",
+    ]
+    assert errors["TYPE 21"] == ["Positive Result does not match to CT Channel Results (none are positive), line: 12"]
+    assert errors["TYPE 27"] == ["Date Tested has an unknown date format, line: 7"]
+
+
+def test_cq_values_are_converted_once_a_chunk(config):
+    centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some_file.csv")
+
+    with patch.object(config, "FILE_PROCESSING_CHUNK_SIZE", 2):
+        with patch("crawler.file_processing.Decimal128", wraps=Decimal128) as mock_decimal128:
+            assert centre_file.convert_cq_value("24.98") == Decimal128("24.98")
+            assert centre_file.convert_cq_value("abc") is None
+            assert centre_file.convert_cq_value("24.98") == Decimal128("24.98")
+            assert centre_file.convert_cq_value("abc") is None
+            assert mock_decimal128.call_count == 2
+
+            # the memo is cleared once it holds a chunk of values
+            assert centre_file.convert_cq_value("12") == Decimal128("12")
+            assert centre_file.convert_cq_value("24.98") == Decimal128("24.98")
+            assert mock_decimal128.call_count == 4
+
+
+def test_is_cq_value_within_range(centre_file):
+    assert centre_file.is_cq_value_within_range(Decimal128("24.98")) is True
+    assert centre_file.is_cq_value_within_range(Decimal128("100.01")) is False
+    # NaN cannot be compared with the limits of the range
+    assert centre_file.is_cq_value_within_range(Decimal128("NaN")) is False
+
+
 def test_remove_bom(centre_file):
     with StringIO() as fake_csv:
         # construct a bytes object containing a byte order mark (BOM)
@@ -1129,6 +1385,23 @@ def test_backup_bad_file(config, tmpdir):
         assert filename in filename_with_timestamp
 
 
+def test_backup_file_adds_checksum_to_index(config, tmpdir):
+    with patch.dict(config.CENTRES[0], {"backups_folder": tmpdir.realpath()}):
+        centre = Centre(config, config.CENTRES[0])
+        filename = "AP_sanger_report_200503_2338.csv"
+
+        centre_file = CentreFile(filename, centre)
+        assert centre_file.checksum_match(SUCCESSES_DIR) is False
+
+        centre_file.backup_file()
+
+        # the backup is found without the backup directory being listed again
+        with patch("os.listdir") as mock_listdir:
+            assert CentreFile(filename, centre).checksum_match(SUCCESSES_DIR) is True
+            assert CentreFile(filename, centre).checksum_match(ERRORS_DIR) is False
+            mock_listdir.assert_not_called()
+
+
 # tests for parsing file name date
 def test_file_name_date_parses_right(config):
     centre = Centre(config, config.CENTRES[0])
@@ -1331,7 +1604,7 @@ def test_insert_samples_from_docs_into_mlwh_date_tested_none(
 
 
 def test_insert_samples_from_docs_into_mlwh_returns_false_none_connection(config, mlwh_connection):
-    with patch("crawler.file_processing.create_mysql_connection", return_value=None):
+    with patch("crawler.file_processing.get_mysql_connection", return_value=None):
         centre = Centre(config, config.CENTRES[0])
         centre_file = CentreFile("some file", centre)
 
@@ -1354,7 +1627,7 @@ def test_insert_samples_from_docs_into_mlwh_returns_false_none_connection(config
 
 
 def test_insert_samples_from_docs_into_mlwh_returns_false_not_connected(config, mlwh_connection):
-    with patch("crawler.file_processing.create_mysql_connection") as mysql_conn:
+    with patch("crawler.file_processing.get_mysql_connection") as mysql_conn:
         mysql_conn().is_connected.return_value = False
         centre = Centre(config, config.CENTRES[0])
         centre_file = CentreFile("some file", centre)
@@ -1378,7 +1651,7 @@ def test_insert_samples_from_docs_into_mlwh_returns_false_not_connected(config,
 
 
 def test_insert_samples_from_docs_into_mlwh_returns_failure_executing(config, mlwh_connection):
-    with patch("crawler.file_processing.create_mysql_connection"):
+    with patch("crawler.file_processing.get_mysql_connection"):
         with patch("crawler.file_processing.run_mysql_executemany_query", side_effect=Exception("Boom!")):
             centre = Centre(config, config.CENTRES[0])
             centre_file = CentreFile("some file", centre)
@@ -1401,6 +1674,39 @@ def test_insert_samples_from_docs_into_mlwh_returns_failure_executing(config, ml
             assert result is False
 
 
+@pytest.mark.parametrize("load_data_min_rows, uses_load_data", [(0, False), (1, True), (2, False)])
+def test_insert_samples_from_docs_into_mlwh_uses_load_data_for_large_chunks(
+    config, monkeypatch, load_data_min_rows, uses_load_data
+):
+    monkeypatch.setattr(config, "MLWH_LOAD_DATA_MIN_ROWS", load_data_min_rows)
+
+    with patch("crawler.file_processing.get_mysql_connection") as mysql_conn:
+        with patch("crawler.file_processing.run_mysql_executemany_query") as executemany_query:
+            with patch("crawler.file_processing.run_mysql_load_data_upsert") as load_data_upsert:
+                centre = Centre(config, config.CENTRES[0])
+                centre_file = CentreFile("some file", centre)
+
+                docs = [
+                    {
+                        "_id": ObjectId("5f562d9931d9959b92544728"),
+                        FIELD_ROOT_SAMPLE_ID: "ABC00000004",
+                        FIELD_RNA_ID: "TC-rna-00000029_H11",
+                        FIELD_PLATE_BARCODE: "TC-rna-00000029",
+                        FIELD_COORDINATE: "H11",
+                        FIELD_RESULT: "Negative",
+                        FIELD_DATE_TESTED: "",
+                        FIELD_SOURCE: "Test Centre",
+                        FIELD_LAB_ID: "TC",
+                    }
+                ]
+
+                assert centre_file.insert_samples_from_docs_into_mlwh(docs) is True
+
+                mysql_conn.assert_called_once_with(config, False)
+                assert load_data_upsert.called is uses_load_data
+                assert executemany_query.called is not uses_load_data
+
+
 # tests for inserting docs into DART
 def test_insert_plates_and_wells_from_docs_into_dart_none_connection(config):
     centre = Centre(config, config.CENTRES[0])
@@ -1476,9 +1782,10 @@ def test_insert_plates_and_wells_from_docs_into_dart_non_pending_plate_does_not_
         with patch("crawler.file_processing.add_dart_plate_if_doesnt_exist", return_value="not pending"):
             centre_file.insert_plates_and_wells_from_docs_into_dart(docs_to_insert)
 
-            # does not call any stored procedure
+            # only fetches the plate states and does not call any stored procedure
             assert centre_file.logging_collection.aggregator_types["TYPE 22"].count_errors == 0
-            mock_conn().cursor().execute.assert_not_called()
+            mock_conn().cursor().execute.assert_called_once()
+            mock_conn().cursor().executemany.assert_not_called()
             mock_conn().close.assert_called_once()
 
 
@@ -1555,7 +1862,7 @@ def test_insert_plates_and_wells_from_docs_into_dart_multiple_new_plates(config)
                 with patch("crawler.db.dart.map_mongo_doc_to_dart_well_props") as mock_map:
                     test_well_props = {"prop1": "value1", "test prop": "test value"}
                     mock_map.return_value = test_well_props
-                    with patch("crawler.db.dart.set_dart_well_properties") as mock_set_well_props:
+                    with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_set_well_props:
                         centre_file.insert_plates_and_wells_from_docs_into_dart(docs_to_insert)
 
                         assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
@@ -1567,6 +1874,7 @@ def test_insert_plates_and_wells_from_docs_into_dart_multiple_new_plates(config)
                                 mock_conn().cursor(),
                                 doc[FIELD_PLATE_BARCODE],
                                 centre_file.centre_config["biomek_labware_class"],
+                                DART_STATE_NO_PLATE,
                             )
 
                         # well helper method call checks
@@ -1579,8 +1887,7 @@ def test_insert_plates_and_wells_from_docs_into_dart_multiple_new_plates(config)
                             mock_set_well_props.assert_any_call(
                                 mock_conn().cursor(),
                                 doc[FIELD_PLATE_BARCODE],
-                                test_well_props,
-                                test_well_index,
+                                [(test_well_props, test_well_index)],
                             )
 
                         # commits changes
@@ -1632,7 +1939,7 @@ def test_insert_plates_and_wells_from_docs_into_dart_single_new_plate_multiple_w
                 with patch("crawler.db.dart.map_mongo_doc_to_dart_well_props") as mock_map:
                     test_well_props = {"prop1": "value1", "test prop": "test value"}
                     mock_map.return_value = test_well_props
-                    with patch("crawler.db.dart.set_dart_well_properties") as mock_set_well_props:
+                    with patch("crawler.db.dart.set_dart_plate_well_properties") as mock_set_well_props:
                         centre_file.insert_plates_and_wells_from_docs_into_dart(docs_to_insert)
 
                         assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
@@ -1643,6 +1950,7 @@ def test_insert_plates_and_wells_from_docs_into_dart_single_new_plate_multiple_w
                             mock_conn().cursor(),
                             plate_barcode,
                             centre_file.centre_config["biomek_labware_class"],
+                            DART_STATE_NO_PLATE,
                         )
 
                         # calls for well index and to map as expected
@@ -1652,10 +1960,9 @@ def test_insert_plates_and_wells_from_docs_into_dart_single_new_plate_multiple_w
                             mock_get_well_index.assert_any_call(doc[FIELD_COORDINATE])
                             mock_map.assert_any_call(doc)
 
-                        # calls to set well properties as expected
-                        assert mock_set_well_props.call_count == 2
-                        mock_set_well_props.assert_any_call(
-                            mock_conn().cursor(), plate_barcode, test_well_props, test_well_index
+                        # sets the properties of both positive wells at once
+                        mock_set_well_props.assert_called_once_with(
+                            mock_conn().cursor(), plate_barcode, [(test_well_props, test_well_index)] * 2
                         )
 
                         # commits changes
@@ -1801,3 +2108,253 @@ def test_docs_to_insert_updated_with_source_plate_handles_duplicate_existing_bar
 
     assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 1
     assert centre_file.logging_collection.aggregator_types["TYPE 25"].count_errors == 1
+
+
+def test_docs_to_insert_updated_with_source_plate_uuids_queries_plates_in_bulk(config):
+    centre = Centre(config, config.CENTRES[0])
+    centre_file = CentreFile("some file", centre)
+    existing_plate = {FIELD_BARCODE: "123", FIELD_LAB_ID: "AP", FIELD_LH_SOURCE_PLATE_UUID: str(uuid.uuid4())}
+    docs: List[ModifiedRow] = [
+        {FIELD_PLATE_BARCODE: "123", FIELD_LAB_ID: "AP"},
+        {FIELD_PLATE_BARCODE: "456", FIELD_LAB_ID: "MK"},
+        {FIELD_PLATE_BARCODE: "456", FIELD_LAB_ID: "MK"},
+        {FIELD_PLATE_BARCODE: "123", FIELD_LAB_ID: "AP"},
+    ]
+
+    with patch("crawler.file_processing.get_mongo_collection") as mock_get_collection:
+        source_plates_collection = mock_get_collection.return_value
+        source_plates_collection.find.return_value = [existing_plate]
+
+        updated_docs = centre_file.docs_to_insert_updated_with_source_plate_uuids(docs)
+
+        # the existing plates are fetched with one query and the new plates are inserted with one write
+        source_plates_collection.find.assert_called_once()
+        assert sorted(source_plates_collection.find.call_args.args[0][FIELD_BARCODE]["$in"]) == ["123", "456"]
+        source_plates_collection.find_one.assert_not_called()
+        source_plates_collection.insert_many.assert_called_once()
+        new_plates = source_plates_collection.insert_many.call_args.args[0]
+        assert [plate[FIELD_BARCODE] for plate in new_plates] == ["456"]
+
+    assert len(updated_docs) == 4
+    assert updated_docs[0][FIELD_LH_SOURCE_PLATE_UUID] == existing_plate[FIELD_LH_SOURCE_PLATE_UUID]
+    assert updated_docs[1][FIELD_LH_SOURCE_PLATE_UUID] == new_plates[0][FIELD_LH_SOURCE_PLATE_UUID]
+    assert updated_docs[2][FIELD_LH_SOURCE_PLATE_UUID] == new_plates[0][FIELD_LH_SOURCE_PLATE_UUID]
+    assert centre_file.logging_collection.get_count_of_all_errors_and_criticals() == 0
+
+
+def test_insert_docs_records_stage_timings(config):
+    centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some file")
+    file_details = centre_file.sample_file_details()
+    samples = [Sample.from_row({FIELD_ROOT_SAMPLE_ID: str(index)}, file_details) for index in range(3)]
+
+    def insert_into_mongo(docs):
+        # the last doc fails to insert
+        for index, doc in enumerate(docs):
+            doc[FIELD_MONGODB_ID] = index
+
+        return [0, 1]
+
+    with patch.object(centre_file, "docs_to_insert_updated_with_source_plate_uuids", side_effect=lambda docs: docs):
+        with patch.object(centre_file, "insert_samples_from_docs_into_mongo_db", side_effect=insert_into_mongo):
+            with patch.object(centre_file, "insert_samples_from_docs_into_mlwh", return_value=True):
+                with patch.object(centre_file, "insert_plates_and_wells_from_docs_into_dart"):
+                    with SampleWritePipeline(
+                        centre_file.write_docs_to_mlwh, centre_file.write_docs_to_dart, 1
+                    ) as sample_writer:
+                        assert centre_file.insert_docs(samples, sample_writer) == 3
+
+    stage_timings = centre_file.stage_timer.to_doc()
+    assert list(stage_timings) == [STAGE_SOURCE_PLATES, STAGE_MONGO_INSERT, STAGE_MLWH_INSERT, STAGE_DART_INSERT]
+    assert [stage_timing["rows"] for stage_timing in stage_timings.values()] == [3, 2, 2, 2]
+
+
+def test_insert_docs_records_the_chunk_in_the_file_journal(config, tmp_path):
+    centre_file = centre_file_with_mocked_filtered_positive_identifier(config, "some file")
+    centre_file.centre.file_journal = FileJournal(str(tmp_path))
+    file_details = centre_file.sample_file_details()
+    samples = [Sample.from_row({FIELD_ROOT_SAMPLE_ID: str(index)}, file_details) for index in range(3)]
+
+    def insert_into_mongo(docs):
+        # the last doc is a duplicate
+        for index, doc in enumerate(docs):
+            doc[FIELD_MONGODB_ID] = index
+        centre_file.add_mongo_insert_error("TYPE 6", "Already in database, line: 4")
+
+        return [0, 1]
+
+    with patch.object(centre_file, "checksum", return_value="abc123"):
+        with patch.object(centre_file, "docs_to_insert_updated_with_source_plate_uuids", side_effect=lambda docs: docs):
+            with patch.object(centre_file, "insert_samples_from_docs_into_mongo_db", side_effect=insert_into_mongo):
+                with patch.object(centre_file, "insert_samples_from_docs_into_mlwh", return_value=True):
+                    with patch.object(centre_file, "insert_plates_and_wells_from_docs_into_dart", return_value=True):
+                        with SampleWritePipeline(
+                            centre_file.write_docs_to_mlwh,
+                            centre_file.write_docs_to_dart,
+                            1,
+                            centre_file.record_chunk_written,
+                        ) as sample_writer:
+                            centre_file.insert_docs(samples, sample_writer, 4)
+
+    committed_stages = centre_file.centre.file_journal.committed_stages("abc123", config.FILE_PROCESSING_CHUNK_SIZE)
+    assert list(committed_stages) == [4]
+    assert set(committed_stages[4]) == {STAGE_MONGO_INSERT, STAGE_MLWH_INSERT, STAGE_DART_INSERT}
+    assert committed_stages[4][STAGE_MONGO_INSERT] == {
+        "docs_to_insert": 3,
+        "inserted_ids": [0, 1],
+        "errors": [["TYPE 6", "Already in database, line: 4"]],
+    }
+
+
+def test_insert_docs_resumes_a_chunk_inserted_into_mongo(config):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    inserted_docs = [{FIELD_MONGODB_ID: ObjectId(), FIELD_ROOT_SAMPLE_ID: str(index)} for index in range(2)]
+    centre_file.committed_stages = {
+        0: {
+            STAGE_MONGO_INSERT: {
+                "docs_to_insert": 3,
+                "inserted_ids": [doc[FIELD_MONGODB_ID] for doc in inserted_docs],
+                "errors": [["TYPE 6", "Already in database, line: 4"]],
+            },
+            STAGE_MLWH_INSERT: None,
+        }
+    }
+    sample_writer = MagicMock()
+    samples_collection = MagicMock()
+    samples_collection.find.return_value = list(reversed(inserted_docs))
+
+    with patch.object(centre_file, "get_db"):
+        with patch("crawler.file_processing.get_mongo_collection", return_value=samples_collection):
+            with patch.object(centre_file, "insert_samples_from_docs_into_mongo_db") as mock_mongo_insert:
+                assert centre_file.insert_docs([], sample_writer, 0) == 3
+
+    mock_mongo_insert.assert_not_called()
+    # the chunk was written to the MLWH but not DART, so it is written again
+    sample_writer.submit.assert_called_once_with(inserted_docs, 0)
+    assert centre_file.docs_inserted == 2
+    assert centre_file.logging_collection.aggregator_types["TYPE 6"].count_errors == 1
+
+
+def test_insert_docs_skips_a_chunk_written_to_all_the_databases(config):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    centre_file.committed_stages = {
+        0: {
+            STAGE_MONGO_INSERT: {"docs_to_insert": 1, "inserted_ids": [ObjectId()], "errors": []},
+            STAGE_MLWH_INSERT: None,
+            STAGE_DART_INSERT: None,
+        }
+    }
+    sample_writer = MagicMock()
+
+    assert centre_file.insert_docs([], sample_writer, 0) == 1
+
+    sample_writer.submit.assert_not_called()
+    assert centre_file.docs_inserted == 1
+
+
+def test_add_duplication_errors_looks_up_duplicates_in_bulk(config):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    date_tested = datetime(2020, 4, 16, 14, 30, 40)
+
+    def failed_write(root_sample_id, line_number):
+        return {
+            "code": 11000,
+            "op": {
+                FIELD_ROOT_SAMPLE_ID: root_sample_id,
+                FIELD_RNA_ID: f"RNA_{root_sample_id}",
+                FIELD_RESULT: "Positive",
+                FIELD_LAB_ID: "AP",
+                FIELD_DATE_TESTED: date_tested,
+                FIELD_LINE_NUMBER: line_number,
+            },
+        }
+
+    write_errors = [failed_write("1", 2), failed_write("2", 3), failed_write("3", 4)]
+    existing_samples = [
+        {**write_errors[0]["op"]},
+        {**write_errors[1]["op"], FIELD_DATE_TESTED: datetime(2020, 4, 17)},
+    ]
+
+    with patch("crawler.file_processing.get_mongo_collection") as mock_get_collection:
+        samples_collection = mock_get_collection.return_value
+        samples_collection.find.return_value = existing_samples
+
+        centre_file.add_duplication_errors(BulkWriteError({"writeErrors": write_errors}))
+
+        samples_collection.find.assert_called_once()
+        assert len(samples_collection.find.call_args.args[0]["$or"]) == 3
+
+    # the sample with the same date tested is TYPE 6, the one with a different date is TYPE 7 and the one which could
+    # not be found is only logged
+    assert centre_file.logging_collection.aggregator_types["TYPE 6"].count_errors == 1
+    assert centre_file.logging_collection.aggregator_types["TYPE 7"].count_errors == 1
+
+
+def test_insert_samples_from_docs_into_mongo_db_removes_duplicates_found_with_the_sample_filter(config, tmpdir):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    date_tested = datetime(2020, 4, 16, 14, 30, 40)
+
+    def doc(root_sample_id, line_number):
+        return {
+            FIELD_MONGODB_ID: ObjectId(),
+            FIELD_ROOT_SAMPLE_ID: root_sample_id,
+            FIELD_RNA_ID: f"RNA_{root_sample_id}",
+            FIELD_RESULT: "Positive",
+            FIELD_LAB_ID: "AP",
+            FIELD_DATE_TESTED: date_tested,
+            FIELD_LINE_NUMBER: line_number,
+        }
+
+    docs = [doc("1", 2), doc("2", 3), doc("3", 4)]
+    existing_samples = [{**docs[0]}, {**docs[1], FIELD_DATE_TESTED: datetime(2020, 4, 17)}]
+
+    with patch.object(config, "SAMPLES_FILTER_FILE", str(tmpdir.join("samples.bloom"))):
+        with patch("crawler.file_processing.get_mongo_collection") as mock_get_collection:
+            samples_collection = mock_get_collection.return_value
+            samples_collection.estimated_document_count.return_value = 2
+            # the filter is built from the samples in mongo, then the samples found in it are looked up
+            samples_collection.find.side_effect = [existing_samples, existing_samples]
+            samples_collection.insert_many.return_value.inserted_ids = [docs[2][FIELD_MONGODB_ID]]
+
+            inserted_ids = centre_file.insert_samples_from_docs_into_mongo_db(docs)
+
+            # only the new sample is inserted
+            samples_collection.insert_many.assert_called_once_with([docs[2]], ordered=False)
+            assert len(samples_collection.find.call_args.args[0]["$or"]) == 2
+
+    assert inserted_ids == [docs[2][FIELD_MONGODB_ID]]
+    assert centre_file.docs_inserted == 1
+    assert centre_file.logging_collection.aggregator_types["TYPE 6"].count_errors == 1
+    assert centre_file.logging_collection.aggregator_types["TYPE 7"].count_errors == 1
+
+
+def test_insert_samples_from_docs_into_mongo_db_adds_only_the_inserted_samples_to_the_sample_filter(config, tmpdir):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    docs = [{FIELD_MONGODB_ID: ObjectId(), FIELD_ROOT_SAMPLE_ID: root_sample_id} for root_sample_id in ("1", "2")]
+    write_errors = [{"code": 11000, "op": docs[1]}]
+
+    with patch.object(config, "SAMPLES_FILTER_FILE", str(tmpdir.join("samples.bloom"))):
+        with patch("crawler.file_processing.get_mongo_collection") as mock_get_collection:
+            samples_collection = mock_get_collection.return_value
+            samples_collection.estimated_document_count.return_value = 0
+            samples_collection.find.return_value = []
+            samples_collection.insert_many.side_effect = BulkWriteError({"writeErrors": write_errors, "nInserted": 1})
+
+            with patch("crawler.sample_filter.SampleFilter.add") as mock_add:
+                assert centre_file.insert_samples_from_docs_into_mongo_db(docs) == [docs[0][FIELD_MONGODB_ID]]
+
+            mock_add.assert_called_once_with(samples_collection, [docs[0]])
+
+
+def test_insert_samples_from_docs_into_mongo_db_inserts_when_the_sample_filter_fails(config, tmpdir):
+    centre_file = CentreFile("some file", Centre(config, config.CENTRES[0]))
+    docs = [{FIELD_MONGODB_ID: ObjectId(), FIELD_ROOT_SAMPLE_ID: "1"}]
+
+    with patch.object(config, "SAMPLES_FILTER_FILE", str(tmpdir.join("samples.bloom"))):
+        with patch("crawler.file_processing.get_mongo_collection") as mock_get_collection:
+            samples_collection = mock_get_collection.return_value
+            samples_collection.estimated_document_count.side_effect = Exception("mongo is down")
+            samples_collection.insert_many.return_value.inserted_ids = [docs[0][FIELD_MONGODB_ID]]
+
+            assert centre_file.insert_samples_from_docs_into_mongo_db(docs) == [docs[0][FIELD_MONGODB_ID]]
+
+            samples_collection.insert_many.assert_called_once_with(docs, ordered=False)
@@ -0,0 +1,113 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from crawler.file_watcher import FileArrivalWatcher, list_local_files, list_sftp_files
+from crawler.types import RemoteFile
+
+CENTRE_CONFIG = {"name": "Alderley", "prefix": "ALDP", "sftp_file_regex": r"^AP_sanger_report_.*\.csv$"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def watched(config, tmpdir):
+    with patch.object(config, "DIR_DOWNLOADED_DATA", f"{tmpdir}/"):
+        with patch.object(config, "CENTRES", [CENTRE_CONFIG]):
+            with patch.object(config, "FILE_WATCH_DEBOUNCE_SECONDS", 30):
+                download_dir = tmpdir.mkdir("ALDP")
+                clock = FakeClock()
+
+                yield FileArrivalWatcher(config, False, clock), download_dir, clock
+
+
+def test_poll_waits_for_new_files_to_settle(watched):
+    watcher, download_dir, clock = watched
+    download_dir.join("AP_sanger_report_200503_2338.csv").write("old")
+
+    # the files present when watching starts are left to the full sweep
+    assert watcher.poll() == set()
+
+    new_file = download_dir.join("AP_sanger_report_200504_0900.csv")
+    new_file.write("Root Sample ID")
+    assert watcher.poll() == set()
+
+    # the file is still being written
+    clock.now = 20.0
+    new_file.write("Root Sample ID,Result")
+    assert watcher.poll() == set()
+
+    clock.now = 40.0
+    assert watcher.poll() == set()
+
+    clock.now = 50.0
+    assert watcher.poll() == {"Alderley"}
+
+
+def test_mark_processed(watched):
+    watcher, download_dir, clock = watched
+    watcher.poll()
+
+    download_dir.join("AP_sanger_report_200504_0900.csv").write("Root Sample ID")
+    watcher.poll()
+    clock.now = 30.0
+    assert watcher.poll() == {"Alderley"}
+
+    watcher.mark_processed({"Alderley"})
+
+    clock.now = 60.0
+    assert watcher.poll() == set()
+
+
+def test_poll_ignores_files_not_matching_the_centre_regex(watched):
+    watcher, download_dir, clock = watched
+    watcher.poll()
+
+    download_dir.join("AP_sanger_report_200504_0900.csv.part").write("partial download")
+    watcher.poll()
+    clock.now = 60.0
+
+    assert watcher.poll() == set()
+
+
+def test_list_local_files(tmpdir):
+    tmpdir.join("AP_sanger_report_200504_0900.csv").write("Root Sample ID")
+    tmpdir.join("other.csv").write("Root Sample ID")
+    mtime = int(os.stat(tmpdir.join("AP_sanger_report_200504_0900.csv")).st_mtime)
+
+    assert list_local_files(str(tmpdir), CENTRE_CONFIG) == {
+        "AP_sanger_report_200504_0900.csv": RemoteFile("AP_sanger_report_200504_0900.csv", 14, mtime)
+    }
+    assert list_local_files(str(tmpdir.join("missing")), CENTRE_CONFIG) is None
+
+
+def test_list_sftp_files(config):
+    centre_configs = [{**CENTRE_CONFIG, "sftp_root_read": "project-heron_alderly-park"}]
+
+    with patch("crawler.file_watcher.get_sftp_connection") as mock_sftp:
+        sftp = mock_sftp.return_value.__enter__.return_value
+        sftp.listdir_attr.return_value = [
+            MagicMock(filename="AP_sanger_report_200504_0900.csv", st_size=100, st_mtime=1588582800),
+            MagicMock(filename="other.csv", st_size=100, st_mtime=1588582800),
+        ]
+
+        listings = list_sftp_files(config, centre_configs)
+
+    sftp.listdir_attr.assert_called_once_with("project-heron_alderly-park")
+    assert listings == {
+        "Alderley": {
+            "AP_sanger_report_200504_0900.csv": RemoteFile("AP_sanger_report_200504_0900.csv", 100, 1588582800)
+        }
+    }
+
+
+def test_list_sftp_files_when_the_server_is_down(config):
+    with patch("crawler.file_watcher.get_sftp_connection", side_effect=ConnectionError("Boom!")):
+        assert list_sftp_files(config, [CENTRE_CONFIG]) == {}
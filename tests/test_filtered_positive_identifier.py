@@ -1,5 +1,8 @@
+import random
+from decimal import Decimal, localcontext
+
 import pytest
-from bson.decimal128 import Decimal128
+from bson.decimal128 import Decimal128, create_decimal128_context
 from crawler.constants import (
     FIELD_CH1_CQ,
     FIELD_CH2_CQ,
@@ -18,6 +21,7 @@ from crawler.filtered_positive_identifier import (
     FilteredPositiveIdentifierV0,
     FilteredPositiveIdentifierV1,
     FilteredPositiveIdentifierV2,
+    decimal128_values_within_limit,
 )
 
 # ----- test helpers -----
@@ -300,3 +304,73 @@ def test_v2_is_positive_returns_false_all_ct_values_greater_than_30():
     sample[FIELD_CH2_CQ] = Decimal128("41.12345678")
     sample[FIELD_CH3_CQ] = Decimal128("42.12345678")
     assert identifier.is_positive(sample) is False
+
+
+# ----- tests for is_positive_batch() -----
+
+RESULT_VALUES = ["Positive", "positive", "POSITIVE", "Positive (confirmed)", "Negative", "Void", "limit of detection"]
+ROOT_SAMPLE_ID_VALUES = ["MCM001", "CBIQA_MCM001", "QC0_MCM001", "ZZA000_MCM001", "qc0_MCM001", "MCM_CBIQA_"]
+CQ_VALUES = [
+    None,
+    "",
+    Decimal128("0"),
+    Decimal128("-1"),
+    Decimal128("29.99999999"),
+    Decimal128("30"),
+    Decimal128("30.00000000"),
+    Decimal128("30.00000000000000000000000000000001"),
+    Decimal128("40.12345678"),
+    Decimal128("NaN"),
+    Decimal128("Infinity"),
+]
+
+
+def random_sample(rng):
+    sample = {
+        FIELD_RESULT: rng.choice(RESULT_VALUES + [None]),
+        FIELD_ROOT_SAMPLE_ID: rng.choice(ROOT_SAMPLE_ID_VALUES),
+    }
+    for field in (FIELD_CH1_CQ, FIELD_CH2_CQ, FIELD_CH3_CQ):
+        # a Cq field is either missing, or one of the values above, or a random value around the limit
+        if (choice := rng.random()) < 0.3:
+            continue
+        elif choice < 0.6:
+            sample[field] = rng.choice(CQ_VALUES)
+        else:
+            sample[field] = Decimal128(f"{rng.uniform(20, 40):.8f}")
+
+    return sample
+
+
+@pytest.mark.parametrize(
+    "identifier", [FilteredPositiveIdentifierV0(), FilteredPositiveIdentifierV1(), FilteredPositiveIdentifierV2()]
+)
+@pytest.mark.parametrize("seed", range(5))
+def test_is_positive_batch_matches_is_positive(identifier, seed):
+    rng = random.Random(seed)
+    samples = [random_sample(rng) for _ in range(2000)]
+
+    assert identifier.is_positive_batch(samples) == [identifier.is_positive(sample) for sample in samples]
+
+
+def test_is_positive_batch_without_samples():
+    assert FilteredPositiveIdentifierV2().is_positive_batch([]) == []
+
+
+def test_is_positive_batch_does_not_check_the_cq_values_of_negative_samples():
+    identifier = FilteredPositiveIdentifierV2()
+    negative_sample = {**positive_sample(), FIELD_RESULT: "Negative", FIELD_CH1_CQ: "not a Cq value"}
+
+    # is_positive stops at the result, so the invalid Cq value is not converted
+    assert identifier.is_positive_batch([negative_sample, positive_sample()]) == [False, True]
+
+
+def test_decimal128_values_within_limit():
+    values = [Decimal128(value) for value in ["30", "30.00000000", "30.000000001", "29.99999999", "3E+1", "4E+1"]]
+    values += [Decimal128(value) for value in ["-40", "0", "NaN", "-Infinity", "123456789012345678901234567890"]]
+
+    # compared in the context used by the identifiers, in which comparing NaN is not an error
+    with localcontext(create_decimal128_context()):
+        assert decimal128_values_within_limit(values, Decimal(30)).tolist() == [
+            value.to_decimal() <= Decimal(30) for value in values
+        ]
@@ -1,10 +1,14 @@
 import os
 import shutil
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from crawler.constants import COLLECTION_CENTRES, COLLECTION_IMPORTS, COLLECTION_SAMPLES, COLLECTION_SOURCE_PLATES
 from crawler.db.mongo import get_mongo_collection
-from crawler.main import run
+from crawler.file_processing import Centre
+from crawler.helpers.general_helpers import get_config
+from crawler.main import CrawlerDaemon, process_centre, process_centres, run, watch_cycle
 
 NUMBER_CENTRES = 6
 NUMBER_VALID_SAMPLES = 19
@@ -246,3 +250,159 @@ def test_run_creates_right_files_backups(mongo_database, testing_files_for_proce
     # check the code cleaned up the temporary files
     (_, subfolders, files) = next(os.walk("tmp/files/"))
     assert 0 == len(subfolders)
+
+
+def test_run_with_concurrent_centres(mongo_database, testing_files_for_process, pyodbc_conn):
+    _, mongo_database = mongo_database
+    integration_config, _ = get_config("crawler.config.integration")
+
+    with patch.object(integration_config, "CENTRES_PROCESSING_WORKERS", 4):
+        with patch("crawler.file_processing.CentreFile.insert_samples_from_docs_into_mlwh"):
+            run(False, False, False, "crawler.config.integration")
+
+    samples_collection = get_mongo_collection(mongo_database, COLLECTION_SAMPLES)
+    imports_collection = get_mongo_collection(mongo_database, COLLECTION_IMPORTS)
+
+    # the same samples and imports are recorded as when the centres are processed one after the other
+    assert samples_collection.count_documents({}) == NUMBER_VALID_SAMPLES
+    assert imports_collection.count_documents({}) == NUMBER_OF_FILES_PROCESSED
+
+    # check the code cleaned up the temporary files
+    (_, subfolders, files) = next(os.walk("tmp/files/"))
+    assert 0 == len(subfolders)
+
+
+def test_process_centres_one_at_a_time(config):
+    with patch("crawler.main.process_centre") as mock_process_centre:
+        process_centres(config, "crawler.config.test", False, False, False)
+
+        assert mock_process_centre.call_count == len(config.CENTRES)
+
+
+def test_process_centres_only_the_centres_named(config):
+    centre_names = {config.CENTRES[0]["name"], config.CENTRES[2]["name"]}
+
+    with patch("crawler.main.process_centre") as mock_process_centre:
+        process_centres(config, "crawler.config.test", False, False, False, centre_names=centre_names)
+
+        processed = {call.args[0].centre_config["name"] for call in mock_process_centre.call_args_list}
+        assert processed == centre_names
+
+
+def test_process_centres_with_thread_pool(config):
+    with patch.object(config, "CENTRES_PROCESSING_WORKERS", 3):
+        with patch("crawler.main.process_centre") as mock_process_centre:
+            process_centres(config, "crawler.config.test", True, False, True)
+
+            assert mock_process_centre.call_count == len(config.CENTRES)
+            processed = [call.args[0].centre_config["name"] for call in mock_process_centre.call_args_list]
+            assert sorted(processed) == sorted(centre_config["name"] for centre_config in config.CENTRES)
+
+
+def test_process_centres_share_mongo_client(config):
+    mongo_client = MagicMock()
+
+    with patch.object(config, "CENTRES_PROCESSING_WORKERS", 3):
+        with patch("crawler.main.process_centre") as mock_process_centre:
+            process_centres(config, "crawler.config.test", False, False, False, mongo_client)
+
+            assert all(call.args[0].get_mongo_client() is mongo_client for call in mock_process_centre.call_args_list)
+
+
+def test_process_centres_with_unknown_pool(config):
+    with patch.object(config, "CENTRES_PROCESSING_WORKERS", 3):
+        with patch.object(config, "CENTRES_PROCESSING_POOL", "fibres"):
+            with pytest.raises(ValueError):
+                process_centres(config, "crawler.config.test", False, False, False)
+
+
+def test_process_centre_cleans_up_when_processing_fails(config):
+    centre = Centre(config, config.CENTRES[0])
+    centre.is_download_dir_walkable = True
+
+    with patch.object(centre, "process_files", side_effect=Exception("Boom!")):
+        with patch.object(centre, "clean_up") as mock_clean_up:
+            # the exception is logged, not raised, so the other centres are still processed
+            process_centre(centre, False, False, False)
+
+            mock_clean_up.assert_called_once()
+
+
+def test_process_centre_keeps_files(config):
+    centre = Centre(config, config.CENTRES[0])
+    centre.is_download_dir_walkable = True
+
+    with patch.object(centre, "process_files"):
+        with patch.object(centre, "clean_up") as mock_clean_up:
+            process_centre(centre, False, True, False)
+
+            mock_clean_up.assert_not_called()
+
+
+def test_watch_cycle_runs_a_full_sweep_when_due():
+    watcher = MagicMock()
+    daemon = MagicMock()
+    daemon.config.FILE_WATCH_FULL_SWEEP_MINUTES = 15
+
+    with patch("crawler.main.time.monotonic", return_value=1000.0):
+        next_full_sweep = watch_cycle(watcher, daemon, 1000.0)
+
+    daemon.run_cycle.assert_called_once_with()
+    watcher.mark_processed.assert_called_once_with()
+    assert next_full_sweep == 1900.0
+
+
+def test_watch_cycle_processes_the_centres_with_new_files():
+    watcher = MagicMock()
+    watcher.poll.return_value = {"Alderley"}
+    daemon = MagicMock()
+
+    with patch("crawler.main.time.monotonic", return_value=1000.0):
+        next_full_sweep = watch_cycle(watcher, daemon, 1900.0)
+
+    daemon.run_cycle.assert_called_once_with({"Alderley"})
+    watcher.mark_processed.assert_called_once_with({"Alderley"})
+    assert next_full_sweep == 1900.0
+
+
+def test_watch_cycle_does_nothing_without_new_files():
+    watcher = MagicMock()
+    watcher.poll.return_value = set()
+    daemon = MagicMock()
+
+    with patch("crawler.main.time.monotonic", return_value=1000.0):
+        watch_cycle(watcher, daemon, 1900.0)
+
+    daemon.run_cycle.assert_not_called()
+    watcher.mark_processed.assert_not_called()
+
+
+@pytest.fixture
+def crawler_daemon():
+    with patch("crawler.main.create_mongo_client"):
+        daemon = CrawlerDaemon(False, False, False, "crawler.config.test")
+        yield daemon
+        daemon.close()
+
+
+def test_daemon_bootstraps_mongo_once(crawler_daemon):
+    with patch("crawler.main.bootstrap_mongo") as mock_bootstrap:
+        with patch("crawler.main.process_centre") as mock_process_centre:
+            crawler_daemon.run_cycle()
+            crawler_daemon.run_cycle()
+
+    mock_bootstrap.assert_called_once()
+    assert crawler_daemon.cycles == 2
+
+    # the centres are created once and reused by the next cycle
+    number_centres = len(crawler_daemon.config.CENTRES)
+    centres = [call.args[0] for call in mock_process_centre.call_args_list]
+    assert len(centres) == 2 * number_centres
+    assert centres[:number_centres] == centres[number_centres:]
+
+
+def test_daemon_cycle_logs_exceptions(crawler_daemon):
+    with patch("crawler.main.bootstrap_mongo", side_effect=Exception("Boom!")):
+        crawler_daemon.run_cycle()
+
+    assert crawler_daemon.cycles == 0
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+from bson.decimal128 import Decimal128
+
+from crawler.constants import (
+    FIELD_CH1_CQ,
+    FIELD_CH1_TARGET,
+    FIELD_COORDINATE,
+    FIELD_CREATED_AT,
+    FIELD_DATE_TESTED,
+    FIELD_FILE_NAME,
+    FIELD_FILE_NAME_DATE,
+    FIELD_FILTERED_POSITIVE,
+    FIELD_FILTERED_POSITIVE_TIMESTAMP,
+    FIELD_FILTERED_POSITIVE_VERSION,
+    FIELD_LAB_ID,
+    FIELD_LH_SAMPLE_UUID,
+    FIELD_LINE_NUMBER,
+    FIELD_PLATE_BARCODE,
+    FIELD_RESULT,
+    FIELD_RNA_ID,
+    FIELD_ROOT_SAMPLE_ID,
+    FIELD_SOURCE,
+    FIELD_UPDATED_AT,
+)
+from crawler.sample import Sample
+from crawler.types import SampleFileDetails
+
+FILE_DETAILS = SampleFileDetails(
+    source="Alderley",
+    file_name="AP_sanger_report_200503_2338.csv",
+    file_name_date=datetime(2020, 5, 3, 23, 38),
+    parsed_at=datetime(2020, 5, 4, 9, 0),
+    filtered_positive_version="v2.3",
+)
+
+ROW = {
+    FIELD_ROOT_SAMPLE_ID: "1",
+    FIELD_RNA_ID: "RNA_0043_H09",
+    FIELD_RESULT: "Positive",
+    FIELD_DATE_TESTED: None,
+    FIELD_LAB_ID: "AP",
+    FIELD_CH1_TARGET: "ORF1ab",
+    FIELD_CH1_CQ: Decimal128("21.28726211"),
+}
+
+
+def test_from_row():
+    sample = Sample.from_row(ROW, FILE_DETAILS)
+
+    assert sample.root_sample_id == "1"
+    assert sample.rna_id == "RNA_0043_H09"
+    assert sample.date_tested is None
+    assert sample.ch1_cq == Decimal128("21.28726211")
+    assert sample.file_details is FILE_DETAILS
+
+    # the fields which are not in the row are not set
+    with pytest.raises(AttributeError):
+        sample.ch2_cq
+
+
+def test_to_mongo_doc():
+    sample = Sample.from_row(ROW, FILE_DETAILS)
+    sample.plate_barcode = "RNA_0043"
+    sample.coordinate = "H09"
+    sample.line_number = 2
+    sample.filtered_positive = True
+    sample.lh_sample_uuid = "0a53e7b6-7ce8-4ebc-95c3-02dd64942531"
+
+    assert sample.to_mongo_doc() == {
+        **ROW,
+        FIELD_PLATE_BARCODE: "RNA_0043",
+        FIELD_COORDINATE: "H09",
+        FIELD_LINE_NUMBER: 2,
+        FIELD_FILTERED_POSITIVE: True,
+        FIELD_LH_SAMPLE_UUID: "0a53e7b6-7ce8-4ebc-95c3-02dd64942531",
+        FIELD_SOURCE: "Alderley",
+        FIELD_FILE_NAME: "AP_sanger_report_200503_2338.csv",
+        FIELD_FILE_NAME_DATE: datetime(2020, 5, 3, 23, 38),
+        FIELD_CREATED_AT: datetime(2020, 5, 4, 9, 0),
+        FIELD_UPDATED_AT: datetime(2020, 5, 4, 9, 0),
+        FIELD_FILTERED_POSITIVE_VERSION: "v2.3",
+        FIELD_FILTERED_POSITIVE_TIMESTAMP: datetime(2020, 5, 4, 9, 0),
+    }
+
+
+def test_samples_share_file_details():
+    samples = [Sample.from_row({**ROW, FIELD_ROOT_SAMPLE_ID: str(index)}, FILE_DETAILS) for index in range(3)]
+
+    assert [sample.to_mongo_doc()[FIELD_ROOT_SAMPLE_ID] for sample in samples] == ["0", "1", "2"]
+    assert all(sample.file_details is FILE_DETAILS for sample in samples)
+
+
+def test_sample_has_no_instance_dict():
+    sample = Sample.from_row(ROW, FILE_DETAILS)
+
+    assert not hasattr(sample, "__dict__")
+    with pytest.raises(AttributeError):
+        sample.unknown_field = "value"  # type: ignore
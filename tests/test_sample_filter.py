@@ -0,0 +1,238 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from crawler.constants import FIELD_LAB_ID, FIELD_RESULT, FIELD_RNA_ID, FIELD_ROOT_SAMPLE_ID
+from crawler.sample_filter import (
+    BloomFilter,
+    SampleFilter,
+    close_sample_filter,
+    get_sample_filter,
+    sample_signature,
+    save_sample_filter,
+)
+
+
+def make_sample(root_sample_id, result="Positive"):
+    return {
+        FIELD_ROOT_SAMPLE_ID: root_sample_id,
+        FIELD_RNA_ID: f"RNA_{root_sample_id}",
+        FIELD_RESULT: result,
+        FIELD_LAB_ID: "AP",
+    }
+
+
+@pytest.fixture
+def filter_config(config, tmpdir):
+    with patch.object(config, "SAMPLES_FILTER_FILE", str(tmpdir.join("filters", "samples.bloom"))):
+        with patch.object(config, "SAMPLES_FILTER_CAPACITY", 1000):
+            with patch.object(config, "SAMPLES_FILTER_ERROR_RATE", 0.001):
+                yield config
+
+
+@pytest.fixture
+def samples_collection():
+    samples_collection = MagicMock()
+    samples_collection.estimated_document_count.return_value = 0
+    samples_collection.find.return_value = []
+
+    return samples_collection
+
+
+def test_bloom_filter_is_sized_for_the_error_rate():
+    bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+
+    # about 9.6 bits and 7 hashes a key for a 1% error rate
+    assert bloom_filter.num_bits == 9586
+    assert bloom_filter.num_hashes == 7
+
+
+def test_bloom_filter_finds_the_keys_added():
+    bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+    keys = [f"key {i}" for i in range(1000)]
+
+    bloom_filter.add(keys)
+
+    assert bloom_filter.contains(keys).all()
+    assert bloom_filter.count == 1000
+
+
+def test_bloom_filter_finds_few_keys_not_added():
+    bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+    bloom_filter.add([f"key {i}" for i in range(1000)])
+
+    false_positives = bloom_filter.contains([f"other key {i}" for i in range(10000)]).sum()
+
+    assert false_positives < 200
+
+
+def test_bloom_filter_handles_no_keys():
+    bloom_filter = BloomFilter.for_capacity(10, 0.01)
+
+    bloom_filter.add([])
+
+    assert len(bloom_filter.contains([])) == 0
+    assert bloom_filter.count == 0
+
+
+def test_bloom_filter_round_trips_through_bytes():
+    bloom_filter = BloomFilter.for_capacity(100, 0.01)
+    bloom_filter.add(["a", "b"])
+
+    loaded = BloomFilter.from_bytes(bloom_filter.to_bytes())
+
+    assert (loaded.num_bits, loaded.num_hashes, loaded.capacity, loaded.count) == (
+        bloom_filter.num_bits,
+        bloom_filter.num_hashes,
+        100,
+        2,
+    )
+    assert loaded.contains(["a", "b"]).all()
+
+
+@pytest.mark.parametrize("data", [b"", b"not a filter at all, just some bytes", b"CRAWLBF1" + bytes(32) + b"x"])
+def test_bloom_filter_from_bytes_raises_for_invalid_data(data):
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(data)
+
+
+def test_bloom_filter_merge():
+    bloom_filter = BloomFilter.for_capacity(100, 0.01)
+    bloom_filter.add(["a"])
+    other = BloomFilter.for_capacity(100, 0.01)
+    other.add(["b"])
+
+    assert bloom_filter.merge(other) is True
+    assert bloom_filter.contains(["a", "b"]).all()
+
+
+def test_bloom_filter_estimated_count():
+    bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+    assert bloom_filter.estimated_count() == 0
+
+    bloom_filter.add([f"key {i}" for i in range(500)])
+
+    assert 475 <= bloom_filter.estimated_count() <= 525
+
+
+def test_bloom_filter_merge_counts_the_keys_of_both_filters(filter_config, samples_collection):
+    bloom_filter = BloomFilter.for_capacity(1000, 0.001)
+    bloom_filter.add([f"key {i}" for i in range(600)])
+    other = BloomFilter.for_capacity(1000, 0.001)
+    other.add([f"other key {i}" for i in range(600)])
+
+    assert bloom_filter.merge(other) is True
+    assert 1140 <= bloom_filter.count <= 1260
+
+    # the merged filter is over capacity, so it is rebuilt rather than used
+    os.makedirs(os.path.dirname(filter_config.SAMPLES_FILTER_FILE))
+    with open(filter_config.SAMPLES_FILTER_FILE, "wb") as filter_file:
+        filter_file.write(bloom_filter.to_bytes())
+
+    SampleFilter(filter_config).load(samples_collection)
+    samples_collection.find.assert_called_once()
+
+
+def test_bloom_filter_merge_ignores_filters_of_another_size():
+    bloom_filter = BloomFilter.for_capacity(100, 0.01)
+    other = BloomFilter.for_capacity(200, 0.01)
+    other.add(["b"])
+
+    assert bloom_filter.merge(other) is False
+    assert not bloom_filter.contains(["b"]).any()
+
+
+def test_sample_signature():
+    assert sample_signature(make_sample("1")) == "1\x1fRNA_1\x1fPositive\x1fAP"
+    assert sample_signature({FIELD_ROOT_SAMPLE_ID: "1"}) == "1\x1fNone\x1fNone\x1fNone"
+
+
+def test_sample_filter_is_built_from_mongo_when_missing(filter_config, samples_collection):
+    samples_collection.estimated_document_count.return_value = 600
+    samples_collection.find.return_value = [make_sample("1"), make_sample("2")]
+    sample_filter = SampleFilter(filter_config)
+
+    assert sample_filter.might_contain(samples_collection, [make_sample("1"), make_sample("2")]) == [True, True]
+    assert sample_filter.might_contain(samples_collection, [make_sample("1", "Negative")]) == [False]
+
+    # built once, for twice the samples in mongo
+    samples_collection.find.assert_called_once()
+    assert sample_filter.load(samples_collection).capacity == 1200
+
+
+def test_sample_filter_add_and_save(filter_config, samples_collection):
+    sample_filter = SampleFilter(filter_config)
+    sample_filter.add(samples_collection, [make_sample("1")])
+    sample_filter.save()
+
+    assert os.path.exists(filter_config.SAMPLES_FILTER_FILE)
+
+    samples_collection.reset_mock()
+    loaded = SampleFilter(filter_config)
+
+    assert loaded.might_contain(samples_collection, [make_sample("1"), make_sample("2")]) == [True, False]
+    samples_collection.find.assert_not_called()
+
+
+def test_sample_filter_save_merges_the_filter_saved_by_another_process(filter_config, samples_collection):
+    sample_filter = SampleFilter(filter_config)
+    other_sample_filter = SampleFilter(filter_config)
+
+    sample_filter.add(samples_collection, [make_sample("1")])
+    other_sample_filter.add(samples_collection, [make_sample("2")])
+    other_sample_filter.save()
+    sample_filter.save()
+
+    loaded = SampleFilter(filter_config)
+
+    assert loaded.might_contain(samples_collection, [make_sample("1"), make_sample("2")]) == [True, True]
+
+
+def test_sample_filter_is_rebuilt_when_the_file_is_invalid(filter_config, samples_collection):
+    os.makedirs(os.path.dirname(filter_config.SAMPLES_FILTER_FILE))
+    with open(filter_config.SAMPLES_FILTER_FILE, "wb") as filter_file:
+        filter_file.write(b"rubbish")
+    samples_collection.find.return_value = [make_sample("1")]
+
+    assert SampleFilter(filter_config).might_contain(samples_collection, [make_sample("1")]) == [True]
+    samples_collection.find.assert_called_once()
+
+
+def test_sample_filter_is_rebuilt_when_over_capacity(filter_config, samples_collection):
+    bloom_filter = BloomFilter.for_capacity(1, 0.001)
+    bloom_filter.add(["a", "b"])
+    os.makedirs(os.path.dirname(filter_config.SAMPLES_FILTER_FILE))
+    with open(filter_config.SAMPLES_FILTER_FILE, "wb") as filter_file:
+        filter_file.write(bloom_filter.to_bytes())
+
+    assert SampleFilter(filter_config).load(samples_collection).capacity == 1000
+    samples_collection.find.assert_called_once()
+
+
+def test_sample_filter_is_not_saved_when_nothing_was_added(filter_config, samples_collection):
+    sample_filter = SampleFilter(filter_config)
+    sample_filter.save()
+    sample_filter.load(samples_collection)
+    sample_filter.save()
+
+    assert not os.path.exists(filter_config.SAMPLES_FILTER_FILE)
+
+
+def test_get_sample_filter_is_none_when_disabled(config):
+    with patch.object(config, "SAMPLES_FILTER_FILE", ""):
+        assert get_sample_filter(config) is None
+
+
+def test_get_sample_filter_is_shared_by_the_process(filter_config, samples_collection):
+    sample_filter = get_sample_filter(filter_config)
+
+    assert sample_filter is not None
+    assert get_sample_filter(filter_config) is sample_filter
+
+    sample_filter.add(samples_collection, [make_sample("1")])
+    save_sample_filter()
+    close_sample_filter()
+
+    assert get_sample_filter(filter_config) is not sample_filter
+    assert os.path.exists(filter_config.SAMPLES_FILTER_FILE)
@@ -0,0 +1,147 @@
+import threading
+from typing import Collection, List, Set, Tuple
+
+import pytest
+
+from crawler.sample_writer import SampleWritePipeline
+from crawler.stage_timer import STAGE_DART_INSERT, STAGE_MLWH_INSERT
+from crawler.types import SampleDoc
+
+
+class RecordingWriter:
+    """Records the batches written to a database, and the threads they were written from."""
+
+    def __init__(self, result: bool = True, failing_batches: Collection[List[SampleDoc]] = ()):
+        self.batches: List[List[SampleDoc]] = []
+        self.threads: Set[str] = set()
+        self.result = result
+        self.failing_batches = failing_batches
+
+    def __call__(self, docs: List[SampleDoc]) -> bool:
+        self.threads.add(threading.current_thread().name)
+        self.batches.append(docs)
+        if docs in self.failing_batches:
+            raise ConnectionError("Boom!")
+
+        return self.result
+
+
+BATCHES: List[List[SampleDoc]] = [[{"_id": index * 2}, {"_id": index * 2 + 1}] for index in range(5)]
+
+
+@pytest.mark.parametrize("queue_size", [0, 1, 3])
+def test_writes_batches_to_mlwh_then_dart_in_order(queue_size):
+    write_mlwh = RecordingWriter()
+    write_dart = RecordingWriter()
+
+    with SampleWritePipeline(write_mlwh, write_dart, queue_size) as sample_writer:
+        for batch in BATCHES:
+            sample_writer.submit(batch)
+
+    assert write_mlwh.batches == BATCHES
+    assert write_dart.batches == BATCHES
+
+
+def test_writes_in_background_threads():
+    write_mlwh = RecordingWriter()
+    write_dart = RecordingWriter()
+
+    with SampleWritePipeline(write_mlwh, write_dart, 2) as sample_writer:
+        sample_writer.submit(BATCHES[0])
+
+    assert write_mlwh.threads == {"mlwh-writer"}
+    assert write_dart.threads == {"dart-writer"}
+
+
+def test_does_not_write_to_dart_when_mlwh_fails():
+    write_mlwh = RecordingWriter(failing_batches=[BATCHES[1]])
+    write_dart = RecordingWriter()
+
+    with SampleWritePipeline(write_mlwh, write_dart, 2) as sample_writer:
+        for batch in BATCHES[:3]:
+            sample_writer.submit(batch)
+
+    assert write_mlwh.batches == BATCHES[:3]
+    assert write_dart.batches == [BATCHES[0], BATCHES[2]]
+
+
+def test_does_not_write_to_dart_when_mlwh_insert_is_unsuccessful():
+    write_dart = RecordingWriter()
+
+    with SampleWritePipeline(RecordingWriter(result=False), write_dart, 2) as sample_writer:
+        sample_writer.submit(BATCHES[0])
+
+    assert write_dart.batches == []
+
+
+def test_without_dart():
+    write_mlwh = RecordingWriter()
+
+    with SampleWritePipeline(write_mlwh, None, 1) as sample_writer:
+        for batch in BATCHES:
+            sample_writer.submit(batch)
+
+    assert write_mlwh.batches == BATCHES
+
+
+def test_submit_overlaps_with_writes_and_blocks_when_queue_is_full():
+    mlwh_started = threading.Event()
+    mlwh_release = threading.Event()
+    write_dart = RecordingWriter()
+
+    def write_mlwh(docs: List[SampleDoc]) -> bool:
+        mlwh_started.set()
+        mlwh_release.wait(timeout=10)
+        return True
+
+    with SampleWritePipeline(write_mlwh, write_dart, 1) as sample_writer:
+        # the first batch is taken by the MLWH worker and the second waits in the queue, without blocking the caller
+        sample_writer.submit(BATCHES[0])
+        assert mlwh_started.wait(timeout=10)
+        sample_writer.submit(BATCHES[1])
+
+        # the queue is full, so the third batch is only accepted once the MLWH writes catch up
+        third_submitted = threading.Event()
+
+        def submit_third():
+            sample_writer.submit(BATCHES[2])
+            third_submitted.set()
+
+        submitter = threading.Thread(target=submit_third)
+        submitter.start()
+        assert not third_submitted.wait(timeout=0.2)
+
+        mlwh_release.set()
+        assert third_submitted.wait(timeout=10)
+        submitter.join()
+
+    assert write_dart.batches == BATCHES[:3]
+
+
+@pytest.mark.parametrize("queue_size", [0, 2])
+def test_records_the_writes_of_chunks(queue_size):
+    recorded: List[Tuple[int, str]] = []
+
+    with SampleWritePipeline(
+        RecordingWriter(failing_batches=[BATCHES[2]]),
+        RecordingWriter(),
+        queue_size,
+        lambda chunk, stage: recorded.append((chunk, stage)),
+    ) as sample_writer:
+        sample_writer.submit(BATCHES[0], 0)
+        # a batch without a chunk is not recorded
+        sample_writer.submit(BATCHES[1])
+        sample_writer.submit(BATCHES[2], 2)
+
+    assert sorted(recorded) == [(0, STAGE_DART_INSERT), (0, STAGE_MLWH_INSERT)]
+
+
+def test_does_not_record_a_failed_dart_write():
+    recorded: List[Tuple[int, str]] = []
+
+    with SampleWritePipeline(
+        RecordingWriter(), RecordingWriter(result=False), 0, lambda chunk, stage: recorded.append((chunk, stage))
+    ) as sample_writer:
+        sample_writer.submit(BATCHES[0], 0)
+
+    assert recorded == [(0, STAGE_MLWH_INSERT)]
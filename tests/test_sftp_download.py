@@ -0,0 +1,131 @@
+import os
+import shutil
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from crawler.sftp_download import PARTIAL_DOWNLOAD_SUFFIX, download_files
+from crawler.types import RemoteFile
+
+REMOTE_DIR = "project-heron_alderly-park"
+
+
+class LocalSftpServer:
+    """A stand-in for the SFTP server which serves the files of a local directory."""
+
+    def __init__(self, root, fail_file_names=()):
+        self.root = root
+        self.fail_file_names = fail_file_names
+        self.connections_opened = 0
+        self.max_concurrent_transfers = 0
+        self._concurrent_transfers = 0
+        self._lock = threading.Lock()
+
+    def connect(self, *args, **kwargs):
+        with self._lock:
+            self.connections_opened += 1
+
+        return LocalSftpConnection(self)
+
+
+class LocalSftpConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def get(self, remotepath, localpath, preserve_mtime=False):
+        server = self.server
+        with server._lock:
+            server._concurrent_transfers += 1
+            server.max_concurrent_transfers = max(server.max_concurrent_transfers, server._concurrent_transfers)
+
+        try:
+            with open(localpath, "wb") as local_file:
+                local_file.write(b"partial")
+                if os.path.basename(remotepath) in server.fail_file_names:
+                    raise IOError("Connection lost")
+
+            shutil.copyfile(os.path.join(server.root, remotepath), localpath)
+        finally:
+            with server._lock:
+                server._concurrent_transfers -= 1
+
+
+@pytest.fixture
+def remote_files(tmpdir):
+    remote_dir = tmpdir.mkdir("remote").mkdir(REMOTE_DIR)
+    files = []
+    for index in range(10):
+        file_name = f"AP_sanger_report_200503_23{index:02}.csv"
+        remote_dir.join(file_name).write(f"file {index}")
+        files.append(RemoteFile(file_name, len(f"file {index}"), 1000))
+
+    return files
+
+
+def test_download_files(config, tmpdir, remote_files):
+    server = LocalSftpServer(str(tmpdir.join("remote")))
+    local_dir = tmpdir.mkdir("local")
+
+    with patch("crawler.sftp_download.get_sftp_connection", side_effect=server.connect):
+        transfers = download_files(config, REMOTE_DIR, str(local_dir), remote_files, 3)
+
+    assert sorted(transfer.remote_file for transfer in transfers) == remote_files
+    assert sorted(os.listdir(local_dir)) == [remote_file.file_name for remote_file in remote_files]
+    for index, remote_file in enumerate(remote_files):
+        assert local_dir.join(remote_file.file_name).read() == f"file {index}"
+
+    # one connection is opened for each worker and reused for all the files it downloads
+    assert server.connections_opened == 3
+    assert server.max_concurrent_transfers <= 3
+
+
+def test_download_files_opens_no_more_connections_than_files(config, tmpdir, remote_files):
+    server = LocalSftpServer(str(tmpdir.join("remote")))
+    local_dir = tmpdir.mkdir("local")
+
+    with patch("crawler.sftp_download.get_sftp_connection", side_effect=server.connect):
+        transfers = download_files(config, REMOTE_DIR, str(local_dir), remote_files[:2], 4)
+
+    assert len(transfers) == 2
+    assert server.connections_opened == 2
+
+
+def test_download_files_skips_failed_files(config, tmpdir, remote_files):
+    failed_file_name = remote_files[4].file_name
+    server = LocalSftpServer(str(tmpdir.join("remote")), fail_file_names=(failed_file_name,))
+    local_dir = tmpdir.mkdir("local")
+
+    with patch("crawler.sftp_download.get_sftp_connection", side_effect=server.connect):
+        transfers = download_files(config, REMOTE_DIR, str(local_dir), remote_files, 2)
+
+    assert failed_file_name not in [transfer.remote_file.file_name for transfer in transfers]
+    assert len(transfers) == len(remote_files) - 1
+
+    # neither the failed file nor its partial download is left in the local directory
+    local_file_names = os.listdir(local_dir)
+    assert failed_file_name not in local_file_names
+    assert not any(file_name.endswith(PARTIAL_DOWNLOAD_SUFFIX) for file_name in local_file_names)
+
+
+def test_download_files_without_connection(config, tmpdir, remote_files):
+    local_dir = tmpdir.mkdir("local")
+
+    with patch("crawler.sftp_download.get_sftp_connection", side_effect=ConnectionError("Boom!")):
+        transfers = download_files(config, REMOTE_DIR, str(local_dir), remote_files, 2)
+
+    assert transfers == []
+    assert os.listdir(local_dir) == []
+
+
+def test_download_files_without_files(config, tmpdir):
+    with patch("crawler.sftp_download.get_sftp_connection") as mock_sftp_connection:
+        assert download_files(config, REMOTE_DIR, str(tmpdir), [], 2) == []
+
+        mock_sftp_connection.assert_not_called()
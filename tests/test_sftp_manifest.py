@@ -0,0 +1,44 @@
+import os
+
+from crawler.sftp_manifest import SFTP_MANIFEST_FILE, SftpManifest
+from crawler.types import RemoteFile
+
+
+def test_manifest_is_created_empty(tmpdir):
+    sftp_manifest = SftpManifest(str(tmpdir))
+
+    assert sftp_manifest.processed_files() == set()
+    assert os.path.exists(os.path.join(tmpdir, SFTP_MANIFEST_FILE))
+
+
+def test_add_to_manifest(tmpdir):
+    sftp_manifest = SftpManifest(str(tmpdir))
+
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000))
+    # adding the same file again does not duplicate it
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000))
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200511_1037.csv", 200, 2000))
+
+    assert SftpManifest(str(tmpdir)).processed_files() == {
+        RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000),
+        RemoteFile("AP_sanger_report_200511_1037.csv", 200, 2000),
+    }
+
+
+def test_add_changed_file_to_manifest(tmpdir):
+    sftp_manifest = SftpManifest(str(tmpdir))
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000))
+
+    # the record of the earlier version of the file is replaced
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 150, 3000))
+
+    assert sftp_manifest.processed_files() == {RemoteFile("AP_sanger_report_200503_2338.csv", 150, 3000)}
+
+
+def test_clear_manifest(tmpdir):
+    sftp_manifest = SftpManifest(str(tmpdir))
+    sftp_manifest.add(RemoteFile("AP_sanger_report_200503_2338.csv", 100, 1000))
+
+    sftp_manifest.clear()
+
+    assert sftp_manifest.processed_files() == set()
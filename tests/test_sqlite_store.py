@@ -0,0 +1,44 @@
+import os
+import sqlite3
+
+import pytest
+
+from crawler.sqlite_store import SqliteStore
+
+
+class NumbersStore(SqliteStore):
+    FILE_NAME = "numbers.sqlite3"
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS numbers (number INTEGER PRIMARY KEY)",)
+
+
+def test_store_is_created_with_its_tables(tmpdir):
+    store = NumbersStore(str(tmpdir))
+
+    assert store.fetch_all("SELECT number FROM numbers") == []
+    assert store.database_path == os.path.join(tmpdir, "numbers.sqlite3")
+    assert os.path.exists(store.database_path)
+
+
+def test_execute(tmpdir):
+    store = NumbersStore(str(tmpdir))
+
+    store.execute("INSERT INTO numbers VALUES (?)", (1,))
+    store.execute("INSERT INTO numbers VALUES (?)", (2,))
+
+    assert NumbersStore(str(tmpdir)).fetch_all("SELECT number FROM numbers ORDER BY number") == [(1,), (2,)]
+
+
+def test_transaction_is_rolled_back_on_error(tmpdir):
+    store = NumbersStore(str(tmpdir))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with store.transaction() as connection:
+            connection.execute("INSERT INTO numbers VALUES (1)")
+            connection.execute("INSERT INTO numbers VALUES (1)")
+
+    assert store.fetch_all("SELECT number FROM numbers") == []
+
+
+def test_fetch_all_raises_for_an_invalid_query(tmpdir):
+    with pytest.raises(sqlite3.OperationalError):
+        NumbersStore(str(tmpdir)).fetch_all("SELECT number FROM letters")
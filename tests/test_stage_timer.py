@@ -0,0 +1,81 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from crawler.stage_timer import (
+    STAGE_BACKUP,
+    STAGE_MONGO_INSERT,
+    STAGE_PARSE,
+    STAGE_STATE_CHECK,
+    StageTimer,
+    prometheus_metrics,
+    write_prometheus_textfile,
+)
+
+
+def test_time_adds_up_the_time_of_a_stage():
+    stage_timer = StageTimer()
+
+    with patch("crawler.stage_timer.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 2.25]):
+        with stage_timer.time(STAGE_MONGO_INSERT) as stage_timing:
+            stage_timing.rows += 10
+        with stage_timer.time(STAGE_MONGO_INSERT) as stage_timing:
+            stage_timing.rows += 5
+
+    assert stage_timer.to_doc() == {STAGE_MONGO_INSERT: {"seconds": 0.75, "rows": 15}}
+
+
+def test_time_records_a_stage_which_raises():
+    stage_timer = StageTimer()
+
+    with pytest.raises(ValueError):
+        with stage_timer.time(STAGE_BACKUP):
+            raise ValueError("Boom!")
+
+    assert STAGE_BACKUP in stage_timer.stages
+
+
+def test_time_iteration():
+    stage_timer = StageTimer()
+
+    chunks = list(stage_timer.time_iteration(STAGE_PARSE, iter([[1, 2], [3]])))
+
+    assert chunks == [[1, 2], [3]]
+    assert stage_timer.stages[STAGE_PARSE].rows == 3
+
+
+def test_add_and_to_doc_in_stage_order():
+    file_timer = StageTimer()
+    with file_timer.time(STAGE_PARSE) as stage_timing:
+        stage_timing.rows += 3
+    with file_timer.time(STAGE_STATE_CHECK):
+        pass
+
+    centre_timer = StageTimer()
+    centre_timer.add(file_timer)
+    centre_timer.add(file_timer)
+
+    assert list(centre_timer.to_doc()) == [STAGE_STATE_CHECK, STAGE_PARSE]
+    assert centre_timer.stages[STAGE_PARSE].rows == 6
+
+
+def test_prometheus_metrics():
+    stage_timer = StageTimer()
+    stage_timer.stage_timing(STAGE_MONGO_INSERT).seconds = 1.5
+    stage_timer.stage_timing(STAGE_MONGO_INSERT).rows = 100
+
+    metrics = prometheus_metrics('Centre "A"', stage_timer, 2).splitlines()
+
+    assert 'crawler_stage_duration_seconds{centre="Centre \\"A\\"",stage="mongo_insert"} 1.500000' in metrics
+    assert 'crawler_stage_rows{centre="Centre \\"A\\"",stage="mongo_insert"} 100' in metrics
+    assert 'crawler_files_processed{centre="Centre \\"A\\""} 2' in metrics
+
+
+def test_write_prometheus_textfile(tmpdir):
+    metrics_dir = tmpdir.join("metrics")
+
+    write_prometheus_textfile(str(metrics_dir), "ALDP", "Alderley", StageTimer(), 0)
+
+    assert os.listdir(metrics_dir) == ["crawler_ALDP.prom"]
+    assert 'crawler_files_processed{centre="Alderley"} 0' in metrics_dir.join("crawler_ALDP.prom").read()